@@ -0,0 +1,286 @@
+# coding: UTF-8
+"""
+Benchmark of pyCamRec capture & recording pipeline.
+It runs N virtual cams (camSource) through RecorderEngine and Cam.run,
+  records for a while with each output format and reports achieved
+  frame rate, dropped frames, latency (capture to write), CPU usage
+  and bytes written.
+
+Usage:
+    python benchmark.py -n 4 --size 1280x720 --fps 30 --duration 10
+    python benchmark.py --formats video,image --pattern noise --json r.json
+
+Dependency:
+    NumPy (1.14)
+    OpenCV (3.4)
+
+Changelog
+------------------------------------------------------------------------
+v.0.1: (2026.10.17)
+  - Initial development.
+  - CPU usage includes cam processes of 'process' backend.
+"""
+
+import argparse, json, shutil, sys, tempfile
+from os import path, walk, times
+from glob import glob
+from time import time, sleep, process_time
+
+from recEngine import RecorderEngine
+
+DEBUG = False
+__version__ = "0.1"
+
+#=======================================================================
+
+def getDirBytes(folder):
+    """ Return total bytes of files in a folder (recursively).
+
+    Args:
+        folder (str): Folder path.
+
+    Returns:
+        nBytes (int): Total bytes.
+    """
+    if DEBUG: print("benchmark.getDirBytes()")
+
+    nBytes = 0
+    for root, dirs, files in walk(folder):
+        for fn in files: nBytes += path.getsize(path.join(root, fn))
+    return nBytes
+
+#-----------------------------------------------------------------------
+
+def readLog(fp):
+    """ Read records of a log file (JSON lines) and its backups.
+
+    Args:
+        fp (str): Log file path.
+
+    Returns:
+        recs (list): Records (dict), from the oldest.
+    """
+    if DEBUG: print("benchmark.readLog()")
+
+    recs = []
+    fps = sorted(glob(fp+".*"), key=lambda x: -int(x.split(".")[-1])) + [fp]
+    for lfp in fps:
+        if not path.isfile(lfp): continue
+        with open(lfp, "r") as f:
+            for line in f:
+                try: recs.append(json.loads(line))
+                except ValueError: pass
+    return recs
+
+#-----------------------------------------------------------------------
+
+def getChildCPU():
+    """ Return CPU time of child processes which ended and were waited
+    for, such as cam processes of 'process' backend after stopping them.
+
+    Args: None
+
+    Returns:
+        (float): User and system CPU time (seconds); 0 on a platform
+          which doesn't report it (Windows).
+    """
+    t = times()
+    return t.children_user + t.children_system
+
+#-----------------------------------------------------------------------
+
+def runBench(nCam, src, outputFormat, duration, settings=None, warmUp=1.0,
+             keep=False):
+    """ Run virtual cams with an output format and measure performance.
+
+    Args:
+        nCam (int): Number of virtual cams.
+        src (str): Source specification for all cams
+          (see camSource.openSource), such as 'synth:640x480@30'.
+        outputFormat (str): Output format of Cam.
+        duration (float): Recording duration in seconds.
+        settings (None/dict): Other Cam settings such as
+          {'fpsLimit': 30}.
+        warmUp (float): Seconds to run cams before recording starts.
+        keep (bool): Whether to keep recorded files.
+
+    Returns:
+        result (dict): Measured values. Frames, drops and latency are
+          summed over recordings (rec_stop records of the log), so that
+          every recording (such as each motion event) is counted.
+          'cpuPercent' is measured from starting cams to stopping them,
+          including warm-up, because CPU time of a cam process (of
+          'process' backend) is known only after it ended; -1 when it
+          can't be measured.
+          'failed' has reasons when output wasn't written.
+    """
+    if DEBUG: print("benchmark.runBench()")
+
+    if settings == None: settings = {}
+
+    tmpDir = tempfile.mkdtemp(prefix="pCR_bench_")
+    recFolder = path.join(tmpDir, "recordings")
+    logFile = path.join(tmpDir, "pCR_log.jsonl")
+    engine = RecorderEngine(logFile=logFile,
+                            recFolder=recFolder,
+                            sources=[src]*nCam,
+                            metricsFile=path.join(tmpDir, "pCR_metrics"))
+    cpuWallT = time()
+    cpuT = process_time() + getChildCPU()
+    for ci in engine.cIndices:
+        engine.setCamSettings(ci, outputFormat=outputFormat, **settings)
+        engine.startCam(ci)
+    sleep(warmUp)
+    engine.startRec()
+    sleep(duration)
+    engine.stopRec()
+    # writers finish here; cam processes are joined
+    for ci in engine.cIndices: engine.stopCam(ci)
+    cpuWallT = time() - cpuWallT
+    cpuT = process_time() + getChildCPU() - cpuT
+    if settings.get("backend", "thread") == "process" and \
+      sys.platform == "win32": # CPU time of cam processes isn't reported
+        cpuPercent = -1
+    else:
+        cpuPercent = cpuT/cpuWallT*100
+    stages = {} # sum and count of latency of each stage
+    for cam in engine.cams.values():
+        for k, h in cam.getMetrics()["stages"].items():
+            s = stages.setdefault(k, [0.0, 0])
+            s[0] += h["sum"]; s[1] += h["n"]
+    engine.close() # all log records are written
+    ### collect results of recordings
+    nWritten = 0
+    nDropped = 0
+    latSum = 0.0 # sum of latency (ms)
+    nLat = 0
+    latMax = 0.0
+    failed = [] # reasons of failure
+    for r in readLog(logFile):
+        if r["event"] == "rec_stop":
+            nWritten += r["frames"]
+            nDropped += r["dropOldest"] + r["dropNewest"]
+            if "latMeanMS" in r:
+                latSum += r["latMeanMS"] * r["frames"]
+                nLat += r["frames"]
+                latMax = max(latMax, r["latMaxMS"])
+        elif r["event"] == "rec_error":
+            failed.append("c%.2i: %s"%(r["cam"], r["error"]))
+    result = dict(outputFormat=outputFormat,
+                  nCam=nCam,
+                  src=src,
+                  duration=duration,
+                  fpsPerCam=nWritten/float(nCam)/duration,
+                  written=nWritten,
+                  dropped=nDropped,
+                  latMeanMS=(latSum/nLat if nLat > 0 else -1),
+                  latMaxMS=latMax,
+                  cpuPercent=cpuPercent,
+                  bytes=getDirBytes(recFolder),
+                  failed=failed)
+    if result["bytes"] == 0 or nWritten == 0:
+        result["failed"].append("nothing was written")
+    result["MBps"] = result["bytes"]/1e6/duration
+    # mean latency (ms) of each stage
+    result["stageMS"] = dict([(k, s[0]/s[1]*1000) for k, s in stages.items() \
+                                                    if s[1] > 0])
+    if keep: result["folder"] = tmpDir
+    else: shutil.rmtree(tmpDir, ignore_errors=True)
+    return result
+
+#-----------------------------------------------------------------------
+
+def printResults(results):
+    """ Print results as a table.
+
+    Args:
+        results (list): Results (dict) of runBench().
+
+    Returns:
+        None
+    """
+    if DEBUG: print("benchmark.printResults()")
+
+    print("%-8s %4s %9s %8s %8s %12s %12s %8s %10s"%("format", "cams",
+            "fps/cam", "written", "dropped", "lat.mean(ms)", "lat.max(ms)",
+            "CPU(%)", "MB/s"))
+    for r in results:
+        if r["cpuPercent"] < 0: cpu = "N/A"
+        else: cpu = "%.1f"%(r["cpuPercent"])
+        print("%-8s %4i %9.2f %8i %8i %12.2f %12.2f %8s %10.2f"%(
+                r["outputFormat"], r["nCam"], r["fpsPerCam"], r["written"],
+                r["dropped"], r["latMeanMS"], r["latMaxMS"], cpu,
+                r["MBps"]))
+    for r in results:
+        print("%-8s stage mean(ms): %s"%(r["outputFormat"],
+                ", ".join(["%s %.2f"%(k, v) for k, v in \
+                             sorted(r["stageMS"].items())])))
+    for r in results:
+        if r["failed"] != []:
+            print("%-8s FAILED: %s"%(r["outputFormat"],
+                                     "; ".join(r["failed"])))
+
+#-----------------------------------------------------------------------
+
+def parseArgs():
+    """ Parse command line options.
+
+    Args: None
+
+    Returns:
+        (argparse.Namespace): Parsed options.
+    """
+    parser = argparse.ArgumentParser(description="pyCamRec benchmark")
+    parser.add_argument("-n", "--nCam", type=int, default=2,
+                        help="number of virtual cams")
+    parser.add_argument("--size", default="640x480",
+                        help="frame size; WxH")
+    parser.add_argument("--fps", type=float, default=30,
+                        help="frame rate of virtual cams (and FPS limit)")
+    parser.add_argument("--pattern", default="bars",
+                        choices=["bars", "noise"], help="test pattern")
+    parser.add_argument("--src", default=None,
+                        help="source for all cams instead of test pattern;"
+                             " video file or image folder")
+    parser.add_argument("--formats", default="video,image,motion,raw",
+                        help="output formats to run, separated by ','")
+    parser.add_argument("--duration", type=float, default=5,
+                        help="recording duration (seconds) of each format")
+    parser.add_argument("--ssIntv", type=float, default=0,
+                        help="snapshot interval (seconds) for image format")
+    parser.add_argument("--overload", action="store_true",
+                        help="overload control (see Cam.overload)")
+    parser.add_argument("--mjpgPass", action="store_true",
+                        help="MJPEG passthrough (virtual cams deliver JPEG)")
+    parser.add_argument("--grayscale", action="store_true",
+                        help="single-channel (grayscale) frames")
+    parser.add_argument("--backend", default="thread",
+                        choices=["thread", "process"],
+                        help="capture backend of cams")
+    parser.add_argument("--json", default="",
+                        help="file to save results as JSON")
+    parser.add_argument("--keep", action="store_true",
+                        help="keep recorded files")
+    return parser.parse_args()
+
+#=======================================================================
+
+if __name__ == '__main__':
+    args = parseArgs()
+    if args.src != None: src = args.src
+    else: src = "synth:%s@%s:%s"%(args.size, str(args.fps), args.pattern)
+    settings = dict(fpsLimit=int(round(args.fps)), ssIntv=args.ssIntv,
+                    motionThr=0, # any change triggers 'motion' format
+                    mjpgPass=args.mjpgPass,
+                    overload=args.overload,
+                    grayscale=args.grayscale,
+                    backend=args.backend)
+    results = []
+    for fmt in args.formats.split(","):
+        print("Running '%s' with %i cam(s) [%s] ..."%(fmt, args.nCam, src))
+        results.append(runBench(args.nCam, src, fmt, args.duration,
+                                settings, keep=args.keep))
+    printResults(results)
+    if args.json != "":
+        with open(args.json, "w") as f: json.dump(results, f, indent=2)
+    if any([r["failed"] != [] for r in results]): sys.exit(1)
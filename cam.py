@@ -0,0 +1,1483 @@
+# coding: UTF-8
+"""
+Cam class of pyCamRec for retrieving frames from a cam
+  and storing them as video, images or raw frames.
+It doesn't depend on wxPython widgets, so that it can run in a thread
+  of the GUI or in a separate process.
+
+Dependency:
+    NumPy (1.14)
+    OpenCV (3.4)
+
+Changelog
+------------------------------------------------------------------------
+v.0.1: (2026.10.17)
+  - Moved from pyCamRec.py.
+  - Added CamSyncGroup for synchronized capture of multiple cams.
+  - Video is written in segments (SegWriter).
+  - Frames can come from a virtual source (camSource).
+  - Per-stage metrics (camMetrics).
+  - Structured, buffered logging (camLog).
+  - 'raw' output format; raw frames in memory-mapped files (RawWriter).
+  - MJPEG passthrough; JPEG data from cam is recorded without decoding.
+  - Capture format (resolution, frame rate, pixel format) settings.
+  - Images can be packed into chunked archives (ImgPackWriter).
+  - Recordings can be placed across output roots (OutputRoots).
+  - Overload control; recording settings are stepped down under
+    sustained overload (OverloadController).
+  - Region of frame to record (cropROI) and scale of output (outScale).
+  - Grayscale mode; frames are converted to single-channel at capture.
+"""
+
+import queue
+from os import path, mkdir
+from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from time import time, sleep, monotonic
+
+import cv2
+import numpy as np
+
+from fFuncs import get_time_stamp
+from camPipeline import FrameRing, FramePacer, PreTrigBuf, MotionDetector
+from camPipeline import getSnapshotPool, OverloadController
+from camWriter import SegWriter, RawWriter, ImgPackWriter
+from camSource import openSource
+from camMetrics import StageMetrics
+from camLog import getLogger
+from camBandwidth import fourccToStr
+from camStorage import OutputRoots
+
+DEBUG = False
+__version__ = "0.1"
+
+#=======================================================================
+
+class Cam:
+    """ class for retrieving images from cam
+    
+    Args:
+        parent: Parent object.
+        cIdx (int): Index of cam.
+        logFile (str): Log file.
+        cap (None/cv2.VideoCapture): Already opened VideoCapture
+          (such as the one from probeCams) to reuse.
+        initFrame (None/numpy.ndarray): A frame already read from 'cap'.
+        src (None/int/str): Source of frames (see camSource.openSource);
+          'cIdx' is used when it's None.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    # attributes which a user can set for recording
+    settingKeys = ["outputFormat", "fpsLimit", "ssIntv", "imgExt",
+                   "imgSink", "packChunkMB", "jpgQuality", "pngCompression",
+                   "preTrigSec", "motionThr", "motionMinArea", "motionROI",
+                   "motionMask", "motionPreRoll", "motionPostRoll", "segSec",
+                   "segMB", "rawChunkMB", "mjpgPass", "ringLen", "ringPolicy",
+                   "backend", "capWidth", "capHeight", "capFPS", "capFourcc",
+                   "usbBus", "overload", "overloadLadder", "cropROI",
+                   "outScale", "grayscale"]
+    # settings of capture format, applied to VideoCapture
+    fmtKeys = ["capWidth", "capHeight", "capFPS", "capFourcc"]
+
+    def __init__(self, parent, cIdx, logFile, cap=None, initFrame=None,
+                 src=None):
+        if DEBUG: print("Cam.__init__()")
+        ##### beginning of setting up attributes -----
+        self.parent = parent # parent
+        self.cIdx = cIdx # index of cam
+        self.logFile = logFile # log file
+        # source of frames; cam index or specification of virtual source
+        if src is None: self.src = cIdx
+        else: self.src = src
+        if cap is None or initFrame is None:
+            self.cap = openSource(self.src) # video capture
+            sleep(0.3) # some delay for cam's initial auto-adjustment
+            ### get frame size
+            for i in range(10):
+                ret, frame = self.cap.read()
+                if ret == True:
+                    initFrame = frame
+                    break
+                sleep(0.01)
+        else:
+            self.cap = cap # video capture
+        self.initFrame = initFrame # initial frame
+        self.fSz = (initFrame.shape[1], initFrame.shape[0]) # frame size
+        self.outputFormat = "video" # video, image, motion or raw
+          # (motion: video recording triggered by motion,
+          #  raw: uncompressed frames in memory-mapped files)
+        self.fpsLimit = 30 # Upper limit of frames per second
+        self.ssIntv = 1.0 # snapshot (saving image from Cam) interval in seconds
+        self.imgExt = "jpg" # file type when saving frames to images
+        self.jpgQuality = 95 # JPEG quality (0-100) of images
+        self.pngCompression = 3 # PNG compression level (0-9) of images
+        self.imgSink = "files" # where images of 'image' format go;
+          # 'files' (a file per image) or 'pack' (appended to chunk files
+          # with an index; see ImgPackWriter)
+        self.packChunkMB = 1024 # size (MB) of a chunk file of image pack
+        self.ssFutures = deque() # results of images submitted to SnapshotPool
+        self.packQ = deque() # encoded images (future) and timestamps,
+          # waiting to be appended to image pack in order
+        self.ssMaxDepth = 0 # max. number of this cam's images waiting in
+          # SnapshotPool in current recording
+        self.ssStart = (0.0, 0, 0) # this cam's 'encode' time sum, count
+          # and failures (in 'metrics') at the start of current recording
+        self.preTrigSec = 0 # seconds of frames to keep before recording
+          # starts (pre-trigger); 0 means no pre-trigger buffer
+        self.preTrig = None # pre-trigger buffer (PreTrigBuf)
+        self.motionThr = 25 # intensity difference threshold for motion
+        self.motionMinArea = 0.005 # min. ratio of changed pixels in ROI
+        self.motionROI = None # region (x, y, w, h) for detecting motion
+        self.motionMask = "" # mask image file; non-zero pixels are ROI
+        self.motionPreRoll = 2.0 # seconds of frames to record before motion
+        self.motionPostRoll = 5.0 # seconds to keep recording after motion
+        self.segSec = 0 # max. duration (seconds) of a video segment;
+          # 0 means no rotation by duration
+        self.segMB = 0 # max. size (MB) of a video segment;
+          # 0 means no rotation by size
+        self.rawChunkMB = 1024 # size (MB) of a chunk file of 'raw' format
+        self.mjpgPass = False # whether to request MJPEG from cam and record
+          # its JPEG data without decoding & re-encoding ('video' and
+          # 'image' formats); not used with 'cropROI', 'outScale' or
+          # 'grayscale'
+        self.isPass = False # whether MJPEG passthrough is on in capture
+        self.previewFPS = 20 # rate of decoding JPEG data for preview
+          # with MJPEG passthrough
+        self.previewTime = -1 # last time a frame was decoded for preview
+        self.capWidth = 0 # frame width to request to cam; 0 for default
+        self.capHeight = 0 # frame height to request to cam; 0 for default
+        self.capFPS = 0 # frame rate to request to cam; 0 for default
+        self.capFourcc = "" # pixel format (FourCC such as 'MJPG', 'YUYV')
+          # to request to cam; empty string for default
+        self.usbBus = "" # name of USB bus (or hub) of cam, for planning
+          # bandwidth; empty string for the default bus (no bus for
+          # a virtual source)
+        self.overload = False # whether to step down recording settings
+          # (frame rate, JPEG quality, frame size) under sustained overload
+        self.overloadLadder = None # levels of settings to step through
+          # under overload; None for OverloadController.LADDER
+        self.olCtrl = None # OverloadController when 'overload' is on
+        self.olLevel = {} # settings of current overload level
+        self.olPrev = None # counters at the last overload check
+        self.olBaseFPS = -1 # frame rate measured before the first step-down,
+          # the base of stepped frame rate of a cam without frame rate limit
+        self.olFPS = -1 # frame rate limit of current overload level;
+          # -1 when frame rate isn't stepped down
+        self.olApplied = None # overload level applied to output (writer)
+        self.cropROI = None # region (x, y, w, h) of frame to record;
+          # None for the whole frame (not applied to 'raw' format)
+        self.outScale = 1.0 # scale (0-1) of recorded frames, after cropping
+        self.crop = None # slices (rows, columns) of frame for 'cropROI'
+        self.grayscale = False # whether to convert frames to single-channel
+          # (grayscale) at capture; written as grayscale video or 8-bit
+          # images, and shown as grayscale in preview
+        self.outSz = self.fSz # frame size of output
+        self.ringLen = 30 # number of frame slots in ring buffer to writer
+        self.ringPolicy = "dropOldest" # overflow policy of the ring;
+          # 'block', 'dropOldest' or 'dropNewest'
+        self.ring = None # ring buffer (FrameRing) to writer stage
+        self.ringStart = {} # ring counters at the start of current
+          # recording
+        self.fps = [0] # frame counts of each second
+        self.recentTS = deque(maxlen=60) # monotonic timestamps of recent
+          # frames, for measuring frame rate
+        self.measuredFPS = -1 # frame rate measured with 'recentTS'
+        self.tsFile = None # file object of timestamp sidecar (CSV)
+        self.storage = None # output roots (OutputRoots) when recordings
+          # are placed across several folders
+        self.recRoot = "" # folder (root) of current recording
+        self.storageChkTime = -1 # last time root was checked for failover
+        self.isRecording = False # whether recording is on (by main thread)
+        self.isWriting = False # whether writer is writing (rec_init was sent)
+        self.motion = None # MotionDetector for 'motion' output format
+        self.lastMotionTime = -1 # last time when motion was detected
+        self.imgSaveTime = -1 # last time image was saved
+        self.fpsRecTime = -1 # last time 'fps' was updated
+        self.wTh = None # writer thread
+        self.nWritten = 0 # number of frames written in current recording
+        self.latSum = 0.0 # sum of latency (capture to write) of frames
+        self.latMax = 0.0 # max. latency of frames
+        self.nLat = 0 # number of frames in 'latSum'
+        self.pacer = FramePacer() # for limiting frame rate
+        self.metrics = StageMetrics("c%.2i"%(cIdx)) # per-stage metrics
+        self.backend = "thread" # run this Cam in a 'thread' or 'process'
+        ##### end of setting up attributes -----
+    
+    #-------------------------------------------------------------------
+
+    def run(self, mb, q2t, recFolder=""):
+        """ Function for thread to retrieve image (capture stage).
+        Frames to store are passed to the writer stage
+          (Cam.runWriter, running in another thread) via FrameRing,
+          so that encoding or disk stall doesn't hold up capturing.
+        
+        Args:
+            mb (FrameMailbox): Mailbox to main thread for preview frame.
+            q2t (queue.Queue): Queue from main thread.
+            recFolder (str/OutputRoots): Folder to save recorded
+              videos/images, or output roots to choose a folder from.
+        
+        Returns:
+            None
+        """
+        if DEBUG: print("Cam.run()")
+
+        ### limit frame processing when output-format is video
+        if self.outputFormat in ['video', 'motion', 'raw']:
+            self.pacer.setFPSLimit(self.fpsLimit)
+        else:
+            self.pacer.setFPSLimit(-1)
+        self.initCapture(recFolder)
+
+        ##### [begin] infinite loop of thread -----
+        while(self.cap.isOpened()):
+            
+            t = monotonic()
+            self.pacer.wait() # sleep until the deadline of the next frame
+            self.metrics.observe("wait", monotonic()-t)
+            
+            ### process queue message (q2t)
+            if q2t.empty() == False:
+                try: q2tMsg = q2t.get(False)
+                except: q2tMsg = ""
+                if q2tMsg == "quit": break
+                self.procMsg(q2tMsg)
+            
+            ### retrieve a frame image and process
+            t = monotonic()
+            ret, frame = self.cap.read()
+            ts = (monotonic(), time()) # timestamps of capture
+            self.metrics.observe("read", ts[0]-t)
+            if ret==True: # frame image retrieved
+                self.procFrame(frame, ts, mb)
+            else:
+                break
+        ##### [end] infinite loop of thread -----
+        
+        self.endCapture()
+    
+    #-------------------------------------------------------------------
+
+    def initCapture(self, recFolder=""):
+        """ Initialize capture stage and start writer thread.
+        
+        Args:
+            recFolder (str/OutputRoots): Folder to save recorded
+              videos/images, or output roots to choose a folder from.
+        
+        Returns:
+            None
+        """
+        if DEBUG: print("Cam.initCapture()")
+
+        self.isRecording = False # whether recording is on (by main thread)
+        self.isWriting = False # whether writer is writing (rec_init was sent)
+        if self.outputFormat == 'motion':
+            self.motion = MotionDetector(thr=self.motionThr,
+                                         minArea=self.motionMinArea,
+                                         roi=self.motionROI,
+                                         maskFP=self.motionMask)
+        self.lastMotionTime = -1 # last time when motion was detected
+        self.imgSaveTime = time()-self.ssIntv # last time image was saved
+        self.fpsRecTime = time(); self.fps = [0]
+        self.recentTS.clear(); self.measuredFPS = -1
+        self.previewTime = -1
+        self.olLevel = {}
+        self.olPrev = None
+        self.olBaseFPS = -1; self.olFPS = -1
+        if self.overload: self.olCtrl = OverloadController(self.overloadLadder)
+        else: self.olCtrl = None
+        # JPEG data can't be cropped, scaled or converted without decoding
+        self.isPass = self.mjpgPass and \
+          self.outputFormat in ['video', 'image'] and \
+          self.cropROI is None and self.outScale >= 1.0 and \
+          not self.grayscale and self.setPassthrough(True)
+        ### set up ring buffer and start writer thread
+        if self.isPass: # JPEG data of variable length
+            self.ring = FrameRing(self.ringLen,
+                                  (self.fSz[1]*self.fSz[0]*3,),
+                                  policy=self.ringPolicy,
+                                  varLen=True)
+        else:
+            self.ring = FrameRing(self.ringLen,
+                                  self.getFrameShape(),
+                                  policy=self.ringPolicy)
+        self.wTh = Thread(target=self.runWriter, args=(self.ring, recFolder,))
+        self.wTh.start()
+    
+    #-------------------------------------------------------------------
+
+    def setPassthrough(self, flag):
+        """ Request MJPEG from cam with conversion to BGR turned off,
+        so that read() returns JPEG data; or turn conversion on again.
+        When the cam (or its backend) doesn't deliver JPEG data,
+          conversion is turned on again.
+
+        Args:
+            flag (bool): Whether to turn passthrough on.
+
+        Returns:
+            (bool): Whether passthrough is on.
+        """
+        if DEBUG: print("Cam.setPassthrough()")
+
+        if flag:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+            ret, data = self.cap.read()
+            if ret and data.ndim <= 2 and data.shape[0] == 1 and \
+              data.size > 2 and data.flat[0] == 0xFF and data.flat[1] == 0xD8:
+                return True
+            getLogger(self.logFile).log("mjpg_pass_unavailable",
+                                        cam=self.cIdx,
+                                        fourcc=int(self.cap.get(
+                                                     cv2.CAP_PROP_FOURCC)))
+        self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 1)
+        return False
+
+    #-------------------------------------------------------------------
+
+    def procMsg(self, msg):
+        """ Process a message from main thread ('rec_init' or 'rec_stop').
+        
+        Args:
+            msg (str): Message.
+        
+        Returns:
+            None
+        """
+        if DEBUG: print("Cam.procMsg()")
+
+        if msg == 'rec_init':
+            self.isRecording = True
+        elif msg == 'rec_stop':
+            self.isRecording = False
+    
+    #-------------------------------------------------------------------
+
+    def procFrame(self, frame, ts, mb):
+        """ Process a retrieved frame; pass it to writer and preview.
+        
+        Args:
+            frame (numpy.ndarray): Frame image (JPEG data with
+              MJPEG passthrough).
+            ts (tuple): Monotonic and wall-clock timestamps of capture.
+            mb (FrameMailbox): Mailbox to main thread for preview frame.
+        
+        Returns:
+            None
+        """
+        #if DEBUG: print("Cam.procFrame()")
+
+        if self.isPass: data = frame.reshape(-1) # JPEG data
+        elif self.grayscale:
+        # converted once here; later stages get a third of the data
+            t = monotonic()
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            self.metrics.observe("gray", monotonic()-t)
+            data = frame
+        else: data = frame
+
+        ### fps
+        if time()-self.fpsRecTime > 1:
+            print("[c%.2i] FPS: "%(self.cIdx), self.fps[-1],
+                  "Jitter(ms): %.2f"%(self.pacer.getJitter()["meanDev"]))
+            self.fps.append(0)
+            self.fps = self.fps[-10:] # keep the past 10 fps records
+            self.fpsRecTime = time()
+            if self.olCtrl != None: self.checkOverload()
+        else:
+            self.fps[-1] += 1
+        ### measure frame rate
+        self.recentTS.append(ts[0])
+        if len(self.recentTS) >= 10 and \
+          self.recentTS[-1] > self.recentTS[0]: # a few frames right after
+          # opening a device can come in a burst; wait for enough frames
+            self.measuredFPS = (len(self.recentTS)-1) / \
+                               (self.recentTS[-1]-self.recentTS[0])
+        ### start/stop writing
+        if self.outputFormat == 'motion':
+        # writing is triggered by motion while recording is on
+            if self.motion.update(frame): self.lastMotionTime = time()
+            toWrite = self.isRecording and self.lastMotionTime != -1 and \
+              time()-self.lastMotionTime <= self.motionPostRoll
+        else:
+            toWrite = self.isRecording
+        if toWrite != self.isWriting:
+            if toWrite: self.ring.putMsg('rec_init')
+            else: self.ring.putMsg('rec_stop')
+            self.isWriting = toWrite
+        if self.isWriting or self.preTrigSec > 0 or \
+          (self.isRecording and self.outputFormat == 'motion'):
+        # frames are also passed to writer for pre-trigger buffer
+            if self.outputFormat in ['video', 'motion', 'raw']:
+                self.ring.put(data, ts) # pass it to writer
+            elif self.outputFormat == 'image':
+                if time()-self.imgSaveTime >= self.ssIntv:
+                # interval time has passed
+                    self.ring.put(data, ts) # pass it to writer
+                    self.imgSaveTime = time()
+        self.metrics.inc("frames")
+        if self.isPass:
+        # decode JPEG data only at display rate
+            if ts[0]-self.previewTime < 1.0/self.previewFPS: return
+            self.previewTime = ts[0]
+            t = monotonic()
+            frame = cv2.imdecode(data, cv2.IMREAD_COLOR)
+            self.metrics.observe("decode", monotonic()-t)
+            if frame is None: return
+        t = monotonic()
+        mb.put(frame) # latest frame for preview in main thread
+        self.metrics.observe("publish", monotonic()-t)
+    
+    #-------------------------------------------------------------------
+
+    def getLoadSignals(self):
+        """ Return load signals of this cam since the last call,
+        for OverloadController.update.
+        
+        Args: None
+        
+        Returns:
+            sig (None/dict): Signals; None on the first call.
+        """
+        #if DEBUG: print("Cam.getLoadSignals()")
+
+        rs = self.ring.getStats()
+        cur = dict(drops=rs["dropOldest"]+rs["dropNewest"]+rs["blocked"])
+        for k in ["write", "encode", "read"]:
+            h = self.metrics.hist.get(k)
+            if h is None: cur[k] = (0.0, 0)
+            else: cur[k] = (h.sum, h.n)
+        prev = self.olPrev
+        self.olPrev = cur
+        if prev is None: return None
+        def mean(k):
+            n = cur[k][1] - prev[k][1]
+            if n <= 0: return 0.0
+            return (cur[k][0] - prev[k][0]) / n
+        ### frame interval of capture and of writing
+        if self.pacer.intv > 0: target = 1.0/self.pacer.intv
+        else: target = self.cap.get(cv2.CAP_PROP_FPS)
+        if self.measuredFPS > 0: capIntv = 1.0/self.measuredFPS
+        elif target > 0: capIntv = 1.0/target
+        else: capIntv = 1.0/30
+        wIntv = capIntv
+        if self.outputFormat == 'image': wIntv = max(self.ssIntv, capIntv)
+        ### write latency & encode latency in SnapshotPool (its workers
+        ###   share the load)
+        lat = mean("write") + mean("encode")/getSnapshotPool().nWorkers
+        ### capture rate; low rate counts only when reading doesn't take
+        ###   most of the frame interval, i.e. it's not the cam's rate
+        fps = 1.0
+        if target > 0 and self.measuredFPS > 0 and \
+          mean("read") < capIntv*0.5:
+            fps = min(1.0, self.measuredFPS/target)
+        return dict(depth=rs["depth"]/float(self.ringLen),
+                    drops=cur["drops"]-prev["drops"],
+                    lat=lat/wIntv,
+                    fps=fps)
+
+    #-------------------------------------------------------------------
+
+    def checkOverload(self):
+        """ Update OverloadController with load signals and apply
+        its level when it changed; frame rate is applied to the pacer
+          here, other settings are applied by the writer (writeFrame).
+        
+        Args: None
+        
+        Returns:
+            None
+        """
+        #if DEBUG: print("Cam.checkOverload()")
+
+        sig = self.getLoadSignals()
+        if sig is None: return
+        prevLevel = self.olCtrl.level
+        if not self.olCtrl.update(sig): return
+        lv = self.olCtrl.getLevel()
+        ### frame rate
+        if prevLevel == 0: self.olBaseFPS = self.measuredFPS # rate before
+          # stepping down
+        fpsLimit = self.getOverloadFPS(lv)
+        if lv.get("fps", 1.0) < 1.0: self.olFPS = fpsLimit
+        else: self.olFPS = -1
+        self.pacer.setFPSLimit(fpsLimit)
+        self.olLevel = lv # writer applies other settings
+        if self.olCtrl.level > prevLevel: direction = "down"
+        else: direction = "up"
+        print("[c%.2i] Overload level %i -> %i %s"%(self.cIdx, prevLevel,
+                self.olCtrl.level, str(lv)))
+        getLogger(self.logFile).log("overload_step",
+                cam=self.cIdx,
+                direction=direction,
+                level=self.olCtrl.level,
+                prevLevel=prevLevel,
+                settings=lv,
+                fpsLimit=fpsLimit,
+                reasons=self.olCtrl.reasons,
+                signals=dict([(k, round(v, 3)) for k, v in sig.items()]))
+
+    #-------------------------------------------------------------------
+
+    def getOverloadFPS(self, lv):
+        """ Return frame rate limit of an overload level.
+        Its base is 'fpsLimit' of video, motion and raw formats. Without
+          the limit (image format, or 'fpsLimit' <= 0), it's the frame
+          rate measured before the first step-down ('olBaseFPS').
+        
+        Args:
+            lv (dict): Settings of overload level.
+        
+        Returns:
+            fpsLimit (float): Frame rate limit; -1 for no limit.
+        
+        Examples:
+            >>> cam.fpsLimit = -1; cam.olBaseFPS = 29.8
+            >>> cam.getOverloadFPS({"fps": 0.5}), cam.getOverloadFPS({})
+            (14.9, -1)
+            >>> cam.fpsLimit = 30
+            >>> cam.getOverloadFPS({"fps": 0.75}), cam.getOverloadFPS({})
+            (22.5, 30)
+        """
+        if DEBUG: print("Cam.getOverloadFPS()")
+
+        if self.outputFormat in ['video', 'motion', 'raw']:
+            fpsLimit = self.fpsLimit
+        else:
+            fpsLimit = -1
+        ratio = lv.get("fps", 1.0)
+        if ratio >= 1.0: return fpsLimit
+        if fpsLimit <= 0: fpsLimit = self.olBaseFPS
+        if fpsLimit <= 0: return -1 # rate is unknown yet
+        return max(1.0, round(fpsLimit*ratio, 2))
+    
+    #-------------------------------------------------------------------
+
+    def endCapture(self):
+        """ Let writer finish frames in the ring, then stop it.
+        
+        Args: None
+        
+        Returns: None
+        """
+        if DEBUG: print("Cam.endCapture()")
+
+        self.ring.putMsg("quit")
+        self.wTh.join()
+        self.ring.close()
+        if self.isPass:
+            self.setPassthrough(False)
+            self.isPass = False
+    
+    #-------------------------------------------------------------------
+
+    def runWriter(self, ring, recFolder=""):
+        """ Function for thread to store frames, taken from the ring,
+        as video or image (writer stage).
+        
+        Args:
+            ring (FrameRing): Ring buffer filled by capture stage.
+            recFolder (str/OutputRoots): Folder to save recorded
+              videos/images, or output roots to choose a folder from.
+        
+        Returns:
+            None
+        """
+        if DEBUG: print("Cam.runWriter()")
+
+        ofn = '' # output file or folder name
+        out = None # videoWriter or index for image file
+        buf = np.zeros(ring.shape, dtype=ring.buf.dtype) # frame to write
+        self.ssPool = getSnapshotPool() # for writing images asynchronously
+        self.imgParams = self.getImgParams()
+        if self.outputFormat == 'motion' and self.motionPreRoll > 0:
+            self.preTrig = PreTrigBuf(self.motionPreRoll)
+        elif self.preTrigSec > 0:
+            self.preTrig = PreTrigBuf(self.preTrigSec)
+        else:
+            self.preTrig = None
+
+        ##### [begin] infinite loop of thread -----
+        while True:
+            if self.outputFormat == 'image':
+            # frame should be a new array to be encoded in SnapshotPool
+                item = ring.get(timeout=0.5)
+                if isinstance(out, ImgPackWriter): self.flushPack(out)
+            elif isinstance(out, RawWriter):
+            # copy frame directly into the slot of the mapped file
+                item = ring.get(out=out.slot(), timeout=0.5)
+            else:
+                item = ring.get(out=buf, timeout=0.5)
+            if item is None: continue
+            kind, data, ts = item
+            if kind == "msg":
+                if data == "quit":
+                    break
+                elif data == 'rec_init':
+                    if out == None:
+                        try:
+                            out, ofn = self.startRecording(recFolder)
+                            if self.preTrig != None:
+                                ### write frames before recording started
+                                for f, fTS in self.preTrig.popAll(
+                                                    decode=not self.isPass):
+                                    out = self.writeFrame(out, ofn, f, fTS)
+                        except OSError as e:
+                            out = self.stopOnError(out, e)
+                elif data == 'rec_stop':
+                    if out != None:
+                        out = self.stopRecording(out)
+            elif out != None:
+                t = monotonic()
+                try: out = self.writeFrame(out, ofn, data, ts)
+                except OSError as e:
+                    out = self.stopOnError(out, e)
+                    continue
+                self.metrics.observe("write", monotonic()-t)
+                self.metrics.inc("written")
+                ### latency from capture to write (submit for image)
+                lat = monotonic() - ts[0]
+                self.latSum += lat
+                self.latMax = max(self.latMax, lat)
+                self.nLat += 1
+                if self.needFailover(out):
+                    ### continue recording on another root
+                    prev = self.recRoot
+                    self.stopRecording(out)
+                    out, ofn = self.startRecording(recFolder, exclude=[prev])
+                    print("[c%.2i] Recording moves from %s to %s"%(self.cIdx,
+                                                        prev, self.recRoot))
+                    getLogger(self.logFile).log("storage_failover",
+                                                cam=self.cIdx,
+                                                fromRoot=prev,
+                                                toRoot=self.recRoot,
+                                                file=ofn)
+            elif self.preTrig != None:
+                self.preTrig.add(data, ts) # keep it for pre-trigger
+        ##### [end] infinite loop of thread -----
+
+        if out != None: self.stopRecording(out)
+    
+    #-------------------------------------------------------------------
+
+    def stopOnError(self, out, e):
+        """ Stop current recording when its output failed, such as
+        VideoWriter which couldn't be opened; frames are not written
+          until recording starts again.
+        
+        Args:
+            out (None/SegWriter/RawWriter/ImgPackWriter/int): Writer or
+              index of image file; None when it failed to start.
+            e (Exception): Error of the output.
+        
+        Returns:
+            out (None)
+        """
+        if DEBUG: print("Cam.stopOnError()")
+
+        print("[c%.2i] [ERROR] Recording stopped; %s"%(self.cIdx, str(e)))
+        getLogger(self.logFile).log("rec_error", cam=self.cIdx,
+                                    format=self.outputFormat, error=str(e))
+        if out != None: out = self.stopRecording(out)
+        elif self.storage != None: self.storage.release(self.cIdx)
+        return out
+    
+    #-------------------------------------------------------------------
+
+    def writeFrame(self, out, ofn, frame, ts):
+        """ Write a frame to video, image or raw file.
+        
+        Args:
+            out (SegWriter/RawWriter/ImgPackWriter/int): Writer or index
+              of image file.
+            ofn (str): Output file or folder name.
+            frame (numpy.ndarray): Frame image.
+            ts (tuple): Monotonic and wall-clock timestamps of the frame.
+        
+        Returns:
+            out (SegWriter/RawWriter/ImgPackWriter/int): Writer or index
+              of next image file.
+        """
+        #if DEBUG: print("Cam.writeFrame()")
+
+        if self.olLevel is not self.olApplied: self.applyOutLevel(out)
+        if self.crop != None: frame = frame[self.crop] # view; no copy
+        if frame.ndim >= 2 and \
+          self.outSz != (frame.shape[1], frame.shape[0]): # downscale
+            frame = cv2.resize(frame, self.outSz, interpolation=cv2.INTER_AREA)
+        if self.outputFormat in ['video', 'motion']:
+            # write a frame to video; SegWriter writes timestamp sidecar
+            out.write(frame, ts)
+        elif self.outputFormat == 'raw':
+            # timestamps are kept in the frame index of the file
+            out.write(frame, ts)
+        elif isinstance(out, ImgPackWriter):
+            # encode in SnapshotPool; appended in order of frames
+            #   with its timestamps in the index of the pack
+            self.packQ.append((self.ssPool.encode(frame, "."+out.ext,
+                                                  self.imgParams,
+                                                  self.metrics), ts))
+            self.flushPack(out)
+            self.ssMaxDepth = max(self.ssMaxDepth, len(self.packQ))
+        elif self.outputFormat == 'image':
+            # timestamp sidecar; index of image file
+            self.tsFile.write("%i,%.6f,%.6f\n"%(out, ts[0], ts[1]))
+            # file index is decided here, in order of frames
+            if self.isPass: ext = "jpg" # JPEG data from cam
+            else: ext = self.imgExt
+            fp = path.join(ofn, "f%06i.%s"%(out, ext))
+            # save image in SnapshotPool
+            self.ssFutures.append(self.ssPool.submit(fp, frame, self.imgParams,
+                                                     self.metrics))
+            while len(self.ssFutures) > 0 and self.ssFutures[0].done():
+                self.ssFutures.popleft()
+            self.ssMaxDepth = max(self.ssMaxDepth, len(self.ssFutures))
+            out += 1
+        self.nWritten += 1 # counted when it was written (or submitted)
+        return out
+    
+    #-------------------------------------------------------------------
+
+    def applyOutLevel(self, out):
+        """ Apply settings of current overload level to output;
+        JPEG quality of images, frame size and frame rate of video.
+        
+        Args:
+            out (SegWriter/RawWriter/ImgPackWriter/int): Writer or index
+              of image file.
+        
+        Returns:
+            None
+        """
+        if DEBUG: print("Cam.applyOutLevel()")
+
+        lv = self.olLevel
+        self.olApplied = lv
+        self.imgParams = self.getImgParams()
+        self.setOutSize(lv.get("scale", 1.0))
+        if isinstance(out, SegWriter):
+            # frames come at the stepped limit, or slower as before
+            fps = out.manifest["fps"]
+            if self.olFPS > 0 and (fps <= 0 or self.olFPS < fps):
+                fps = self.olFPS
+            out.setFormat(fps, self.outSz)
+    
+    #-------------------------------------------------------------------
+
+    def setOutSize(self, scale=1.0):
+        """ Set region of frame to record ('crop', from 'cropROI') and
+        frame size of output ('outSz'), scaled by 'outScale' and 'scale'.
+        Raw frames and JPEG data of MJPEG passthrough are kept as they are.
+        
+        Args:
+            scale (float): Scale of overload level.
+        
+        Returns:
+            None
+        """
+        if DEBUG: print("Cam.setOutSize()")
+
+        self.crop = None
+        self.outSz = self.fSz
+        if self.isPass or self.outputFormat == 'raw': return
+        w, h = self.fSz
+        if self.cropROI != None:
+            x, y, cw, ch = [int(v) for v in self.cropROI]
+            x = min(max(0, x), w-2)
+            y = min(max(0, y), h-2)
+            # even numbers for video codecs
+            cw = max(2, min(cw, w-x)//2*2)
+            ch = max(2, min(ch, h-y)//2*2)
+            if (cw, ch) != (w, h):
+                self.crop = (slice(y, y+ch), slice(x, x+cw))
+                w, h = cw, ch
+        sc = min(1.0, self.outScale * scale)
+        if sc < 1.0: w, h = max(2, int(w*sc)//2*2), max(2, int(h*sc)//2*2)
+        self.outSz = (w, h)
+    
+    #-------------------------------------------------------------------
+
+    def flushPack(self, out, wait=False):
+        """ Append encoded images to image pack, in order of frames.
+        
+        Args:
+            out (ImgPackWriter): Writer of image pack.
+            wait (bool): Whether to wait for all pending images.
+        
+        Returns:
+            None
+        """
+        #if DEBUG: print("Cam.flushPack()")
+
+        while len(self.packQ) > 0 and (wait or self.packQ[0][0].done()):
+            future, ts = self.packQ.popleft()
+            data = future.result()
+            if data is None: continue # failed; counted in SnapshotPool
+            t = monotonic()
+            out.append(data, ts)
+            self.metrics.observe("pack", monotonic()-t)
+    
+    #-------------------------------------------------------------------
+
+    def getNeedMB(self):
+        """ Return space (MB) which the next file of recording
+        may take at once, such as a pre-allocated raw chunk.
+        
+        Args: None
+        
+        Returns:
+            (float): MB.
+        """
+        if self.outputFormat == 'raw': return self.rawChunkMB
+        if self.outputFormat == 'image' and self.imgSink == 'pack':
+            return self.packChunkMB
+        if self.outputFormat in ['video', 'motion']: return self.segMB
+        return 0
+    
+    #-------------------------------------------------------------------
+
+    def needFailover(self, out):
+        """ Whether current recording should move to another root.
+        SegWriter does it by itself at a segment boundary, so this is
+          for other outputs, which start a new recording on another root.
+          It's checked once a second.
+        
+        Args:
+            out (SegWriter/RawWriter/ImgPackWriter/int): Writer or index
+              of image file.
+        
+        Returns:
+            (bool)
+        """
+        #if DEBUG: print("Cam.needFailover()")
+
+        if self.storage is None or isinstance(out, SegWriter): return False
+        if monotonic()-self.storageChkTime < 1.0: return False
+        self.storageChkTime = monotonic()
+        return self.storage.needFailover(self.recRoot, self.getNeedMB())
+    
+    #-------------------------------------------------------------------
+
+    def startRecording(self, recFolder, exclude=None):
+        """ Prepare output (video/raw writer or image folder) for recording.
+        
+        Args:
+            recFolder (str/OutputRoots): Folder to save recorded
+              videos/images, or output roots to choose a folder from.
+            exclude (None/list): Roots not to choose, such as on
+              failover.
+        
+        Returns:
+            out (SegWriter/RawWriter/ImgPackWriter/int): Writer or index
+              of image file.
+            ofn (str): Output file or folder name.
+        """
+        if DEBUG: print("Cam.startRecording()")
+
+        if exclude == None: exclude = []
+
+        if isinstance(recFolder, OutputRoots):
+            self.storage = recFolder
+            recFolder = recFolder.pick(self.cIdx, self.getNeedMB(), exclude)
+        else:
+            self.storage = None
+        self.recRoot = recFolder
+        self.storageChkTime = monotonic()
+        self.setOutSize(self.olLevel.get("scale", 1.0))
+        cIdx = self.cIdx
+        oFormat = self.outputFormat
+        # Define the codec and create VideoWriter object
+        #fourcc = cv2.VideoWriter_fourcc(*'X264')
+        fourcc = cv2.VideoWriter_fourcc(*'avc1') # for saving mp4 video
+        #fourcc = cv2.VideoWriter_fourcc('x','v','i','d')
+        rec = dict(cam=cIdx, format=oFormat) # log record
+        if oFormat in ['video', 'motion']:
+            ofn = "output_%.2i_%s"%(cIdx, get_time_stamp())
+            ofn = path.join(recFolder, ofn)
+            ofps = self.getOutFPS()
+            # set 'out' as a (segmented) video writer
+            out = SegWriter(ofn, fourcc, ofps, self.outSz,
+                            isColor=not self.grayscale,
+                            segSec=self.segSec,
+                            segMB=self.segMB,
+                            logFile=self.logFile,
+                            cIdx=cIdx,
+                            passthrough=self.isPass,
+                            storage=self.storage)
+            rec.update(file=out.segPath(0), fps=ofps, fpsLimit=self.fpsLimit)
+            if out.isSegmented:
+                rec.update(segSec=self.segSec, segMB=self.segMB)
+        elif oFormat == 'image' and self.imgSink == 'pack':
+            ofn = "output_%.2i_%s"%(cIdx, get_time_stamp())
+            ofn = path.join(recFolder, ofn)
+            if self.isPass: ext = "jpg" # JPEG data from cam
+            else: ext = self.imgExt
+            out = ImgPackWriter(ofn, ext, chunkMB=self.packChunkMB)
+            rec.update(file=out.idxFP, ssIntv=self.ssIntv, imgSink="pack",
+                       chunkMB=self.packChunkMB)
+        elif oFormat == 'image':
+            ofn = "output_%.2i_%s"%(cIdx, get_time_stamp())
+            ofn = path.join(recFolder, ofn)
+            # 'out' is used as an index of a image file
+            out = 1
+            rec.update(file=ofn, ssIntv=self.ssIntv)
+            if not path.isdir(ofn): mkdir(ofn)
+            ### timestamp sidecar
+            self.tsFile = open(path.join(ofn, "timestamps.csv"), "w")
+            self.tsFile.write("frame,monotonic,wallclock\n")
+        elif oFormat == 'raw':
+            ofn = "output_%.2i_%s"%(cIdx, get_time_stamp())
+            ofn = path.join(recFolder, ofn)
+            ofps = self.getOutFPS()
+            out = RawWriter(ofn, self.ring.shape, self.ring.buf.dtype,
+                            fps=ofps,
+                            chunkMB=self.rawChunkMB,
+                            logFile=self.logFile,
+                            cIdx=cIdx)
+            rec.update(file=out.chunkPath(0), fps=ofps,
+                       fpsLimit=self.fpsLimit, chunkMB=self.rawChunkMB,
+                       chunkFrames=out.capacity)
+        if self.isPass: rec["mjpgPass"] = True
+        if self.grayscale: rec["grayscale"] = True
+        if self.crop != None:
+            rec["cropROI"] = [self.crop[1].start, self.crop[0].start,
+                              self.crop[1].stop-self.crop[1].start,
+                              self.crop[0].stop-self.crop[0].start]
+        if self.outSz != self.fSz: rec["outSize"] = list(self.outSz)
+        if self.storage != None: rec["root"] = recFolder
+        if self.olCtrl != None: rec["overloadLevel"] = self.olCtrl.level
+        self.olApplied = None # apply overload level to the new output
+        self.nWritten = 0
+        self.latSum = 0.0; self.latMax = 0.0; self.nLat = 0
+        self.ssMaxDepth = 0; self.ssStart = self.getEncodeStats()
+        self.ringStart = self.ring.getStats(); self.ring.resetPeak()
+        if self.preTrig != None:
+            rec.update(preTrigFrames=len(self.preTrig),
+                       preTrigSec=round(self.preTrig.getDuration(), 3))
+        getLogger(self.logFile).log("rec_start", **rec)
+        return out, ofn
+    
+    #-------------------------------------------------------------------
+
+    def stopRecording(self, out):
+        """ Release output of recording.
+        
+        Args:
+            out (SegWriter/RawWriter/ImgPackWriter/int): Writer or index
+              of image file.
+        
+        Returns:
+            out (None)
+        """
+        if DEBUG: print("Cam.stopRecording()")
+
+        nSeg = 0
+        if isinstance(out, SegWriter):
+            out.release()
+            nSeg = len(out.segments)
+        elif isinstance(out, RawWriter):
+            out.release()
+            nSeg = len(out.chunks)
+        elif isinstance(out, ImgPackWriter):
+            self.flushPack(out, wait=True)
+            out.release()
+            nSeg = len(out.chunks)
+        out = None
+        if self.storage != None: self.storage.release(self.cIdx)
+        if self.tsFile != None:
+            self.tsFile.close()
+            self.tsFile = None
+        ### wait until all images of this cam are written
+        while len(self.ssFutures) > 0: self.ssFutures.popleft().result()
+        ### log
+        rs = self.ring.getStats()
+        j = self.pacer.getJitter()
+        rec = dict(cam=self.cIdx,
+                   format=self.outputFormat,
+                   frames=self.nWritten,
+                   fps=round(self.measuredFPS, 2),
+                   dropOldest=rs["dropOldest"] - \
+                                self.ringStart.get("dropOldest", 0),
+                   dropNewest=rs["dropNewest"] - \
+                                self.ringStart.get("dropNewest", 0),
+                   ringMaxDepth=rs["peakDepth"],
+                   ringLen=self.ringLen,
+                   jitterMeanMS=round(j["meanDev"], 3),
+                   jitterMaxMS=round(j["maxDev"], 3),
+                   driftSec=round(j["drift"], 3)) # log record
+        if self.nLat > 0:
+            rec.update(latMeanMS=round(self.latSum/self.nLat*1000, 3),
+                       latMaxMS=round(self.latMax*1000, 3))
+        if nSeg > 1: rec["segments"] = nSeg
+        if self.olCtrl != None: rec["overloadLevel"] = self.olCtrl.level
+        if self.outputFormat == 'image': # this cam's images only
+            eSum, eN, eFailed = [v - v0 for v, v0 in \
+                                   zip(self.getEncodeStats(), self.ssStart)]
+            if eN > 0: encMS = eSum / eN * 1000
+            else: encMS = 0.0
+            rec.update(imgQueueMaxDepth=self.ssMaxDepth,
+                       imgQueueMax=getSnapshotPool().maxPending,
+                       imgEncMS=round(encMS, 3),
+                       imgFailed=eFailed)
+        getLogger(self.logFile).log("rec_stop", **rec)
+        return out
+    
+    #-------------------------------------------------------------------
+
+    def getOutFPS(self):
+        """ Return frame rate to record in the output.
+        It's the frame rate measured with recent frames; before enough
+          frames are captured, the source's nominal frame rate (not
+          over 'fpsLimit') is used.
+        
+        Args: None
+        
+        Returns:
+            (float): Frame rate.
+        """
+        if DEBUG: print("Cam.getOutFPS()")
+
+        if self.measuredFPS > 0: return round(self.measuredFPS, 2)
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        if fps <= 0: return self.fpsLimit
+        if self.fpsLimit > 0: fps = min(fps, self.fpsLimit)
+        return round(fps, 2)
+    
+    #-------------------------------------------------------------------
+
+    def getEncodeStats(self):
+        """ Return this cam's totals of encoding in SnapshotPool.
+        
+        Args: None
+        
+        Returns:
+            (tuple): Sum of 'encode' time (seconds), number of encoded
+              images and number of failures.
+        """
+        if DEBUG: print("Cam.getEncodeStats()")
+
+        h = self.metrics.hist.get("encode")
+        if h is None: eSum, eN = 0.0, 0
+        else: eSum, eN = h.sum, h.n
+        return (eSum, eN, self.metrics.counters.get("encFailed", 0))
+    
+    #-------------------------------------------------------------------
+
+    def getMetrics(self):
+        """ Return snapshot of per-stage metrics with ring counters.
+        
+        Args: None
+        
+        Returns:
+            snap (dict): Snapshot (see StageMetrics.snapshot).
+        """
+        if DEBUG: print("Cam.getMetrics()")
+
+        snap = self.metrics.snapshot()
+        if self.ring != None:
+            rs = self.ring.getStats()
+            snap["counters"]["dropped"] = rs["dropOldest"] + rs["dropNewest"]
+            snap["counters"]["ringDepth"] = rs["depth"]
+            snap["counters"]["ringMaxDepth"] = rs["maxDepth"]
+        return snap
+    
+    #-------------------------------------------------------------------
+
+    def getSettings(self):
+        """ Return recording settings of this Cam
+        
+        Args: None
+        
+        Returns:
+            settings (dict): Values of attributes in Cam.settingKeys
+        """
+        if DEBUG: print("Cam.getSettings()")
+
+        return dict([(k, getattr(self, k)) for k in self.settingKeys])
+    
+    #-------------------------------------------------------------------
+
+    def setSettings(self, settings):
+        """ Set recording settings of this Cam
+        
+        Args:
+            settings (dict): Values of attributes in Cam.settingKeys
+        
+        Returns:
+            None
+        """
+        if DEBUG: print("Cam.setSettings()")
+
+        for k in settings.keys():
+            if k not in self.settingKeys:
+                raise KeyError("Unknown Cam setting: %s"%(k))
+            setattr(self, k, settings[k])
+        if any([k in self.fmtKeys for k in settings.keys()]) and \
+          self.cap.isOpened():
+            self.applyFormat()
+    
+    #-------------------------------------------------------------------
+
+    def applyFormat(self):
+        """ Request capture format (capFourcc, capWidth, capHeight and
+        capFPS) to cam, then update frame size with a frame read.
+        The format actually set by the driver is logged.
+
+        Args: None
+
+        Returns:
+            fmt (dict): Actual format (see getFormat).
+        """
+        if DEBUG: print("Cam.applyFormat()")
+
+        if self.capFourcc == "" and self.capWidth <= 0 and \
+          self.capHeight <= 0 and self.capFPS <= 0:
+            return self.getFormat() # nothing requested
+        cap = self.cap
+        # pixel format first; some sizes are available only in MJPG
+        if self.capFourcc != "":
+            cap.set(cv2.CAP_PROP_FOURCC,
+                    cv2.VideoWriter_fourcc(*self.capFourcc))
+        if self.capWidth > 0: cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.capWidth)
+        if self.capHeight > 0:
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.capHeight)
+        if self.capFPS > 0: cap.set(cv2.CAP_PROP_FPS, self.capFPS)
+        for i in range(10):
+            ret, frame = cap.read()
+            if ret == True:
+                self.initFrame = frame
+                self.fSz = (frame.shape[1], frame.shape[0])
+                break
+            sleep(0.01)
+        fmt = self.getFormat()
+        req = dict(width=self.capWidth, height=self.capHeight,
+                   fps=self.capFPS, fourcc=self.capFourcc)
+        # requested values which the driver didn't take
+        diff = [k for k, v in req.items() if v not in [0, ""] and \
+                  (fmt[k] != v if k != "fps" else abs(fmt[k]-v) > 0.5)]
+        if diff != []:
+            print("[c%.2i] Capture format %s was requested; got %s."%(
+                    self.cIdx, str(req), str(fmt)))
+        getLogger(self.logFile).log("cap_format", cam=self.cIdx,
+                                    requested=req, actual=fmt,
+                                    notApplied=diff)
+        return fmt
+    
+    #-------------------------------------------------------------------
+
+    def getFormat(self):
+        """ Return current capture format.
+
+        Args: None
+
+        Returns:
+            (dict): 'width', 'height', 'fps' (the driver's value;
+              'fpsLimit' when the driver doesn't report it) and 'fourcc'.
+        """
+        if DEBUG: print("Cam.getFormat()")
+
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        if fps <= 0: fps = self.fpsLimit
+        return dict(width=self.fSz[0],
+                    height=self.fSz[1],
+                    fps=round(fps, 3),
+                    fourcc=fourccToStr(self.cap.get(cv2.CAP_PROP_FOURCC)))
+    
+    #-------------------------------------------------------------------
+
+    def getFrameShape(self):
+        """ Return shape of frames passed from capture stage.
+
+        Args: None
+
+        Returns:
+            (tuple): (height, width, 3), or (height, width) in grayscale.
+        """
+        if self.grayscale: return (self.fSz[1], self.fSz[0])
+        return (self.fSz[1], self.fSz[0], 3)
+    
+    #-------------------------------------------------------------------
+
+    def getImgParams(self):
+        """ Return parameters for cv2.imwrite
+        
+        Args: None
+        
+        Returns:
+            params (list): Parameters for cv2.imwrite
+        """
+        if DEBUG: print("Cam.getImgParams()")
+
+        if self.imgExt.lower() in ["jpg", "jpeg"]:
+            # quality may be capped by overload level
+            q = min(self.jpgQuality, self.olLevel.get("jpgQuality", 100))
+            params = [cv2.IMWRITE_JPEG_QUALITY, int(q)]
+        elif self.imgExt.lower() == "png":
+            params = [cv2.IMWRITE_PNG_COMPRESSION, int(self.pngCompression)]
+        else:
+            params = []
+        return params
+    
+    #-------------------------------------------------------------------
+
+    def open(self):
+        """ (Re-)open VideoCapture of this Cam
+        
+        Args: None
+        
+        Returns: None
+        """
+        if DEBUG: print("Cam.open()")
+
+        if not self.cap.isOpened():
+            self.cap = openSource(self.src)
+            self.applyFormat()
+    
+    #-------------------------------------------------------------------
+
+    def close(self):
+        """ Release VideoCapture of this Cam
+        
+        Args: None
+        
+        Returns: None
+        """
+        if DEBUG: print("Cam.close()")
+
+        self.cap.release()
+    
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+class CamSyncGroup:
+    """ Synchronized capture of multiple Cams.
+    A coordinator thread calls grab() on all cams back-to-back, so that
+      exposures of a frame set are as close as possible in time,
+      then retrieve() (decoding) and the rest of capture stage of each
+      cam (Cam.procFrame) run in parallel in a thread pool.
+    'rec_init' and 'rec_stop' are applied to all cams in the same round,
+      so every writer starts at the same frame set (barrier).
+    Inter-camera skew (max. minus min. of grab timestamps) of each frame
+      set is saved in a CSV file while recording.
+
+    Args:
+        cams (list): Cam instances.
+        mbs (list): FrameMailbox of each cam.
+        recFolder (str/OutputRoots): Folder to save recorded
+          videos/images, or output roots to choose a folder from.
+        logFile (str): Log file.
+        fpsLimit (int): Frame rate limit of the group; -1 for no limit.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self, cams, mbs, recFolder, logFile, fpsLimit=-1):
+        if DEBUG: print("CamSyncGroup.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.cams = list(cams) # Cam instances
+        self.mbs = list(mbs) # mailbox of each cam
+        self.recFolder = recFolder # folder to save recordings
+        self.logFile = logFile # log file
+        self.q2t = queue.Queue() # queue to the coordinator thread
+        self.pacer = FramePacer(fpsLimit) # pacer shared by all cams
+        self.skew = deque(maxlen=300) # recent skews (in seconds)
+        self.recSkew = [] # skews of frame sets while recording
+        self.skewFile = None # file object of skew CSV
+        self.nSets = 0 # number of frame sets written in the skew CSV
+        self.th = None # coordinator thread
+        self.metrics = StageMetrics("sync") # metrics of the group
+        ##### end of setting up attributes -----
+
+    #-------------------------------------------------------------------
+
+    def start(self):
+        if DEBUG: print("CamSyncGroup.start()")
+        self.th = Thread(target=self.run)
+        self.th.start()
+
+    #-------------------------------------------------------------------
+
+    def join(self, timeout=None):
+        if DEBUG: print("CamSyncGroup.join()")
+        self.th.join(timeout)
+
+    #-------------------------------------------------------------------
+
+    def run(self):
+        """ Function for the coordinator thread.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("CamSyncGroup.run()")
+
+        camPacers = [cam.pacer for cam in self.cams]
+        for cam in self.cams:
+            cam.pacer = self.pacer # jitter of the group is reported by cams
+            cam.initCapture(self.recFolder)
+        nCam = len(self.cams)
+        pool = ThreadPoolExecutor(max_workers=nCam)
+        fpsRecTime = time()
+        isRecording = False
+
+        ##### [begin] infinite loop of thread -----
+        while True:
+
+            t = monotonic()
+            self.pacer.wait() # sleep until the deadline of the next set
+            self.metrics.observe("wait", monotonic()-t)
+
+            ### process queue message (q2t)
+            if self.q2t.empty() == False:
+                try: q2tMsg = self.q2t.get(False)
+                except: q2tMsg = ""
+                if q2tMsg == "quit": break
+                if q2tMsg == 'rec_init' and not isRecording:
+                    self.startSkewLog()
+                    isRecording = True
+                elif q2tMsg == 'rec_stop' and isRecording:
+                    self.stopSkewLog()
+                    isRecording = False
+                for cam in self.cams: cam.procMsg(q2tMsg)
+
+            ### grab frames of all cams back-to-back
+            ts = []
+            ret = True
+            for cam in self.cams:
+                t = monotonic()
+                ret = cam.cap.grab() and ret
+                ts.append((monotonic(), time()))
+                cam.metrics.observe("grab", ts[-1][0]-t)
+            if not ret: break
+
+            ### retrieve (decode) and process frames in parallel
+            futures = []
+            for i in range(nCam):
+                futures.append(pool.submit(self.retrieve, i, ts[i]))
+            if not all([f.result() for f in futures]): break
+
+            ### skew of this frame set
+            monoTS = [t[0] for t in ts]
+            skew = max(monoTS) - min(monoTS)
+            self.skew.append(skew)
+            self.metrics.observe("skew", skew)
+            if isRecording: self.writeSkew(ts, skew)
+            if time()-fpsRecTime > 1:
+                print("[sync] Skew(ms): mean %.3f, max %.3f"%(
+                        np.mean(self.skew)*1000, np.max(self.skew)*1000))
+                fpsRecTime = time()
+        ##### [end] infinite loop of thread -----
+
+        if isRecording: self.stopSkewLog()
+        pool.shutdown()
+        for i, cam in enumerate(self.cams):
+            cam.endCapture()
+            cam.pacer = camPacers[i]
+
+    #-------------------------------------------------------------------
+
+    def retrieve(self, i, ts):
+        """ Retrieve a grabbed frame of a cam and process it.
+
+        Args:
+            i (int): Index of cam in this group.
+            ts (tuple): Monotonic and wall-clock timestamps of grab.
+
+        Returns:
+            (bool): Whether the frame was retrieved.
+        """
+        #if DEBUG: print("CamSyncGroup.retrieve()")
+
+        t = monotonic()
+        ret, frame = self.cams[i].cap.retrieve()
+        self.cams[i].metrics.observe("retrieve", monotonic()-t)
+        if not ret: return False
+        self.cams[i].procFrame(frame, ts, self.mbs[i])
+        return True
+
+    #-------------------------------------------------------------------
+
+    def startSkewLog(self):
+        """ Open CSV file to store skew of each frame set.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("CamSyncGroup.startSkewLog()")
+
+        ofn = "sync_%s_skew.csv"%(get_time_stamp().replace(":", ""))
+        if isinstance(self.recFolder, OutputRoots):
+            ofn = path.join(self.recFolder.pick(), ofn)
+        else:
+            ofn = path.join(self.recFolder, ofn)
+        self.skewFile = open(ofn, "w")
+        header = "set,mono,wall,skew_ms"
+        for cam in self.cams: header += ",c%.2i_ms"%(cam.cIdx)
+        self.skewFile.write(header + "\n")
+        self.recSkew = []
+        self.nSets = 0
+
+    #-------------------------------------------------------------------
+
+    def writeSkew(self, ts, skew):
+        """ Write skew of a frame set into CSV file.
+        Offset of each cam is from the first grab of the set.
+
+        Args:
+            ts (list): Timestamps (monotonic, wall-clock) of each cam.
+            skew (float): Skew of the set in seconds.
+
+        Returns:
+            None
+        """
+        #if DEBUG: print("CamSyncGroup.writeSkew()")
+
+        if self.nSets == 0:
+        # the first set; barrier timestamp of all writers
+            getLogger(self.logFile).log("sync_rec_start",
+                                        cams=[cam.cIdx for cam in self.cams],
+                                        barrierMono=ts[0][0],
+                                        barrierWall=ts[0][1])
+        line = "%i,%.6f,%.6f,%.3f"%(self.nSets, ts[0][0], ts[0][1], skew*1000)
+        for t in ts: line += ",%.3f"%((t[0]-ts[0][0])*1000)
+        self.skewFile.write(line + "\n")
+        self.recSkew.append(skew)
+        self.nSets += 1
+
+    #-------------------------------------------------------------------
+
+    def stopSkewLog(self):
+        """ Close CSV file of skew and log skew statistics.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("CamSyncGroup.stopSkewLog()")
+
+        self.skewFile.close()
+        self.skewFile = None
+        rec = dict(cams=[cam.cIdx for cam in self.cams],
+                   frameSets=self.nSets) # log record
+        if self.recSkew != []:
+            rec.update(skewMeanMS=round(np.mean(self.recSkew)*1000, 3),
+                       skewMaxMS=round(np.max(self.recSkew)*1000, 3))
+        getLogger(self.logFile).log("sync_rec_stop", **rec)
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+if __name__ == '__main__':
+    pass
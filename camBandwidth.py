@@ -0,0 +1,181 @@
+# coding: UTF-8
+"""
+USB bandwidth planner of pyCamRec.
+It estimates the bus bandwidth of capture formats (resolution, frame
+  rate and pixel format) of cams sharing a USB bus, and finds
+  downgraded formats which fit in the bus when it's over-subscribed.
+
+Estimates are rough; uncompressed formats are exact payload sizes,
+  while compressed ones (MJPG, H264) are a fixed fraction of YUYV.
+  Cams with their own bus (virtual sources) aren't limited.
+
+Dependency:
+    Python (3.7)
+
+Changelog
+------------------------------------------------------------------------
+v.0.1: (2026.10.17)
+  - Initial development.
+"""
+
+DEBUG = False
+__version__ = "0.1"
+
+# bytes per pixel of pixel formats (FourCC)
+BYTES_PER_PIXEL = {"YUYV": 2.0, "YUY2": 2.0, "UYVY": 2.0,
+                   "RGB3": 3.0, "BGR3": 3.0,
+                   "NV12": 1.5, "I420": 1.5, "YU12": 1.5,
+                   "GREY": 1.0, "Y800": 1.0,
+                   "MJPG": 2.0*0.2, # estimated compression from YUYV
+                   "H264": 2.0*0.05}
+COMPRESSED = ["MJPG", "H264"] # compressed pixel formats
+BUS_MBPS = 48.0 # usable (isochronous) MB/s of a USB 2.0 bus
+SIZES = [(3840, 2160), (2560, 1440), (1920, 1080), (1280, 720),
+         (1024, 768), (800, 600), (640, 480), (424, 240),
+         (320, 240)] # frame sizes to step down
+FPS_STEPS = [120, 90, 60, 30, 25, 20, 15, 10, 5] # frame rates to step down
+MIN_SIZE = (640, 480) # size not to go below before lowering frame rate
+MIN_FPS = 15 # frame rate not to go below before lowering size further
+
+#=======================================================================
+
+def estimateMBps(fmt):
+    """ Estimate bandwidth of a capture format.
+
+    Args:
+        fmt (dict): 'width', 'height', 'fps' and 'fourcc'.
+
+    Returns:
+        (float): MB/s.
+
+    Examples:
+        >>> estimateMBps(dict(width=1280, height=720, fps=30, fourcc="YUYV"))
+        55.296
+    """
+    #if DEBUG: print("camBandwidth.estimateMBps()")
+
+    bpp = BYTES_PER_PIXEL.get(fmt["fourcc"].upper(), 2.0) # YUYV if unknown
+    return fmt["width"] * fmt["height"] * bpp * fmt["fps"] / 1e6
+
+#-----------------------------------------------------------------------
+
+def downgrade(fmt):
+    """ Return the next lower format of a capture format.
+    Order of steps; an uncompressed format to MJPG,
+      frame size down to MIN_SIZE, frame rate down to MIN_FPS,
+      then frame size and frame rate further.
+
+    Args:
+        fmt (dict): 'width', 'height', 'fps' and 'fourcc'.
+
+    Returns:
+        (None/dict): Downgraded format; None when it can't go lower.
+    """
+    if DEBUG: print("camBandwidth.downgrade()")
+
+    new = dict(fmt)
+    if not fmt["fourcc"].upper() in COMPRESSED:
+        new["fourcc"] = "MJPG"
+        return new
+    area = fmt["width"] * fmt["height"]
+    smaller = [sz for sz in SIZES if sz[0]*sz[1] < area]
+    lower = [f for f in FPS_STEPS if f < fmt["fps"]]
+    minArea = MIN_SIZE[0] * MIN_SIZE[1]
+    if smaller != [] and smaller[0][0]*smaller[0][1] >= minArea:
+        new["width"], new["height"] = smaller[0]
+    elif lower != [] and lower[0] >= MIN_FPS:
+        new["fps"] = lower[0]
+    elif smaller != []:
+        new["width"], new["height"] = smaller[0]
+    elif lower != []:
+        new["fps"] = lower[0]
+    else:
+        return None
+    return new
+
+#-----------------------------------------------------------------------
+
+def planBandwidth(cams, busMBps=None, policy="warn"):
+    """ Check total bandwidth of cams on each bus; with 'downgrade'
+    policy, formats of the most demanding cam on an over-subscribed
+    bus are lowered step by step until the bus fits.
+
+    Args:
+        cams (list): Dict of each cam; 'cIdx', 'bus' (name of bus;
+          empty string for a cam which doesn't use a bus) and
+          'width', 'height', 'fps', 'fourcc' (requested format).
+        busMBps (None/dict): Usable MB/s of each bus name;
+          BUS_MBPS for a bus not in it (or for all buses with None).
+        policy (str): 'warn' (only report) or 'downgrade'.
+
+    Returns:
+        plan (dict): 'cams' (list of dict; 'cIdx', 'bus', 'requested',
+          'planned' (format), 'MBps'), 'buses' (dict of bus name;
+          'MBps' (total planned), 'limit', 'requestedMBps'),
+          'over' (names of buses still over the limit) and
+          'changed' (indices of cams whose format was downgraded).
+
+    Examples:
+        >>> cams = [dict(cIdx=i, bus="usb1", width=1280, height=720,
+        ...              fps=30, fourcc="YUYV") for i in range(2)]
+        >>> plan = planBandwidth(cams, policy="downgrade")
+        >>> plan["over"], plan["cams"][0]["planned"]["fourcc"]
+        ([], 'MJPG')
+    """
+    if DEBUG: print("camBandwidth.planBandwidth()")
+
+    if busMBps == None: busMBps = {}
+
+    fmtKeys = ["width", "height", "fps", "fourcc"]
+    pCams = []
+    for c in cams:
+        fmt = dict([(k, c[k]) for k in fmtKeys])
+        pCams.append(dict(cIdx=c["cIdx"],
+                          bus=c["bus"],
+                          requested=fmt,
+                          planned=dict(fmt),
+                          MBps=estimateMBps(fmt)))
+    buses = {}
+    for c in pCams:
+        if c["bus"] == "": continue
+        b = buses.setdefault(c["bus"],
+                             dict(MBps=0.0,
+                                  limit=busMBps.get(c["bus"], BUS_MBPS),
+                                  requestedMBps=0.0))
+        b["MBps"] += c["MBps"]
+        b["requestedMBps"] += c["MBps"]
+    if policy == "downgrade":
+        for name, b in buses.items():
+            while b["MBps"] > b["limit"]:
+                onBus = [c for c in pCams if c["bus"] == name]
+                for c in sorted(onBus, key=lambda c: -c["MBps"]):
+                    new = downgrade(c["planned"])
+                    if new != None: break
+                if new == None: break # nothing can go lower
+                b["MBps"] -= c["MBps"]
+                c["planned"] = new
+                c["MBps"] = estimateMBps(new)
+                b["MBps"] += c["MBps"]
+    over = sorted([name for name, b in buses.items() if b["MBps"] > b["limit"]])
+    changed = [c["cIdx"] for c in pCams if c["planned"] != c["requested"]]
+    return dict(cams=pCams, buses=buses, over=over, changed=changed)
+
+#-----------------------------------------------------------------------
+
+def fourccToStr(fourcc):
+    """ Convert FourCC code (as from CAP_PROP_FOURCC) to a string.
+
+    Args:
+        fourcc (int/float): FourCC code.
+
+    Returns:
+        (str): FourCC such as 'MJPG'; empty string for 0.
+    """
+    fourcc = int(fourcc)
+    if fourcc <= 0: return ""
+    return "".join([chr((fourcc >> 8*i) & 0xFF) for i in range(4)])
+
+#=======================================================================
+
+if __name__ == '__main__':
+    pass
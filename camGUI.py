@@ -0,0 +1,922 @@
+# coding: UTF-8
+"""
+GUI (wxPython) of pyCamRec; CamRecFrame and CamRecApp.
+It's imported only when pyCamRec runs with GUI, so that headless mode
+  doesn't need wxPython.
+
+Dependency:
+    wxPython (4.0)
+    NumPy (1.14)
+    OpenCV (3.4)
+
+Changelog
+------------------------------------------------------------------------
+v.0.1: (2026.10.17)
+  - Moved from pyCamRec.py.
+"""
+
+from copy import copy
+from datetime import timedelta
+from time import time, monotonic
+
+import cv2, wx, wx.adv
+import wx.lib.scrolledpanel as SPanel
+import numpy as np
+
+from fFuncNClasses import getWXFonts
+from fFuncNClasses import setupStaticText, updateFrameSize
+from fFuncNClasses import str2num, add2gbs
+from recEngine import RecorderEngine
+from camMetrics import StageMetrics, summarize
+from camPipeline import TileCompositor
+
+DEBUG = False
+__version__ = "0.1"
+
+#=======================================================================
+
+class CamRecFrame(wx.Frame):
+    """ Frame for CamRecApp
+    
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self):
+        if DEBUG: print("CamRecFrame.__init__()")
+
+        ### init frame
+        w_pos = [0, 25]
+        wg = wx.Display(0).GetGeometry()
+        wSz = (wg[2], int(wg[3]*0.9))
+        wx.Frame.__init__(
+              self,
+              None,
+              -1,
+              "pyCamRec v.%s"%(__version__),
+              pos = tuple(w_pos),
+              size = tuple(wSz),
+              style=wx.DEFAULT_FRAME_STYLE^(wx.RESIZE_BORDER|wx.MAXIMIZE_BOX),
+                         )
+        self.SetBackgroundColour('#333333')
+
+        ### set app icon
+        self.tbIcon = wx.adv.TaskBarIcon(iconType=wx.adv.TBI_DOCK)
+        icon = wx.Icon("icon.ico")
+        self.tbIcon.SetIcon(icon)
+        
+        ##### [begin] class attributes -----
+        self.logFile = "pCR_log.jsonl"
+        self.recFolder = "recordings"
+        self.w_pos = w_pos # window position
+        self.wSz = wSz # window size
+        self.fonts = getWXFonts(initFontSz=8, numFonts=3)
+        # engine for cams and recording
+        self.engine = RecorderEngine(self.logFile, self.recFolder, maxNCam=4)
+        self.cams = self.engine.cams # Cam class instances
+        self.cIndices = self.engine.cIndices # indices of cams
+        if self.cIndices == []:
+            msg = "No usable cams is attached."
+            wx.MessageBox(msg, 'Info', wx.OK | wx.ICON_INFORMATION)
+            self.Destroy()
+        pi = self.setPanelInfo()
+        self.pi = pi # pnael information
+        self.gbs = {} # for GridBagSizer
+        self.panel = {} # panels
+        self.timer = {} # timers
+        self.oCIdx = [] # opened cam indices
+        self.nCOnSide = 0 # number of cam images on one side
+        # each cam's frame size for displaying
+        dCSz = copy(pi["rp"]["sz"]) # frame size of a cam for displaying
+        self.dispCSz = dCSz
+        # compositor of cam images into a persistent RGB buffer
+        self.comp = TileCompositor(dCSz)
+        # bitmap for displaying cam images, updated from 'comp.rgb'
+        self.dispBmp = wx.Bitmap.FromBuffer(dCSz[0], dCSz[1], self.comp.rgb)
+        self.rDur_sTxt = None # for showing recording duration
+        self.preview_sBmp = None # for showing preview of selected cam
+        self.previewImg = None # preview image (RGB) of selected cam
+        self.previewCIdx = -1 # index of cam in preview
+        self.roiDragPt = None # point where dragging on preview started
+        self.disp_sBmp = None # for showing recording view of cam(s)
+        self.dispImgRefreshIntv = 50 # Interval to refresh the combined frame
+          # images from each cam.
+        self.metrics = StageMetrics("gui") # metrics of compositing
+        self.engine.extMetrics.append(self.metrics)
+        self.prevSnaps = [] # previous metrics snapshots for status-bar
+        ##### [end] class attributes -----
+
+        ### create panels
+        for pk in pi.keys():
+            self.panel[pk] = SPanel.ScrolledPanel(
+                                                  self,
+                                                  name="%s_panel"%(pk),
+                                                  pos=pi[pk]["pos"],
+                                                  size=pi[pk]["sz"],
+                                                  style=pi[pk]["style"],
+                                                 )
+            self.panel[pk].SetBackgroundColour(pi[pk]["bgCol"])
+
+        ##### beginning of setting up UI panel interface -----
+        bw = 5 # border width for GridBagSizer
+        nCol = 4 # number columns
+        uiSz = pi["ui"]["sz"]
+        hlSz = (int(uiSz[0]*0.95), -1) # size of horizontal line separator
+        self.gbs["ui"] = wx.GridBagSizer(0,0)
+        row = 0
+        col = 0
+        sTxt = setupStaticText(
+                            self.panel["ui"],
+                            "Cam index: ",
+                            font=self.fonts[2],
+                            )
+        add2gbs(self.gbs["ui"], sTxt, (row,col), (1,1))
+        col += 1
+        _choices = [str(x) for x in self.cIndices]
+        _choices.insert(0, '')
+        cho = wx.Choice(
+                            self.panel["ui"],
+                            -1,
+                            name="camIdx_cho",
+                            choices=_choices,
+                       )
+        cho.Bind(wx.EVT_CHOICE, self.onChoice)
+        cho.SetSelection(0)
+        add2gbs(self.gbs["ui"], cho, (row,col), (1,1))
+        row += 1; col = 0
+        sTxt = setupStaticText(
+                            self.panel["ui"],
+                            "Initial frame image:",
+                            font=self.fonts[2],
+                            )
+        add2gbs(self.gbs["ui"], sTxt, (row,col), (1,nCol))
+        row += 1; col = 0
+        ### set up staticBitmap for preview
+        w = int(uiSz[0]*0.95)
+        h = int(w/1.333)
+        sBmp = wx.StaticBitmap(self.panel["ui"], -1, size=(w,h))
+        img = wx.Image(w, h)
+        img.SetData(np.zeros((h,w,3),dtype=np.uint8).tostring())
+        sBmp.SetBitmap(img.ConvertToBitmap())
+        ### drag to set region to record (cropROI) of selected cam
+        sBmp.Bind(wx.EVT_LEFT_DOWN, self.onPreviewMouse)
+        sBmp.Bind(wx.EVT_MOTION, self.onPreviewMouse)
+        sBmp.Bind(wx.EVT_LEFT_UP, self.onPreviewMouse)
+        sBmp.Bind(wx.EVT_RIGHT_UP, self.onPreviewMouse)
+        self.preview_sBmp = sBmp
+        add2gbs(self.gbs["ui"], sBmp, (row,col), (1,nCol))
+        row += 1; col = 0
+        sTxt = setupStaticText(
+                            self.panel["ui"],
+                            "Drag on the image to set region to record;"
+                              " right-click to clear.",
+                            font=self.fonts[1],
+                            wrapWidth=int(uiSz[0]*0.95),
+                            )
+        add2gbs(self.gbs["ui"], sTxt, (row,col), (1,nCol))
+        row += 1; col = 0
+        sTxt = setupStaticText(
+                            self.panel["ui"],
+                            "Output scale: ",
+                            font=self.fonts[2],
+                            )
+        add2gbs(self.gbs["ui"], sTxt, (row,col), (1,2))
+        col += 2
+        spin = wx.SpinCtrlDouble(
+                            self.panel["ui"],
+                            -1,
+                            size=(75,-1),
+                            min=0.1,
+                            max=1.0,
+                            initial=1.0,
+                            inc=0.05, # increment
+                            name='outScale_spin',
+                            style=wx.SP_ARROW_KEYS|wx.SP_WRAP,
+                          )
+        add2gbs(self.gbs["ui"], spin, (row,col), (1,1))
+        row += 1; col = 0
+        chk = wx.CheckBox(
+                            self.panel["ui"],
+                            -1,
+                            label="Grayscale",
+                            name="grayscale_chk",
+                         )
+        add2gbs(self.gbs["ui"], chk, (row,col), (1,2))
+        row += 1; col = 0
+        sTxt = setupStaticText(
+                            self.panel["ui"],
+                            "Output format: ",
+                            font=self.fonts[2],
+                            )
+        add2gbs(self.gbs["ui"], sTxt, (row,col), (1,1))
+        col += 1
+        cho = wx.Choice(
+                            self.panel["ui"],
+                            -1,
+                            name="outputFormat_cho",
+                            choices=['video', 'image', 'motion', 'raw'],
+                       )
+        cho.Bind(wx.EVT_CHOICE, self.onChoice)
+        cho.SetSelection(0)
+        add2gbs(self.gbs["ui"], cho, (row,col), (1,1))
+        row += 1; col = 0
+        sTxt = setupStaticText(
+                            self.panel["ui"],
+                            "Capture backend: ",
+                            font=self.fonts[2],
+                            )
+        add2gbs(self.gbs["ui"], sTxt, (row,col), (1,1))
+        col += 1
+        cho = wx.Choice(
+                            self.panel["ui"],
+                            -1,
+                            name="camBackend_cho",
+                            choices=['thread', 'process'],
+                       )
+        cho.SetSelection(0)
+        add2gbs(self.gbs["ui"], cho, (row,col), (1,1))
+        row += 1; col = 0
+        sTxt = setupStaticText(
+                            self.panel["ui"],
+                            "Video FPS upper limit: ",
+                            font=self.fonts[2],
+                            )
+        add2gbs(self.gbs["ui"], sTxt, (row,col), (1,2))
+        col += 2
+        spin = wx.SpinCtrl(
+                            self.panel["ui"],
+                            -1,
+                            size=(75,-1),
+                            min=1,
+                            max=60,
+                            initial=15,
+                            name='videoFPSlimit_spin',
+                            style=wx.SP_ARROW_KEYS|wx.SP_WRAP,
+                          )
+        add2gbs(self.gbs["ui"], spin, (row,col), (1,1))
+        row += 1; col = 0
+        sTxt = setupStaticText(
+                            self.panel["ui"],
+                            "Image capture interval (seconds): ",
+                            font=self.fonts[2],
+                            )
+        add2gbs(self.gbs["ui"], sTxt, (row,col), (1,2))
+        col += 2
+        spin = wx.SpinCtrlDouble(
+                            self.panel["ui"],
+                            -1,
+                            size=(75,-1),
+                            min=0.04, # min; 25 fps
+                            max=3600,
+                            initial=0.5,
+                            inc=1, # increment
+                            name='ssIntv_spin',
+                            style=wx.SP_ARROW_KEYS|wx.SP_WRAP,
+                          )
+        spin.Disable()
+        add2gbs(self.gbs["ui"], spin, (row,col), (1,1))
+        row += 1; col = 0
+        sTxt = setupStaticText(
+                            self.panel["ui"],
+                            "Pre-trigger buffer (seconds): ",
+                            font=self.fonts[2],
+                            )
+        add2gbs(self.gbs["ui"], sTxt, (row,col), (1,2))
+        col += 2
+        spin = wx.SpinCtrlDouble(
+                            self.panel["ui"],
+                            -1,
+                            size=(75,-1),
+                            min=0,
+                            max=60,
+                            initial=0,
+                            inc=1, # increment
+                            name='preTrig_spin',
+                            style=wx.SP_ARROW_KEYS|wx.SP_WRAP,
+                          )
+        add2gbs(self.gbs["ui"], spin, (row,col), (1,1))
+        row += 1; col = 0
+        btn = wx.Button(
+                            self.panel["ui"],
+                            -1,
+                            label="Add",
+                            name="addCam_btn",
+                            size=(int(uiSz[0]*0.463),-1),
+                       )
+        btn.Bind(wx.EVT_LEFT_DOWN, self.onButtonPressDown)
+        btn.Disable()
+        add2gbs(self.gbs["ui"], btn, (row,col), (1,1))
+        col += 1
+        btn = wx.Button(
+                            self.panel["ui"],
+                            -1,
+                            label="Remove",
+                            name="remCam_btn",
+                            size=(int(uiSz[0]*0.463),-1),
+                       )
+        btn.Bind(wx.EVT_LEFT_DOWN, self.onButtonPressDown)
+        btn.Disable()
+        add2gbs(self.gbs["ui"], btn, (row,col), (1,2))
+        row += 1; col = 0
+        btn = wx.Button(
+                            self.panel["ui"],
+                            -1,
+                            label="Remove all cams",
+                            name="remAllCam_btn",
+                            size=(int(uiSz[0]*0.95),-1),
+                       )
+        btn.Bind(wx.EVT_LEFT_DOWN, self.onButtonPressDown)
+        add2gbs(self.gbs["ui"], btn, (row,col), (1,nCol))
+        row += 1; col = 0
+        sTxt = setupStaticText(
+                            self.panel["ui"],
+                            "Cams to record (Cam index [output-format(/FPS-limit when video or motion, /interval when image)]):",
+                            font=self.fonts[1],
+                            wrapWidth=int(uiSz[0]*0.95),
+                            )
+        add2gbs(self.gbs["ui"], sTxt, (row,col), (1,nCol))
+        row += 1; col = 0
+        sTxt = setupStaticText(
+                            self.panel["ui"],
+                            "[]",
+                            font=self.fonts[1],
+                            name="openCI_sTxt",
+                            )
+        add2gbs(self.gbs["ui"], sTxt, (row,col), (1,nCol))
+        row += 1; col = 0
+        add2gbs(self.gbs["ui"],
+                wx.StaticLine(self.panel["ui"],
+                              -1,
+                              size=hlSz,
+                              style=wx.LI_HORIZONTAL),
+                (row,col),
+                (1,nCol)) # horizontal line separator
+        row += 1; col = 0
+        btn = wx.Button(
+                            self.panel["ui"],
+                            -1,
+                            label="start Recording",
+                            name="toggleRec_btn",
+                            size=(int(uiSz[0]*0.95), -1),
+                       )
+        btn.Bind(wx.EVT_LEFT_DOWN, self.onButtonPressDown)
+        btn.Disable()
+        add2gbs(self.gbs["ui"], btn, (row,col), (1,nCol))
+        row += 1; col = 0
+        sTxt = setupStaticText(
+                            self.panel["ui"],
+                            "Recording duration: ",
+                            font=self.fonts[2],
+                            )
+        add2gbs(self.gbs["ui"], sTxt, (row,col), (1,1))
+        col += 1
+        sTxt = setupStaticText(
+                            self.panel["ui"],
+                            "0:00:00",
+                            font=self.fonts[2],
+                            fgColor="#ccccff",
+                            bgColor="#000000",
+                            )
+        self.rDur_sTxt = sTxt
+        add2gbs(self.gbs["ui"], sTxt, (row,col), (1,nCol-1))
+        self.panel["ui"].SetSizer(self.gbs["ui"])
+        self.gbs["ui"].Layout()
+        self.panel["ui"].SetupScrolling()
+        ##### end of setting up UI panel interface -----
+
+        ##### beginning of setting up recording panel interface -----
+        bw = 5 # border width for GridBagSizer
+        self.gbs["rp"] = wx.GridBagSizer(0,0)
+        row = 0
+        col = 0
+        sBmp = wx.StaticBitmap(self.panel["rp"], -1, size=pi["rp"]["sz"])
+        self.disp_sBmp = sBmp
+        self.panel["rp"].SetSizer(self.gbs["rp"])
+        self.gbs["rp"].Layout()
+        self.panel["rp"].SetupScrolling()
+        ##### end of setting up recording panel interface -----
+
+        ### set up menu
+        menuBar = wx.MenuBar()
+        fileRenMenu = wx.Menu()
+        quit = fileRenMenu.Append(
+                            wx.Window.NewControlId(),
+                            item="Quit\tCTRL+Q",
+                                 )
+        menuBar.Append(fileRenMenu, "&pyCamRec")
+        self.SetMenuBar(menuBar)
+
+        ### set up hot keys
+        idQuit = wx.Window.NewControlId()
+        self.Bind(wx.EVT_MENU, self.onClose, id=idQuit)
+        accel_tbl = wx.AcceleratorTable([
+                                    (wx.ACCEL_CMD,  ord('Q'), idQuit),
+                                        ])
+        self.SetAcceleratorTable(accel_tbl)
+
+        ### set up status-bar
+        self.statusbar = self.CreateStatusBar(1)
+        self.sbBgCol = self.statusbar.GetBackgroundColour()
+        self.timer["sbTimer"] = wx.Timer(self) # for metrics summary
+        self.Bind(wx.EVT_TIMER,
+                  lambda event: self.onTimer(event, "sbTimer"),
+                  self.timer["sbTimer"])
+        self.timer["sbTimer"].Start(1000)
+
+        updateFrameSize(self, wSz)
+        self.Bind(wx.EVT_CLOSE, self.onClose)
+    
+    #-------------------------------------------------------------------
+
+    def setPanelInfo(self):
+        """ Set up panel information.
+        
+        Args:
+            None
+        
+        Returns:
+            pi (dict): Panel information.
+        """
+        if DEBUG: print("CamRecFrame.setPanelInfo()")
+        
+        wSz = self.wSz # window size
+        pi = {} # panel information to return
+        # top panel for UI
+        pi["ui"] = dict(pos=(0, 0),
+                        sz=(int(wSz[0]*0.25), wSz[1]),
+                        bgCol="#cccccc",
+                        style=wx.TAB_TRAVERSAL|wx.SUNKEN_BORDER)
+        uiSz = pi["ui"]["sz"]
+        # panel for showing recorded image
+        w = wSz[0] - uiSz[0]
+        h = int(w / 1.333)
+        pi["rp"] = dict(pos=(uiSz[0], 0),
+                        sz=(w, h),
+                        bgCol="#333333",
+                        style=wx.TAB_TRAVERSAL|wx.SUNKEN_BORDER)
+        return pi
+    
+    #-------------------------------------------------------------------
+
+    def onButtonPressDown(self, event, objName=''):
+        """ wx.Butotn was pressed.
+        
+        Args:
+            event (wx.Event)
+            objName (str, optional): objName to emulate the button press
+              of the button with the given name.
+        
+        Returns:
+            None
+        """
+        if DEBUG: print("CamRecFrame.onButtonPressDown()")
+
+        if objName == '':
+            obj = event.GetEventObject()
+            objName = obj.GetName()
+        else:
+            obj = wx.FindWindowByName(objName, self.panel["ui"])
+        if not obj.IsEnabled(): return
+
+        if objName in ["addCam_btn", "remCam_btn"]:
+            cho = wx.FindWindowByName("camIdx_cho", self.panel["ui"])
+            choStr = cho.GetString(cho.GetSelection()).strip()
+            if choStr != "":
+                ci = int(choStr)
+                flag = objName[:3] # add or rem
+                self.addRemCam(ci, flag) # toggle selected cam
+
+        elif objName == "remAllCam_btn":
+            self.addRemCam(-1, "remAll") # remove all added cams
+
+        elif objName == "toggleRec_btn":
+            self.toggleRec() # toggle recording
+    
+    #-------------------------------------------------------------------
+
+    def onChoice(self, event):
+        """ wx.Choice was changed.
+        
+        Args: event (wx.Event)
+        
+        Returns: None
+        """
+        if DEBUG: print("CamRecFrame.onChoice()")
+
+        obj = event.GetEventObject()
+        objName = obj.GetName()
+        objVal = obj.GetString(obj.GetSelection()) # text of chosen option
+
+        if objName == "camIdx_cho":
+        # cam index was chosen
+            ### prepare preview image
+            w = int(self.pi["ui"]["sz"][0] * 0.95)
+            h = int(w/1.333)
+            if objVal.strip() == "":
+                ci = -1
+                f = np.zeros((h,w,3), dtype=np.uint8)
+            else:
+                ci = int(objVal)
+                f = self.cams[ci].initFrame # initial frame of the selected Cam
+                f = cv2.resize(f, (w,h)) # resize to show it in UI
+            self.previewImg = cv2.cvtColor(f, cv2.COLOR_BGR2RGB)
+            self.previewCIdx = ci
+            self.roiDragPt = None
+            self.showPreview() # show image with region to record
+            ### enable/disable widgets related to Cam setup
+            if ci in self.oCIdx:
+                self.enableDisableCamWidgets(flag="add")
+            else:
+                self.enableDisableCamWidgets(flag="rem")
+
+        elif objName == "outputFormat_cho":
+            if objVal in ["video", "motion", "raw"]: val = True
+            elif objVal == "image": val = False
+            w = wx.FindWindowByName("videoFPSlimit_spin", self.panel["ui"])
+            w.Enable(val)
+            w = wx.FindWindowByName("ssIntv_spin", self.panel["ui"])
+            w.Enable(not val)
+    
+    #-------------------------------------------------------------------
+
+    def showPreview(self, rect=None):
+        """ Show preview image of selected cam with a rectangle of
+        region to record.
+        
+        Args:
+            rect (None/tuple): Rectangle (x, y, w, h) in preview image;
+              None for 'cropROI' of the cam.
+        
+        Returns:
+            None
+        """
+        if DEBUG: print("CamRecFrame.showPreview()")
+
+        f = self.previewImg
+        h, w = f.shape[:2]
+        ci = self.previewCIdx
+        if rect is None and ci != -1 and self.cams[ci].cropROI != None:
+            ### region in frame to preview image
+            fSz = self.cams[ci].fSz
+            rx = w / fSz[0]
+            ry = h / fSz[1]
+            x, y, rw, rh = self.cams[ci].cropROI
+            rect = (int(x*rx), int(y*ry), int(rw*rx), int(rh*ry))
+        if rect != None:
+            f = f.copy()
+            x, y, rw, rh = rect
+            cv2.rectangle(f, (x, y), (x+rw, y+rh), (255,255,0), 2)
+        img = wx.Image(w, h)
+        img.SetData(f.tostring())
+        self.preview_sBmp.SetBitmap(img.ConvertToBitmap())
+    
+    #-------------------------------------------------------------------
+
+    def onPreviewMouse(self, event):
+        """ Mouse event on preview image;
+        dragging sets region to record (cropROI) of selected cam,
+          right-click clears it.
+        
+        Args: event (wx.MouseEvent)
+        
+        Returns: None
+        """
+        #if DEBUG: print("CamRecFrame.onPreviewMouse()")
+
+        ci = self.previewCIdx
+        if ci == -1 or self.engine.isCamRunning(ci): return
+        pt = event.GetPosition()
+        h, w = self.previewImg.shape[:2]
+        x = min(max(0, pt[0]), w-1)
+        y = min(max(0, pt[1]), h-1)
+        if event.LeftDown():
+            self.roiDragPt = (x, y)
+            return
+        if self.roiDragPt is None:
+            if event.RightUp():
+                self.engine.setCamSettings(ci, cropROI=None)
+                self.showPreview()
+            return
+        ### rectangle from starting point of dragging
+        x0, y0 = self.roiDragPt
+        rect = (min(x0, x), min(y0, y), abs(x-x0), abs(y-y0))
+        if event.Dragging():
+            self.showPreview(rect)
+        elif event.LeftUp():
+            self.roiDragPt = None
+            if rect[2] > 2 and rect[3] > 2: # not a click
+                ### rectangle in preview image to region in frame
+                fSz = self.cams[ci].fSz
+                rx = fSz[0] / w
+                ry = fSz[1] / h
+                roi = [int(rect[0]*rx), int(rect[1]*ry),
+                       int(rect[2]*rx), int(rect[3]*ry)]
+                self.engine.setCamSettings(ci, cropROI=roi)
+            self.showPreview()
+    
+    #-------------------------------------------------------------------
+
+    def enableDisableCamWidgets(self, flag="add"):
+        """ Enable/disable some widgets related to Cam setup,
+        
+        Args:
+            flag (str): 'add' or 'rem' (for currently selected Cam)
+        
+        Returns:
+            None
+        """
+        if DEBUG: print("CamRecFrame.enableDisableCamWidgets()")
+
+        if flag == "add": val = False
+        elif flag == "rem": val = True
+        addBtn = wx.FindWindowByName("addCam_btn", self.panel["ui"])
+        remBtn = wx.FindWindowByName("remCam_btn", self.panel["ui"])
+        ofCho = wx.FindWindowByName("outputFormat_cho", self.panel["ui"])
+        cbCho = wx.FindWindowByName("camBackend_cho", self.panel["ui"])
+        ptSpin = wx.FindWindowByName("preTrig_spin", self.panel["ui"])
+        osSpin = wx.FindWindowByName("outScale_spin", self.panel["ui"])
+        gsChk = wx.FindWindowByName("grayscale_chk", self.panel["ui"])
+        vFPSSpin = wx.FindWindowByName("videoFPSlimit_spin", self.panel["ui"])
+        ssIntvSpin = wx.FindWindowByName("ssIntv_spin", self.panel["ui"])
+        addBtn.Enable(val) # add button
+        remBtn.Enable(not val) # remove button
+        ofCho.Enable(val) # output format (Choice widget)
+        cbCho.Enable(val) # capture backend (Choice widget)
+        ptSpin.Enable(val) # pre-trigger buffer (SpinCtrl widget)
+        osSpin.Enable(val) # output scale (SpinCtrl widget)
+        gsChk.Enable(val) # grayscale (CheckBox widget)
+        if flag == "add":
+            vVal = False
+            iVal = vVal
+        else:
+            outputFormat = ofCho.GetString(ofCho.GetSelection())
+            if outputFormat in ["video", "motion", "raw"]: vVal = True
+            elif outputFormat == "image": vVal = False
+            iVal = not vVal
+        vFPSSpin.Enable(vVal) # video FPS (SpinCtrl widget)
+        ssIntvSpin.Enable(iVal) # image snapshot interval (SpinCtrl widget)
+
+        ### enable/disable recording button depending on
+        ###   whether there's any added Cam in self.oCIdx
+        btn = wx.FindWindowByName("toggleRec_btn", self.panel["ui"])
+        if len(self.oCIdx) == 0: btn.Disable()
+        else: btn.Enable()
+    
+    #-------------------------------------------------------------------
+
+    def stopAllTimers(self):
+        """ Stop all running timers
+        
+        Args: None
+        
+        Returns: None
+        """
+        if DEBUG: print("CamRecFrame.stopAllTimers()")
+
+        for k in self.timer.keys():
+            if self.timer[k] != None:
+                try: self.timer[k].Stop()
+                except: pass
+    
+    #-------------------------------------------------------------------
+
+    def onTimer(self, event, flag):
+        """ Processing on wx.EVT_TIMER event
+        
+        Args:
+            event (wx.Event)
+            flag (str): Key (name) of timer
+        
+        Returns:
+            None
+        """
+        if DEBUG: print("CamRecFrame.onTimer()")
+
+        if flag == "rDur": # recording duration timer
+            if self.engine.rSTime != -1:
+                e_time = time() - self.engine.rSTime
+                timeStr = str(timedelta(seconds=e_time)).split('.')[0]
+                self.rDur_sTxt.SetLabel(timeStr)
+        elif flag == "sbTimer": # metrics summary on status-bar
+            snaps = self.engine.getMetrics()
+            self.statusbar.SetStatusText(summarize(snaps, self.prevSnaps))
+            self.prevSnaps = snaps
+    
+    #-------------------------------------------------------------------
+
+    def toggleRec(self):
+        """ Toggle cam recording.
+        
+        Args: None
+        
+        Returns: None
+        """
+        if DEBUG: print("CamRecFrame.toggleRec()")
+
+        ### if it doesn't exist yet, set up recording duration timer
+        if not "rDur" in self.timer.keys():
+            self.timer["rDur"] = wx.Timer(self)
+            self.Bind(wx.EVT_TIMER,
+                      lambda event: self.onTimer(event, "rDur"),
+                      self.timer["rDur"])
+
+        recBtn = wx.FindWindowByName("toggleRec_btn", self.panel["ui"])
+        if self.engine.isRecording:
+            ### stop recording
+            self.timer["rDur"].Stop()
+            self.engine.stopRec()
+            self.rDur_sTxt.SetLabel('0:00:00')
+            recBtn.SetLabel("start Recording")
+            flag = True
+
+        else:
+            ### start recording
+            self.engine.startRec()
+            self.timer["rDur"].Start(1000)
+            recBtn.SetLabel("Stop")
+            flag = False
+
+        btn = wx.FindWindowByName("addCam_btn", self.panel["ui"])
+        btn.Enable(flag)
+        btn = wx.FindWindowByName("remCam_btn", self.panel["ui"])
+        btn.Enable(flag)
+    
+    #-------------------------------------------------------------------
+
+    def toggleCamThread(self, ci):
+        """ Start/Stop a cam thread
+        
+        Args:
+            ci (int): Index of cam to start
+        
+        Returns:
+            None
+        """
+        if DEBUG: print("CamRecFrame.startCamThread()")
+
+        if not self.engine.isCamRunning(ci): # thread is not running
+            settings = {}
+            ### update output format for Cam recording
+            cho = wx.FindWindowByName("outputFormat_cho", self.panel["ui"])
+            outputFormat = cho.GetString(cho.GetSelection()) # video or image
+            settings["outputFormat"] = outputFormat
+            if outputFormat in ["video", "motion", "raw"]:
+                ### update FPS limit for Cam recording
+                w = wx.FindWindowByName("videoFPSlimit_spin", self.panel["ui"])
+                fpsLimit = str2num(w.GetValue(), 'float')
+                if fpsLimit != None: settings["fpsLimit"] = fpsLimit
+            elif outputFormat == "image":
+                ### update snapshot interval for Cam recording
+                w = wx.FindWindowByName("ssIntv_spin", self.panel["ui"])
+                ssIntv = str2num(w.GetValue(), 'float')
+                if ssIntv != None: settings["ssIntv"] = ssIntv
+            ### update pre-trigger buffer duration
+            w = wx.FindWindowByName("preTrig_spin", self.panel["ui"])
+            preTrigSec = str2num(w.GetValue(), 'float')
+            if preTrigSec != None: settings["preTrigSec"] = preTrigSec
+            ### update output scale; region to record (cropROI) is
+            ###   already set by dragging on preview image
+            w = wx.FindWindowByName("outScale_spin", self.panel["ui"])
+            outScale = str2num(w.GetValue(), 'float')
+            if outScale != None: settings["outScale"] = outScale
+            ### update grayscale mode
+            w = wx.FindWindowByName("grayscale_chk", self.panel["ui"])
+            settings["grayscale"] = w.GetValue()
+            ### update capture backend
+            cho = wx.FindWindowByName("camBackend_cho", self.panel["ui"])
+            settings["backend"] = cho.GetString(cho.GetSelection())
+            self.engine.setCamSettings(ci, **settings)
+            # warn when cams on a bus may exceed its bandwidth
+            self.engine.planBandwidth(self.engine.runningCams()+[ci], "warn")
+            self.engine.startCam(ci) # start Cam thread (or process)
+            ### start timer to check mailboxes
+            ###   (the latest frame from the running thread)
+            if "chkQ2M" in self.timer.keys() and \
+              self.timer["chkQ2M"].IsRunning() == False:
+                self.timer["chkQ2M"].Start(50)
+            else:
+                self.timer["chkQ2M"] = wx.Timer(self)
+                self.Bind(wx.EVT_TIMER, self.chkQ2M, self.timer["chkQ2M"])
+                self.timer["chkQ2M"].Start(self.dispImgRefreshIntv)
+
+        else:
+            self.engine.stopCam(ci) # stop Cam thread (or process)
+            ### if no cam thread is running, stop chkQ2M timer as well.
+            if self.engine.runningCams() == []:
+                self.timer["chkQ2M"].Stop()
+    
+    #-------------------------------------------------------------------
+
+    def addRemCam(self, ci=-1, flag="add"):
+        """ Add/Remove a cam
+        
+        Args:
+            ci (int): Index of cam
+            flag (str): Flag for turning on (add) or off (rem)
+        
+        Returns:
+            None
+        """
+        if DEBUG: print("CamRecFrame.toggleCam()")
+
+        if flag == "add" and ci != -1:
+            if not self.engine.isCamRunning(ci):
+                self.toggleCamThread(ci)
+                self.oCIdx.append(ci)
+        elif flag == "rem" and ci != -1:
+            if self.engine.isCamRunning(ci):
+                self.toggleCamThread(ci)
+                self.oCIdx.remove(ci)
+        elif flag == "remAll":
+            for ci in list(self.oCIdx):
+                if self.engine.isCamRunning(ci):
+                    self.toggleCamThread(ci)
+                    self.oCIdx.remove(ci)
+        self.enableDisableCamWidgets(flag=flag[:3])
+
+        ### show opened cam index and its recording type
+        sTxt = wx.FindWindowByName("openCI_sTxt", self.panel["ui"])
+        s = []
+        for ci in self.oCIdx:
+            of = self.cams[ci].outputFormat[0] # first letter of output format
+            if of in ["v", "m", "r"]: # output format is video, motion or raw
+                w = wx.FindWindowByName("videoFPSlimit_spin", self.panel["ui"])
+            elif of == "i": # output format is image
+                w = wx.FindWindowByName("ssIntv_spin", self.panel["ui"])
+            of += "/%s"%(w.GetValue())
+            s.append("%i[%s]"%(ci, of))
+        sTxt.SetLabel(str(s).strip("[]").replace("'",""))
+
+        pSz = self.pi["rp"]["sz"] # panel size
+        # number of frames on one side
+        self.nCOnSide = int(np.ceil(np.sqrt(len(self.oCIdx))))
+        ### update display frame size for each cam
+        if self.nCOnSide == 0:
+            w, h = pSz
+        else:
+            w = int(pSz[0]/self.nCOnSide)
+            h = int(w/1.333)
+        self.dispCSz = [w, h]
+        ### set tiles of opened cams and clear display
+        self.comp.setLayout(self.oCIdx, self.nCOnSide, self.dispCSz)
+        self.dispBmp.CopyFromBuffer(self.comp.rgb)
+        self.disp_sBmp.SetBitmap(self.dispBmp)
+    
+    #-------------------------------------------------------------------
+
+    def chkQ2M(self, event):
+        """ Check mailbox of each cam to receive the latest frames
+        
+        Args: event (wx.Event)
+        
+        Returns: None
+        """
+        #if DEBUG: print("CamRecFrame.chkQ2M()")
+
+        t = monotonic()
+        ### redraw tiles of cams which have new frames
+        isUpdated = False
+        for cIdx in self.oCIdx:
+            lastSeq = self.comp.seqs.get(cIdx, -1)
+            frame, seq = self.engine.takeNewFrame(cIdx, lastSeq)
+            if self.comp.update(cIdx, frame, seq, "Cam-%.2i"%(cIdx)):
+                isUpdated = True
+
+        ### display composited image; bitmap is updated from RGB buffer
+        ###   only when any tile was redrawn
+        if isUpdated:
+            self.dispBmp.CopyFromBuffer(self.comp.rgb)
+            self.disp_sBmp.SetBitmap(self.dispBmp)
+            self.metrics.inc("frames")
+        self.metrics.observe("composite", monotonic()-t)
+    
+    #-------------------------------------------------------------------
+
+    def onClose(self, event):
+        """ Close this frame.
+        
+        Args: event (wx.Event)
+        
+        Returns: None
+        """
+        if DEBUG: print("CamRecFrame.onClose()")
+
+        self.stopAllTimers()
+        self.engine.close() # stop any running Cam thread and release cams
+        wx.CallLater(500, self.Destroy)
+    
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+class CamRecApp(wx.App):
+    def OnInit(self):
+        self.frame = CamRecFrame()
+        self.frame.Show()
+        self.SetTopWindow(self.frame)
+        return True
+    
+#=======================================================================
+
+if __name__ == '__main__':
+    pass
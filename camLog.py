@@ -0,0 +1,349 @@
+# coding: UTF-8
+"""
+Buffered, structured logging of pyCamRec.
+Records (dict) are put in an in-memory queue without any file access
+  and a background thread writes them in batches as JSON lines,
+  so that filesystem latency doesn't land on capture/writer threads.
+
+Each record has 'ts' (local date & time), 'mono' (monotonic time),
+  'event' and other fields such as 'cam', 'file' and 'fps'.
+
+Dependency:
+    Python (3.7)
+
+Changelog
+------------------------------------------------------------------------
+v.0.1: (2026.10.17)
+  - Initial development; replacing open-append-close logging
+    with fFuncNClasses.writeFile.
+"""
+
+import json
+from os import path, rename, remove
+from collections import deque
+from datetime import datetime
+from threading import Thread, Lock, Condition
+from time import monotonic
+
+DEBUG = False
+__version__ = "0.1"
+
+#=======================================================================
+
+def makeRecord(event, fields):
+    """ Make a log record.
+
+    Args:
+        event (str): Event name such as 'rec_start'.
+        fields (dict): Other fields.
+
+    Returns:
+        rec (dict): Record.
+
+    Examples:
+        >>> makeRecord("rec_start", dict(cam=0, fps=30.0))
+        {'ts': '2026-10-17T14:02:31.120', 'mono': 1180.53, 'event':
+          'rec_start', 'cam': 0, 'fps': 30.0}
+    """
+    #if DEBUG: print("camLog.makeRecord()")
+
+    rec = dict(ts=datetime.now().isoformat(timespec="milliseconds"),
+               mono=round(monotonic(), 6),
+               event=event)
+    rec.update(fields)
+    return rec
+
+#=======================================================================
+
+class LogWriter:
+    """ Logging service writing JSON lines with a background flusher.
+    log() only appends a record to a queue; the flusher thread writes
+      queued records in a single write every 'flushIntv' seconds
+      (or as soon as 'batchSize' records are queued).
+    When the file exceeds 'maxBytes', it's rotated to '<fp>.1',
+      '<fp>.2', ... keeping 'nBackups' files.
+
+    Args:
+        fp (str): Log file path.
+        maxBytes (int): Size to rotate the file; 0 for no rotation.
+        nBackups (int): Number of rotated files to keep.
+        flushIntv (float): Max. seconds a record waits in the queue.
+        batchSize (int): Number of queued records to wake the flusher.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self, fp, maxBytes=10*1024*1024, nBackups=5, flushIntv=0.5,
+                 batchSize=256):
+        if DEBUG: print("LogWriter.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.fp = fp # log file path
+        self.maxBytes = maxBytes # size to rotate the file
+        self.nBackups = nBackups # number of rotated files to keep
+        self.flushIntv = flushIntv # max. seconds to keep records in queue
+        self.batchSize = batchSize # number of records to wake flusher
+        self.q = deque() # queue of records
+        self.cond = Condition(Lock()) # for waking flusher & waiting flush
+        self.nQueued = 0 # number of records queued so far
+        self.nWritten = 0 # number of records written so far
+        self.isRunning = True # whether flusher thread is running
+        self.f = open(fp, "a") # log file
+        self.th = Thread(target=self.run, daemon=True) # flusher thread
+        ##### end of setting up attributes -----
+        self.th.start()
+
+    #-------------------------------------------------------------------
+
+    def log(self, event, **fields):
+        """ Queue a record; it doesn't touch the file.
+
+        Args:
+            event (str): Event name such as 'rec_start'.
+            fields: Other fields such as cam=0, file='...', fps=30.
+
+        Returns:
+            None
+        """
+        #if DEBUG: print("LogWriter.log()")
+
+        self.put(makeRecord(event, fields))
+
+    #-------------------------------------------------------------------
+
+    def put(self, rec):
+        """ Queue an already made record (such as one from
+        another process).
+
+        Args:
+            rec (dict): Record.
+
+        Returns:
+            None
+        """
+        #if DEBUG: print("LogWriter.put()")
+
+        with self.cond:
+            self.q.append(rec)
+            self.nQueued += 1
+            if len(self.q) >= self.batchSize: self.cond.notify_all()
+
+    #-------------------------------------------------------------------
+
+    def run(self):
+        """ Function for flusher thread.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("LogWriter.run()")
+
+        while True:
+            with self.cond:
+                if len(self.q) == 0 and self.isRunning:
+                    self.cond.wait(self.flushIntv)
+                recs = list(self.q)
+                self.q.clear()
+                isRunning = self.isRunning
+            if recs != []: self.write(recs)
+            with self.cond:
+                self.nWritten += len(recs)
+                self.cond.notify_all() # for flush() waiting
+            if not isRunning and recs == []: break
+
+    #-------------------------------------------------------------------
+
+    def write(self, recs):
+        """ Write records to the file in a single write.
+
+        Args:
+            recs (list): Records.
+
+        Returns:
+            None
+        """
+        if DEBUG: print("LogWriter.write()")
+
+        txt = ""
+        for rec in recs: txt += json.dumps(rec, default=str) + "\n"
+        try:
+            if self.maxBytes > 0 and \
+              self.f.tell() + len(txt) > self.maxBytes and self.f.tell() > 0:
+                self.rotate()
+            self.f.write(txt)
+            self.f.flush()
+        except Exception as e:
+            print("[ERROR] log %s: %s"%(self.fp, str(e)))
+
+    #-------------------------------------------------------------------
+
+    def rotate(self):
+        """ Rotate log files; fp -> fp.1 -> fp.2 ...
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("LogWriter.rotate()")
+
+        self.f.close()
+        last = "%s.%i"%(self.fp, self.nBackups)
+        if path.isfile(last): remove(last)
+        for i in range(self.nBackups-1, 0, -1):
+            fp = "%s.%i"%(self.fp, i)
+            if path.isfile(fp): rename(fp, "%s.%i"%(self.fp, i+1))
+        if self.nBackups > 0: rename(self.fp, self.fp+".1")
+        else: remove(self.fp)
+        self.f = open(self.fp, "a")
+
+    #-------------------------------------------------------------------
+
+    def flush(self, timeout=5.0):
+        """ Wait until records queued so far are written.
+
+        Args:
+            timeout (float): Max. seconds to wait.
+
+        Returns:
+            (bool): Whether all records were written.
+        """
+        if DEBUG: print("LogWriter.flush()")
+
+        with self.cond:
+            target = self.nQueued
+            self.cond.notify_all()
+            return self.cond.wait_for(lambda: self.nWritten >= target or \
+                                              not self.th.is_alive(),
+                                      timeout) and self.nWritten >= target
+
+    #-------------------------------------------------------------------
+
+    def close(self):
+        """ Write remaining records, stop the flusher and close the file.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("LogWriter.close()")
+
+        with self.cond:
+            if not self.isRunning: return
+            self.isRunning = False
+            self.cond.notify_all()
+        self.th.join()
+        self.f.close()
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+class PipeLogger:
+    """ Logger of a Cam process, sending records to the main process
+    through a pipe, where they're put in the LogWriter.
+    Same interface as LogWriter (log, flush, close).
+
+    Args:
+        conn (multiprocessing.connection.Connection): Pipe to main process.
+    """
+
+    def __init__(self, conn):
+        if DEBUG: print("PipeLogger.__init__()")
+
+        self.conn = conn # connection
+        self.lock = Lock() # sending from multiple threads
+
+    #-------------------------------------------------------------------
+
+    def log(self, event, **fields):
+        self.send(("log", makeRecord(event, fields)))
+
+    #-------------------------------------------------------------------
+
+    def send(self, msg):
+        """ Send a message to the main process; also used for
+        other messages (such as metrics) on the same pipe.
+
+        Args:
+            msg (tuple): Message; (kind, data).
+
+        Returns:
+            None
+        """
+        #if DEBUG: print("PipeLogger.send()")
+
+        try:
+            with self.lock: self.conn.send(msg)
+        except (EOFError, OSError):
+            pass
+
+    #-------------------------------------------------------------------
+
+    def flush(self, timeout=5.0):
+        return True
+
+    #-------------------------------------------------------------------
+
+    def close(self):
+        pass
+
+#=======================================================================
+
+_loggers = {} # logger of each log file in this process
+_loggersLock = Lock()
+
+def getLogger(fp):
+    """ Return the logger of a log file, shared in this process.
+    It's created on the first call.
+
+    Args:
+        fp (str): Log file path.
+
+    Returns:
+        (LogWriter/PipeLogger): Logger.
+    """
+    #if DEBUG: print("camLog.getLogger()")
+
+    with _loggersLock:
+        if not fp in _loggers: _loggers[fp] = LogWriter(fp)
+        return _loggers[fp]
+
+#-----------------------------------------------------------------------
+
+def setLogger(fp, logger):
+    """ Set the logger of a log file in this process,
+    such as PipeLogger in a Cam process.
+
+    Args:
+        fp (str): Log file path.
+        logger (LogWriter/PipeLogger): Logger.
+
+    Returns:
+        None
+    """
+    if DEBUG: print("camLog.setLogger()")
+
+    with _loggersLock: _loggers[fp] = logger
+
+#-----------------------------------------------------------------------
+
+def closeLogger(fp):
+    """ Flush and close the logger of a log file.
+
+    Args:
+        fp (str): Log file path.
+
+    Returns:
+        None
+    """
+    if DEBUG: print("camLog.closeLogger()")
+
+    with _loggersLock: logger = _loggers.pop(fp, None)
+    if logger != None: logger.close()
+
+#=======================================================================
+
+if __name__ == '__main__':
+    pass
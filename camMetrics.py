@@ -0,0 +1,288 @@
+# coding: UTF-8
+"""
+Per-stage metrics of pyCamRec; counters and latency histograms of
+  capture read, throttle wait, encode/write, preview publish and
+  GUI compositing, exported periodically as JSON and Prometheus text.
+
+Dependency:
+    Python (3.7)
+
+Changelog
+------------------------------------------------------------------------
+v.0.1: (2026.10.17)
+  - Initial development.
+"""
+
+import json
+from os import replace
+from bisect import bisect_left
+from threading import Thread, Event
+from time import time, monotonic
+
+DEBUG = False
+__version__ = "0.1"
+
+#=======================================================================
+
+class LatHist:
+    """ Latency histogram with fixed buckets (upper bounds in seconds).
+    Observing a value is a bisect and a few additions,
+      so it's cheap enough for the per-frame hot path.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    bounds = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+              0.05, 0.1, 0.25, 0.5, 1.0] # upper bounds of buckets; the last
+      # bucket (+Inf) is for values over 1 second
+
+    def __init__(self):
+        ##### beginning of setting up attributes -----
+        self.counts = [0]*(len(self.bounds)+1) # count of each bucket
+        self.n = 0 # number of values
+        self.sum = 0.0 # sum of values
+        self.max = 0.0 # max. value
+        ##### end of setting up attributes -----
+
+    #-------------------------------------------------------------------
+
+    def add(self, sec):
+        self.counts[bisect_left(self.bounds, sec)] += 1
+        self.n += 1
+        self.sum += sec
+        if sec > self.max: self.max = sec
+
+    #-------------------------------------------------------------------
+
+    def snapshot(self):
+        return dict(n=self.n, sum=self.sum, max=self.max,
+                    counts=list(self.counts))
+
+#=======================================================================
+
+class StageMetrics:
+    """ Counters and latency histograms of stages of a cam (or the GUI).
+    Each stage is written by a single thread, so no lock is used;
+      a snapshot taken by another thread may be off by a frame.
+
+    Args:
+        name (str): Name such as 'c00' or 'gui'.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self, name):
+        if DEBUG: print("StageMetrics.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.name = name # name of this metrics
+        self.hist = {} # LatHist of each stage
+        self.counters = {} # counters
+        ##### end of setting up attributes -----
+
+    #-------------------------------------------------------------------
+
+    def observe(self, stage, sec):
+        """ Add a latency of a stage.
+
+        Args:
+            stage (str): Stage name such as 'read', 'wait', 'write',
+              'encode', 'publish' or 'composite'.
+            sec (float): Latency in seconds.
+
+        Returns:
+            None
+        """
+        #if DEBUG: print("StageMetrics.observe()")
+
+        if not stage in self.hist: self.hist[stage] = LatHist()
+        self.hist[stage].add(sec)
+
+    #-------------------------------------------------------------------
+
+    def inc(self, key, n=1):
+        self.counters[key] = self.counters.get(key, 0) + n
+
+    #-------------------------------------------------------------------
+
+    def snapshot(self):
+        """ Return current values.
+
+        Args: None
+
+        Returns:
+            (dict): 'name', 'time' (monotonic), 'counters' and 'stages'
+              (snapshot of LatHist of each stage).
+        """
+        if DEBUG: print("StageMetrics.snapshot()")
+
+        stages = {}
+        for k in list(self.hist.keys()): stages[k] = self.hist[k].snapshot()
+        return dict(name=self.name,
+                    time=monotonic(),
+                    counters=dict(self.counters),
+                    stages=stages)
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+def toPrometheus(snaps):
+    """ Format snapshots as Prometheus text exposition.
+
+    Args:
+        snaps (list): Snapshots of StageMetrics.
+
+    Returns:
+        txt (str): Text.
+    """
+    if DEBUG: print("camMetrics.toPrometheus()")
+
+    txt = "# TYPE pcr_stage_seconds histogram\n"
+    for s in snaps:
+        for stage in sorted(s["stages"].keys()):
+            h = s["stages"][stage]
+            lbl = 'src="%s",stage="%s"'%(s["name"], stage)
+            cum = 0
+            for i, b in enumerate(LatHist.bounds + ["+Inf"]):
+                cum += h["counts"][i]
+                txt += 'pcr_stage_seconds_bucket{%s,le="%s"} %i\n'%(lbl,
+                                                                    str(b),
+                                                                    cum)
+            txt += 'pcr_stage_seconds_sum{%s} %.6f\n'%(lbl, h["sum"])
+            txt += 'pcr_stage_seconds_count{%s} %i\n'%(lbl, h["n"])
+    txt += "# TYPE pcr_counter untyped\n" # counters and ring depth
+    for s in snaps:
+        for k in sorted(s["counters"].keys()):
+            txt += 'pcr_counter{src="%s",name="%s"} %s\n'%(s["name"],
+                                                          k,
+                                                          str(s["counters"][k]))
+    return txt
+
+#-----------------------------------------------------------------------
+
+def summarize(snaps, prevSnaps=None):
+    """ Short summary for status-bar; frame rate and mean latency (ms)
+    of each stage since the previous snapshots. The slowest stage
+    other than 'wait' (which is idle time) is marked with '*'.
+
+    Args:
+        snaps (list): Snapshots of StageMetrics.
+        prevSnaps (None/list): Previous snapshots; cumulative values
+          are used when it's None or empty.
+
+    Returns:
+        (str): Summary.
+
+    Examples:
+        >>> summarize(snaps, prevSnaps)
+        'c00 30.0fps read 2.1 wait 29.8 write* 3.4 publish 0.1 ms'
+    """
+    if DEBUG: print("camMetrics.summarize()")
+
+    if prevSnaps == None: prevSnaps = []
+
+    prev = dict([(s["name"], s) for s in prevSnaps])
+    out = []
+    for s in snaps:
+        p = prev.get(s["name"], None)
+        txt = s["name"]
+        if "frames" in s["counters"] and p != None and s["time"] > p["time"]:
+            nf = s["counters"]["frames"] - p["counters"].get("frames", 0)
+            txt += " %.1ffps"%(nf/(s["time"]-p["time"]))
+        means = []
+        for stage in sorted(s["stages"].keys()):
+            h = s["stages"][stage]
+            n = h["n"]; sm = h["sum"]
+            if p != None and stage in p["stages"]:
+                n -= p["stages"][stage]["n"]
+                sm -= p["stages"][stage]["sum"]
+            if n > 0: means.append((stage, sm/n*1000))
+        slow = [m for m in means if m[0] != "wait"]
+        if slow != []: slowest = max(slow, key=lambda m: m[1])[0]
+        else: slowest = ""
+        for stage, ms in means:
+            if stage == slowest: stage += "*"
+            txt += " %s %.1f"%(stage, ms)
+        out.append(txt + " ms")
+    return " | ".join(out)
+
+#=======================================================================
+
+class MetricsExporter:
+    """ Thread writing metrics periodically to '<fp>.json' and
+    '<fp>.prom' (Prometheus text, e.g. for node_exporter textfile
+    collector). Files are replaced atomically.
+
+    Args:
+        getSnaps (function): Function returning a list of snapshots.
+        fp (str): File path without extension.
+        intv (float): Interval (seconds) of writing.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self, getSnaps, fp, intv=5.0):
+        if DEBUG: print("MetricsExporter.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.getSnaps = getSnaps # function returning snapshots
+        self.fp = fp # file path without extension
+        self.intv = intv # interval of writing
+        self.stopEvt = Event() # for stopping the thread
+        self.th = Thread(target=self.run, daemon=True) # exporting thread
+        ##### end of setting up attributes -----
+        self.th.start()
+
+    #-------------------------------------------------------------------
+
+    def run(self):
+        if DEBUG: print("MetricsExporter.run()")
+        while not self.stopEvt.wait(self.intv): self.export()
+
+    #-------------------------------------------------------------------
+
+    def export(self):
+        """ Write current metrics to files.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("MetricsExporter.export()")
+
+        try:
+            snaps = self.getSnaps()
+            with open(self.fp+".json.tmp", "w") as f:
+                json.dump(dict(time=time(), metrics=snaps), f)
+            replace(self.fp+".json.tmp", self.fp+".json")
+            with open(self.fp+".prom.tmp", "w") as f:
+                f.write(toPrometheus(snaps))
+            replace(self.fp+".prom.tmp", self.fp+".prom")
+        except Exception as e:
+            print("[ERROR] metrics export: %s"%(str(e)))
+
+    #-------------------------------------------------------------------
+
+    def stop(self):
+        """ Stop the thread after writing the final metrics.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("MetricsExporter.stop()")
+
+        self.stopEvt.set()
+        self.th.join()
+        self.export()
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+if __name__ == '__main__':
+    pass
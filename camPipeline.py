@@ -0,0 +1,1096 @@
+# coding: UTF-8
+"""
+Classes for passing frames between the capture stage and
+  the writer stage of each cam in pyCamRec.
+
+Dependency:
+    NumPy (1.14)
+    OpenCV (3.4)
+
+Changelog
+------------------------------------------------------------------------
+v.0.1: (2026.10.17)
+  - Initial development; FrameRing.
+  - FrameMailbox for passing the latest frame to preview.
+  - FramePacer for limiting frame rate.
+  - SnapshotPool for encoding and writing images asynchronously.
+  - PreTrigBuf for keeping compressed frames before recording starts.
+  - MotionDetector for motion-triggered recording.
+  - TileCompositor for incremental preview of cams.
+  - Variable-length frames (such as JPEG data) in FrameRing.
+  - SnapshotPool.encode for encoding without writing a file.
+  - OverloadController for stepping down/up recording load.
+  - Single-channel (grayscale) frames in TileCompositor.
+  - FrameRing.resetPeak for the max. depth of a period.
+"""
+
+from threading import Condition, Lock, BoundedSemaphore
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import time, sleep, monotonic
+
+import cv2
+import numpy as np
+
+DEBUG = False
+__version__ = "0.1"
+
+#=======================================================================
+
+class FrameRing:
+    """ Fixed-size, preallocated ring buffer of frames
+    between a producer (capture) thread and a consumer (writer) thread.
+    Control messages (such as 'rec_init', 'rec_stop') can be put in
+      the ring as well. They keep their order relative to frames
+      and are never dropped by the overflow policy.
+    With 'varLen', a slot is a 1-D array of 'shape[0]' elements and
+      frames of any length up to it (such as JPEG data of MJPEG cams)
+      are stored with their lengths.
+
+    Args:
+        nSlots (int): Number of frame slots.
+        shape (tuple): Shape of a frame (height, width, channels),
+          or (max. length,) with 'varLen'.
+        dtype (numpy.dtype): Data type of a frame.
+        policy (str): Overflow policy when the ring is full;
+          'block' (producer waits for a free slot),
+          'dropOldest' (the oldest frame is overwritten) or
+          'dropNewest' (the incoming frame is discarded).
+        varLen (bool): Whether frames are 1-D arrays of variable length.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    policies = ["block", "dropOldest", "dropNewest"]
+
+    def __init__(self, nSlots, shape, dtype=np.uint8, policy="block",
+                 varLen=False):
+        if DEBUG: print("FrameRing.__init__()")
+
+        if policy not in self.policies:
+            raise ValueError("Unknown overflow policy: %s"%(policy))
+        if nSlots < 1:
+            raise ValueError("nSlots should be larger than zero.")
+        ##### beginning of setting up attributes -----
+        self.nSlots = nSlots # number of slots
+        self.shape = tuple(shape) # shape of a frame
+        self.policy = policy # overflow policy
+        # preallocated frame slots
+        self.buf = np.zeros((nSlots,)+self.shape, dtype=dtype)
+        # timestamps (monotonic, wall-clock) of each slot
+        self.ts = np.zeros((nSlots, 2), dtype=np.float64)
+        self.varLen = varLen # whether frames have variable length
+        self.lens = np.zeros(nSlots, dtype=np.int64) # length of each frame
+          # with 'varLen'
+        self.wSeq = 0 # sequence number of the next frame to write
+        self.rSeq = 0 # sequence number of the next frame to read
+        self.msgs = deque() # control messages; (frame sequence, message)
+        self.cond = Condition() # for waiting on free or filled slots
+        self.closed = False # whether the ring is closed
+        ### counters
+        self.nPut = 0 # number of frames put into the ring
+        self.nGet = 0 # number of frames taken out of the ring
+        self.nDropOldest = 0 # number of frames overwritten (dropOldest)
+        self.nDropNewest = 0 # number of frames discarded (dropNewest)
+        self.nDropClosed = 0 # number of frames discarded after closing
+        self.nBlocked = 0 # number of put() calls which had to wait
+        self.blockedTime = 0.0 # total time (seconds) producer waited
+        self.maxDepth = 0 # maximum number of frames held in the ring
+        self.peakDepth = 0 # maximum number of frames held since
+          # resetPeak() was called, such as during a recording
+        ##### end of setting up attributes -----
+
+    #-------------------------------------------------------------------
+
+    def __len__(self):
+        return self.wSeq - self.rSeq
+
+    #-------------------------------------------------------------------
+
+    def put(self, frame, ts=(-1, -1)):
+        """ Copy a frame into the next free slot.
+
+        Args:
+            frame (numpy.ndarray): Frame image.
+            ts (tuple): Monotonic and wall-clock timestamps of the frame.
+
+        Returns:
+            (bool): Whether the frame was stored.
+        """
+        #if DEBUG: print("FrameRing.put()")
+
+        if self.varLen:
+            frame = frame.reshape(-1)
+            if frame.size > self.shape[0]:
+                raise ValueError("Frame (%i) is larger than slot (%i)."%(
+                                   frame.size, self.shape[0]))
+        with self.cond:
+            if self.closed:
+                self.nDropClosed += 1
+                return False
+            if self.wSeq - self.rSeq >= self.nSlots: # ring is full
+                if self.policy == "block":
+                    self.nBlocked += 1
+                    t = time()
+                    while self.wSeq - self.rSeq >= self.nSlots and \
+                      not self.closed:
+                        self.cond.wait()
+                    self.blockedTime += time() - t
+                    if self.closed:
+                        self.nDropClosed += 1
+                        return False
+                elif self.policy == "dropOldest":
+                    self.rSeq += 1 # the oldest frame will be overwritten
+                    self.nDropOldest += 1
+                elif self.policy == "dropNewest":
+                    self.nDropNewest += 1
+                    return False
+            i = self.wSeq % self.nSlots
+            if self.varLen:
+                self.buf[i, :frame.size] = frame
+                self.lens[i] = frame.size
+            else:
+                self.buf[i] = frame
+            self.ts[i] = ts
+            self.wSeq += 1
+            self.nPut += 1
+            self.maxDepth = max(self.maxDepth, self.wSeq-self.rSeq)
+            self.peakDepth = max(self.peakDepth, self.wSeq-self.rSeq)
+            self.cond.notify_all()
+        return True
+
+    #-------------------------------------------------------------------
+
+    def putMsg(self, msg):
+        """ Put a control message after the frames already in the ring.
+
+        Args:
+            msg (str): Message.
+
+        Returns:
+            None
+        """
+        if DEBUG: print("FrameRing.putMsg()")
+
+        with self.cond:
+            self.msgs.append((self.wSeq, msg))
+            self.cond.notify_all()
+
+    #-------------------------------------------------------------------
+
+    def get(self, out=None, timeout=None):
+        """ Take the next message or frame out of the ring.
+
+        Args:
+            out (numpy.ndarray, optional): Array to copy the frame into.
+              When it's None, a new array is returned. With 'varLen',
+              the returned frame is a view of the beginning of 'out'.
+            timeout (None/float): Seconds to wait for an item.
+
+        Returns:
+            item (None/tuple): None when nothing arrived before timeout,
+              ('msg', message, -1) for a control message or
+              ('frame', frame, (monotonic, wall-clock timestamps))
+              for a frame.
+        """
+        #if DEBUG: print("FrameRing.get()")
+
+        with self.cond:
+            if not self.cond.wait_for(self._hasItem, timeout): return None
+            if len(self.msgs) > 0 and self.msgs[0][0] <= self.rSeq:
+            # message was put before the next frame
+                return ("msg", self.msgs.popleft()[1], -1)
+            i = self.rSeq % self.nSlots
+            if self.varLen: src = self.buf[i, :self.lens[i]]
+            else: src = self.buf[i]
+            if out is None: frame = src.copy()
+            else:
+                if self.varLen: out = out.reshape(-1)[:src.size]
+                frame = out; np.copyto(out, src)
+            ts = (float(self.ts[i,0]), float(self.ts[i,1]))
+            self.rSeq += 1
+            self.nGet += 1
+            self.cond.notify_all()
+        return ("frame", frame, ts)
+
+    #-------------------------------------------------------------------
+
+    def _hasItem(self):
+        return self.wSeq > self.rSeq or len(self.msgs) > 0
+
+    #-------------------------------------------------------------------
+
+    def close(self):
+        """ Close the ring; a blocked producer is released
+        and further frames are discarded.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("FrameRing.close()")
+
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    #-------------------------------------------------------------------
+
+    def resetPeak(self):
+        """ Start tracking 'peakDepth' again from the current depth.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("FrameRing.resetPeak()")
+
+        with self.cond: self.peakDepth = self.wSeq - self.rSeq
+
+    #-------------------------------------------------------------------
+
+    def getStats(self):
+        """ Return counters of this ring.
+
+        Args: None
+
+        Returns:
+            stats (dict): Counters
+        """
+        if DEBUG: print("FrameRing.getStats()")
+
+        with self.cond:
+            stats = dict(put=self.nPut,
+                         get=self.nGet,
+                         depth=self.wSeq-self.rSeq,
+                         maxDepth=self.maxDepth,
+                         peakDepth=self.peakDepth,
+                         dropOldest=self.nDropOldest,
+                         dropNewest=self.nDropNewest,
+                         dropClosed=self.nDropClosed,
+                         blocked=self.nBlocked,
+                         blockedTime=self.blockedTime)
+        return stats
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+class FrameMailbox:
+    """ Single-slot mailbox holding only the latest frame of a cam
+    for preview. A new frame overwrites (replaces the reference of)
+    the previous one, so memory usage doesn't grow when the reader lags.
+    The frame is not copied; the producer should not modify a frame
+      after putting it.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self):
+        if DEBUG: print("FrameMailbox.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.lock = Lock()
+        self.frame = None # the latest frame
+        self.seq = 0 # number of frames put so far
+        self.nOverwritten = 0 # number of frames replaced before taken
+        self.takenSeq = 0 # 'seq' when the frame was taken last time
+        ##### end of setting up attributes -----
+
+    #-------------------------------------------------------------------
+
+    def put(self, frame):
+        """ Store the latest frame.
+
+        Args:
+            frame (numpy.ndarray): Frame image.
+
+        Returns:
+            None
+        """
+        #if DEBUG: print("FrameMailbox.put()")
+
+        with self.lock:
+            if self.seq > self.takenSeq and self.frame is not None:
+                self.nOverwritten += 1
+            self.frame = frame
+            self.seq += 1
+
+    #-------------------------------------------------------------------
+
+    def take(self, lastSeq=-1):
+        """ Return the latest frame and its sequence number.
+        The frame stays in the mailbox until it's replaced.
+
+        Args:
+            lastSeq (int): Sequence number of the frame taken last time;
+              None is returned for frame when there's no newer frame.
+
+        Returns:
+            frame (None/numpy.ndarray): The latest frame.
+            seq (int): Sequence number of the frame.
+        """
+        #if DEBUG: print("FrameMailbox.take()")
+
+        with self.lock:
+            if self.seq == lastSeq: return None, self.seq
+            self.takenSeq = self.seq
+            return self.frame, self.seq
+
+    #-------------------------------------------------------------------
+
+    def clear(self):
+        """ Remove the frame in the mailbox.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("FrameMailbox.clear()")
+
+        with self.lock:
+            self.frame = None
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+class FramePacer:
+    """ Frame rate limiter which sleeps until the deadline of the next
+    frame on a monotonic clock, instead of polling.
+    Deadlines are advanced by a fixed interval, so a small delay of
+      one frame is absorbed by the next one. When a deadline is missed
+      by more than one interval, the schedule is re-anchored and
+      the skipped time is accumulated as drift.
+
+    Args:
+        fpsLimit (float): Upper limit of frames per second.
+          -1 (or 0) means no limit.
+        nIntv (int): Number of recent inter-frame intervals to keep
+          for calculating jitter.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self, fpsLimit=-1, nIntv=300):
+        if DEBUG: print("FramePacer.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.intv = 0.0 # target interval between frames (seconds)
+        self.nextT = None # deadline of the next frame
+        self.lastT = None # time when the last frame was released
+        self.drift = 0.0 # accumulated time (seconds) of missed deadlines
+        self.nLate = 0 # number of missed deadlines (re-anchored)
+        self.intvs = deque(maxlen=nIntv) # recent inter-frame intervals
+        ##### end of setting up attributes -----
+        self.setFPSLimit(fpsLimit)
+
+    #-------------------------------------------------------------------
+
+    def setFPSLimit(self, fpsLimit):
+        """ Change upper limit of frames per second.
+
+        Args:
+            fpsLimit (float): Upper limit of frames per second.
+
+        Returns:
+            None
+        """
+        if DEBUG: print("FramePacer.setFPSLimit()")
+
+        if fpsLimit is None or fpsLimit <= 0: self.intv = 0.0
+        else: self.intv = 1.0/fpsLimit
+        self.nextT = None # re-anchor with the new interval
+
+    #-------------------------------------------------------------------
+
+    def wait(self):
+        """ Sleep until the deadline of the next frame.
+
+        Args: None
+
+        Returns:
+            now (float): Monotonic time when the frame is released.
+        """
+        #if DEBUG: print("FramePacer.wait()")
+
+        now = monotonic()
+        if self.intv > 0:
+            if self.nextT is None: self.nextT = now
+            d = self.nextT - now
+            if d > 0:
+                sleep(d)
+                now = monotonic()
+            elif -d > self.intv: # missed more than one frame interval
+                self.nLate += 1
+                self.drift += -d
+                self.nextT = now
+            self.nextT += self.intv
+        if self.lastT is not None: self.intvs.append(now-self.lastT)
+        self.lastT = now
+        return now
+
+    #-------------------------------------------------------------------
+
+    def getJitter(self):
+        """ Return statistics of recent inter-frame intervals.
+
+        Args: None
+
+        Returns:
+            jitter (dict): Mean and standard deviation of intervals,
+              mean and max. absolute deviation from the target interval
+              (all in milliseconds), drift (seconds) and
+              number of missed deadlines.
+        """
+        if DEBUG: print("FramePacer.getJitter()")
+
+        jitter = dict(mean=0.0, std=0.0, meanDev=0.0, maxDev=0.0,
+                      drift=self.drift, nLate=self.nLate)
+        intvs = np.asarray(self.intvs, dtype=np.float64)
+        if len(intvs) == 0: return jitter
+        if self.intv > 0: target = self.intv
+        else: target = np.mean(intvs)
+        dev = np.abs(intvs - target)
+        jitter["mean"] = float(np.mean(intvs)) * 1000
+        jitter["std"] = float(np.std(intvs)) * 1000
+        jitter["meanDev"] = float(np.mean(dev)) * 1000
+        jitter["maxDev"] = float(np.max(dev)) * 1000
+        return jitter
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+class OverloadController:
+    """ Controller stepping a cam down (and back up) through a ladder
+    of degraded recording settings under sustained overload.
+    It's updated about once a second with load signals of the cam;
+      when any signal is over its high threshold for 'downSec' updates,
+      it steps down a level, and when all signals are below their low
+      thresholds for 'upSec' updates, it steps up a level.
+    Each level of the ladder is a dict of;
+      'fps' (ratio to frame rate limit),
+      'jpgQuality' (upper limit of JPEG quality of images) and
+      'scale' (ratio of output frame size); a missing key is no change.
+
+    Args:
+        ladder (None/list): Levels; None for LADDER. The first level
+          should be {} (no degradation).
+        downSec (int): Number of overloaded updates to step down.
+        upSec (int): Number of clear updates to step up.
+        depthHigh (float): Ratio of ring depth to its length for overload.
+        depthLow (float): Ratio of ring depth to its length for clear.
+        latHigh (float): Ratio of write/encode latency to frame interval
+          for overload.
+        latLow (float): Ratio of write/encode latency to frame interval
+          for clear.
+        fpsLow (float): Ratio of capture frame rate to target frame rate,
+          under which capture is overloaded (when reading isn't what
+          limits the frame rate).
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+
+    Examples:
+        >>> oc = OverloadController(downSec=2)
+        >>> sig = dict(depth=0.9, drops=3, lat=0.4, fps=1.0)
+        >>> oc.update(sig), oc.update(sig), oc.level, oc.reasons
+        (False, True, 1, ['depth', 'drops'])
+    """
+
+    # default ladder
+    LADDER = [{},
+              dict(jpgQuality=80),
+              dict(jpgQuality=80, fps=0.75),
+              dict(jpgQuality=70, fps=0.5),
+              dict(jpgQuality=70, fps=0.5, scale=0.75),
+              dict(jpgQuality=60, fps=0.5, scale=0.5)]
+
+    def __init__(self, ladder=None, downSec=3, upSec=10, depthHigh=0.5,
+                 depthLow=0.1, latHigh=0.8, latLow=0.5, fpsLow=0.85):
+        if DEBUG: print("OverloadController.__init__()")
+
+        ##### beginning of setting up attributes -----
+        if ladder is None: ladder = self.LADDER
+        self.ladder = [dict(lv) for lv in ladder] # levels of settings
+        self.downSec = downSec # number of overloaded updates to step down
+        self.upSec = upSec # number of clear updates to step up
+        self.depthHigh = depthHigh # ring depth ratio for overload
+        self.depthLow = depthLow # ring depth ratio for clear
+        self.latHigh = latHigh # latency ratio for overload
+        self.latLow = latLow # latency ratio for clear
+        self.fpsLow = fpsLow # capture frame rate ratio for overload
+        self.level = 0 # current level in the ladder
+        self.nOver = 0 # number of consecutive overloaded updates
+        self.nClear = 0 # number of consecutive clear updates
+        self.reasons = [] # signals which caused the last step
+        ##### end of setting up attributes -----
+
+    #-------------------------------------------------------------------
+
+    def getLevel(self):
+        return self.ladder[self.level]
+
+    #-------------------------------------------------------------------
+
+    def update(self, sig):
+        """ Update with load signals and step the level if needed.
+
+        Args:
+            sig (dict): 'depth' (ratio of ring depth to its length),
+              'drops' (number of frames dropped or blocked at the ring
+              since the last update), 'lat' (ratio of mean write/encode
+              latency to frame interval) and 'fps' (ratio of capture
+              frame rate to target frame rate; 1.0 when capture isn't
+              limited by this host).
+
+        Returns:
+            (bool): Whether the level has changed.
+        """
+        #if DEBUG: print("OverloadController.update()")
+
+        over = []
+        if sig["depth"] >= self.depthHigh: over.append("depth")
+        if sig["drops"] > 0: over.append("drops")
+        if sig["lat"] >= self.latHigh: over.append("lat")
+        if sig["fps"] < self.fpsLow: over.append("fps")
+        clear = sig["depth"] <= self.depthLow and sig["drops"] == 0 and \
+          sig["lat"] <= self.latLow and sig["fps"] >= self.fpsLow
+        if over != []:
+            self.nOver += 1
+            self.nClear = 0
+        elif clear:
+            self.nClear += 1
+            self.nOver = 0
+        else: # between thresholds
+            self.nOver = 0
+            self.nClear = 0
+        if self.nOver >= self.downSec and self.level < len(self.ladder)-1:
+            self.level += 1
+            self.reasons = over
+        elif self.nClear >= self.upSec and self.level > 0:
+            self.level -= 1
+            self.reasons = []
+        else:
+            return False
+        self.nOver = 0
+        self.nClear = 0
+        return True
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+class SnapshotPool:
+    """ Thread pool, shared by cams, for encoding frames to image files
+    (cv2.imwrite) outside of the writer thread of each cam.
+    A file path (with its frame index) is decided when a frame is
+      submitted, so file indices follow the order of frames regardless of
+      the order in which encoding finishes.
+    When 'maxPending' frames are waiting, submit() blocks, so that
+      memory usage stays bounded.
+
+    Args:
+        nWorkers (int): Number of threads for encoding.
+        maxPending (int): Maximum number of frames waiting or being encoded.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self, nWorkers=4, maxPending=64):
+        if DEBUG: print("SnapshotPool.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.nWorkers = nWorkers # number of worker threads
+        self.ex = ThreadPoolExecutor(max_workers=nWorkers) # worker threads
+        self.slots = BoundedSemaphore(maxPending) # for limiting queue depth
+        self.maxPending = maxPending
+        self.lock = Lock()
+        self.nPending = 0 # number of frames waiting or being encoded
+        self.maxDepth = 0 # maximum of 'nPending'
+        self.nDone = 0 # number of written images
+        self.nFailed = 0 # number of failed writings
+        self.encTime = 0.0 # total time (seconds) for encoding & writing
+        ##### end of setting up attributes -----
+
+    #-------------------------------------------------------------------
+
+    def submit(self, fp, frame, params=None, metrics=None):
+        """ Queue a frame to be written as an image file.
+        'frame' should not be modified after submitting.
+
+        Args:
+            fp (str): File path of image.
+            frame (numpy.ndarray): Frame image, or 1-D array of an already
+              encoded image (such as JPEG data of MJPEG cams), which is
+              written as it is.
+            params (None/list): Parameters for cv2.imwrite
+              such as [cv2.IMWRITE_JPEG_QUALITY, 95].
+            metrics (None/StageMetrics): Metrics to observe time of
+              encoding & writing ('encode' stage) and to count failures
+              ('encFailed').
+
+        Returns:
+            future (concurrent.futures.Future): Result of writing (bool).
+        """
+        #if DEBUG: print("SnapshotPool.submit()")
+
+        if params == None: params = []
+
+        self.slots.acquire() # wait when too many frames are pending
+        with self.lock:
+            self.nPending += 1
+            self.maxDepth = max(self.maxDepth, self.nPending)
+        return self.ex.submit(self._write, fp, frame, params, metrics)
+
+    #-------------------------------------------------------------------
+
+    def encode(self, frame, ext=".jpg", params=None, metrics=None):
+        """ Queue a frame to be encoded (without writing a file),
+        such as for appending to an image pack.
+        'frame' should not be modified after submitting.
+
+        Args:
+            frame (numpy.ndarray): Frame image, or 1-D array of an already
+              encoded image, which is returned as it is.
+            ext (str): Extension for cv2.imencode, such as '.jpg'.
+            params (None/list): Parameters for cv2.imencode.
+            metrics (None/StageMetrics): Metrics to observe time of
+              encoding ('encode' stage) and to count failures
+              ('encFailed').
+
+        Returns:
+            future (concurrent.futures.Future): Encoded image
+              (numpy.ndarray) or None when it failed.
+        """
+        #if DEBUG: print("SnapshotPool.encode()")
+
+        if params == None: params = []
+
+        self.slots.acquire() # wait when too many frames are pending
+        with self.lock:
+            self.nPending += 1
+            self.maxDepth = max(self.maxDepth, self.nPending)
+        return self.ex.submit(self._encode, frame, ext, params, metrics)
+
+    #-------------------------------------------------------------------
+
+    def _encode(self, frame, ext, params, metrics=None):
+        t = time()
+        try:
+            if frame.ndim == 1: # encoded already
+                enc = frame
+            else:
+                ret, enc = cv2.imencode(ext, frame, params)
+                if not ret: enc = None
+        except Exception as e:
+            print("[ERROR] encoding: %s"%(str(e)))
+            enc = None
+        self._done(time()-t, enc is not None, metrics)
+        return enc
+
+    #-------------------------------------------------------------------
+
+    def _done(self, t, ret, metrics=None):
+        with self.lock:
+            self.nPending -= 1
+            self.encTime += t
+            if metrics != None:
+                metrics.observe("encode", t)
+                if not ret: metrics.inc("encFailed")
+            if ret: self.nDone += 1
+            else: self.nFailed += 1
+        self.slots.release()
+
+    #-------------------------------------------------------------------
+
+    def _write(self, fp, frame, params, metrics=None):
+        t = time()
+        try:
+            if frame.ndim == 1: # encoded already
+                with open(fp, "wb") as f: f.write(frame.tobytes())
+                ret = True
+            else:
+                ret = cv2.imwrite(fp, frame, params)
+        except Exception as e:
+            print("[ERROR] %s: %s"%(fp, str(e)))
+            ret = False
+        self._done(time()-t, ret, metrics)
+        return ret
+
+    #-------------------------------------------------------------------
+
+    def getStats(self):
+        """ Return queue depth and counters.
+
+        Args: None
+
+        Returns:
+            stats (dict): Counters
+        """
+        if DEBUG: print("SnapshotPool.getStats()")
+
+        with self.lock:
+            n = self.nDone + self.nFailed
+            if n == 0: encMS = 0.0
+            else: encMS = self.encTime / n * 1000
+            stats = dict(pending=self.nPending,
+                         maxDepth=self.maxDepth,
+                         maxPending=self.maxPending,
+                         done=self.nDone,
+                         failed=self.nFailed,
+                         encMS=encMS)
+        return stats
+
+    #-------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+
+_snapshotPool = None # SnapshotPool shared by cams in this process
+_snapshotPoolLock = Lock()
+
+def getSnapshotPool():
+    """ Return SnapshotPool shared by cams in this process.
+
+    Args: None
+
+    Returns:
+        (SnapshotPool)
+    """
+    global _snapshotPool
+    with _snapshotPoolLock:
+        if _snapshotPool is None: _snapshotPool = SnapshotPool()
+    return _snapshotPool
+
+#=======================================================================
+
+class PreTrigBuf:
+    """ Memory-bounded buffer of the last frames before recording starts
+    (pre-trigger). Frames are kept JPEG-encoded with their timestamps;
+    1-D arrays (JPEG data of MJPEG cams) are kept as they are.
+    Frames older than 'dur' seconds from the newest one are removed,
+      and the oldest frames are removed as well while the total size
+      exceeds 'maxBytes'.
+
+    Args:
+        dur (float): Duration (seconds) of frames to keep.
+        quality (int): JPEG quality (0-100) of kept frames.
+        maxBytes (int): Maximum total bytes of kept frames.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self, dur, quality=90, maxBytes=256*1024*1024):
+        if DEBUG: print("PreTrigBuf.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.dur = dur # duration (seconds) of frames to keep
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+        self.maxBytes = maxBytes # maximum total bytes of kept frames
+        self.frames = deque() # (encoded frame, timestamp)
+        self.nBytes = 0 # total bytes of kept frames
+        self.nDropped = 0 # number of frames removed due to 'maxBytes'
+        ##### end of setting up attributes -----
+
+    #-------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.frames)
+
+    #-------------------------------------------------------------------
+
+    def add(self, frame, ts):
+        """ Encode and keep a frame.
+
+        Args:
+            frame (numpy.ndarray): Frame image, or 1-D array of JPEG data.
+            ts (tuple): Monotonic and wall-clock timestamps of the frame.
+
+        Returns:
+            None
+        """
+        #if DEBUG: print("PreTrigBuf.add()")
+
+        if frame.ndim == 1: # JPEG data
+            enc = frame.copy()
+        else:
+            ret, enc = cv2.imencode(".jpg", frame, self.params)
+            if not ret: return
+        self.frames.append((enc, ts))
+        self.nBytes += enc.nbytes
+        while len(self.frames) > 0 and \
+          (ts[0]-self.frames[0][1][0] > self.dur or self.nBytes > self.maxBytes):
+            if self.nBytes > self.maxBytes and \
+              ts[0] - self.frames[0][1][0] <= self.dur:
+                self.nDropped += 1
+            self.nBytes -= self.frames.popleft()[0].nbytes
+
+    #-------------------------------------------------------------------
+
+    def getDuration(self):
+        """ Return duration (seconds) between the oldest and newest frame.
+
+        Args: None
+
+        Returns:
+            (float): Duration in seconds.
+        """
+        if len(self.frames) == 0: return 0.0
+        return self.frames[-1][1][0] - self.frames[0][1][0]
+
+    #-------------------------------------------------------------------
+
+    def popAll(self, decode=True):
+        """ Decode and remove all kept frames, from the oldest one.
+
+        Args:
+            decode (bool): Whether to decode frames; JPEG data (1-D array)
+              is returned when it's False.
+
+        Returns:
+            (generator): (frame, timestamps) of each kept frame.
+        """
+        if DEBUG: print("PreTrigBuf.popAll()")
+
+        while len(self.frames) > 0:
+            enc, ts = self.frames.popleft()
+            self.nBytes -= enc.nbytes
+            if decode: yield cv2.imdecode(enc, cv2.IMREAD_UNCHANGED), ts
+            else: yield enc, ts
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+class MotionDetector:
+    """ Detecting motion by differencing a downsampled grayscale copy
+    of each frame from a running average of previous frames.
+
+    Args:
+        thr (int): Threshold of intensity difference (0-255) for
+          a pixel to be counted as changed.
+        minArea (float): Minimum ratio (0.0-1.0) of changed pixels
+          in ROI for a frame to be regarded as having motion.
+        procWidth (int): Width of downsampled frame for processing.
+        roi (None/tuple): Region of interest (x, y, width, height)
+          in coordinates of original frame.
+        maskFP (str): File path of a mask image (same aspect ratio as
+          frames); non-zero pixels are regarded as ROI.
+        alpha (float): Weight of a new frame in the running average.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self, thr=25, minArea=0.005, procWidth=160, roi=None,
+                 maskFP="", alpha=0.1):
+        if DEBUG: print("MotionDetector.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.thr = thr # threshold of intensity difference
+        self.minArea = minArea # minimum ratio of changed pixels
+        self.procWidth = procWidth # width of frame for processing
+        self.roi = roi # region of interest (x, y, w, h)
+        self.maskFP = maskFP # file path of mask image
+        self.alpha = alpha # weight of a new frame in running average
+        self.pSz = None # frame size for processing
+        self.mask = None # mask (uint8 array) of ROI in processing size
+        self.nMaskPx = 0 # number of pixels in ROI
+        self.bg = None # running average (float32 array) of frames
+        self.bgU8 = None # buffer of running average in uint8
+        self.diff = None # buffer of differences
+        self.level = 0.0 # ratio of changed pixels of the last frame
+        self.fSz = None # frame size
+        ##### end of setting up attributes -----
+
+    #-------------------------------------------------------------------
+
+    def _initMask(self, fSz):
+        """ Set processing size and ROI mask for the given frame size.
+
+        Args:
+            fSz (tuple): Frame size (width, height).
+
+        Returns:
+            None
+        """
+        if DEBUG: print("MotionDetector._initMask()")
+
+        pw = min(self.procWidth, fSz[0])
+        ph = max(1, int(round(fSz[1] * pw / fSz[0])))
+        self.pSz = (pw, ph)
+        self.mask = np.full((ph, pw), 255, dtype=np.uint8)
+        if self.maskFP != "":
+            m = cv2.imread(self.maskFP, cv2.IMREAD_GRAYSCALE)
+            if m is None:
+                raise FileNotFoundError("Mask image is not found: %s"%(
+                                                                self.maskFP))
+            m = cv2.resize(m, self.pSz, interpolation=cv2.INTER_NEAREST)
+            self.mask[m == 0] = 0
+        if self.roi != None:
+            s = pw / fSz[0]
+            x, y, w, h = [int(round(v*s)) for v in self.roi]
+            rMask = np.zeros_like(self.mask)
+            rMask[y:y+max(1,h), x:x+max(1,w)] = 255
+            self.mask = cv2.bitwise_and(self.mask, rMask)
+        self.nMaskPx = max(1, cv2.countNonZero(self.mask))
+        self.diff = np.zeros((ph, pw), dtype=np.uint8)
+        self.bgU8 = np.zeros((ph, pw), dtype=np.uint8)
+        self.bg = None
+
+    #-------------------------------------------------------------------
+
+    def update(self, frame):
+        """ Process a frame and return whether it has motion.
+
+        Args:
+            frame (numpy.ndarray): Frame image (BGR or grayscale).
+
+        Returns:
+            (bool): Whether motion is detected.
+        """
+        #if DEBUG: print("MotionDetector.update()")
+
+        fSz = (frame.shape[1], frame.shape[0])
+        if self.pSz is None or self.fSz != fSz:
+            self.fSz = fSz
+            self._initMask(fSz)
+        # INTER_LINEAR is much faster than INTER_AREA for large frames;
+        #   noise of sub-sampling is reduced by blurring the small image.
+        small = cv2.resize(frame, self.pSz, interpolation=cv2.INTER_LINEAR)
+        if small.ndim == 3: small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        small = cv2.blur(small, (3,3))
+        if self.bg is None:
+            self.bg = small.astype(np.float32)
+            return False
+        cv2.convertScaleAbs(self.bg, dst=self.bgU8)
+        cv2.absdiff(small, self.bgU8, dst=self.diff)
+        cv2.accumulateWeighted(small, self.bg, self.alpha)
+        cv2.threshold(self.diff, self.thr, 255, cv2.THRESH_BINARY,
+                      dst=self.diff)
+        cv2.bitwise_and(self.diff, self.mask, dst=self.diff)
+        self.level = cv2.countNonZero(self.diff) / self.nMaskPx
+        return self.level >= self.minArea
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+class TileCompositor:
+    """ Composite preview frames of cams, tile by tile, into
+    a persistent RGB buffer which can be used directly as the buffer of
+      a display bitmap (such as wx.Bitmap.FromBuffer).
+    A tile is redrawn only when its cam has a new frame (by sequence
+      number of the mailbox). Each new frame is resized into a per-tile
+      scratch buffer, labelled there and converted (BGR to RGB) directly
+      into its tile of the RGB buffer,
+      so the cost is proportional to the number of changed tiles.
+    Single-channel (grayscale) frames are resized into a single-channel
+      scratch buffer first, then converted to BGR.
+
+    Args:
+        sz (tuple): Size (width, height) of the whole display.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self, sz):
+        if DEBUG: print("TileCompositor.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.sz = tuple(sz) # size of display
+        self.rgb = np.zeros((sz[1], sz[0], 3), dtype=np.uint8) # RGB buffer
+        self.tiles = {} # (x, y, w, h) of tile of each cam
+        self.seqs = {} # sequence number of frame drawn in each tile
+        self.scratch = {} # scratch buffer (BGR) of each tile
+        self.grayScratch = {} # scratch buffer of each tile for
+          # single-channel frames; made on the first one
+        ##### end of setting up attributes -----
+
+    #-------------------------------------------------------------------
+
+    def setLayout(self, cIndices, nCOnSide, tSz):
+        """ Set tiles of cams in a grid and clear the buffer.
+
+        Args:
+            cIndices (list): Indices of cams, in order of tiles.
+            nCOnSide (int): Number of tiles on one side of the grid.
+            tSz (tuple): Size (width, height) of a tile.
+
+        Returns:
+            None
+        """
+        if DEBUG: print("TileCompositor.setLayout()")
+
+        self.rgb[:] = 0
+        self.tiles = {}
+        self.seqs = {}
+        self.scratch = {}
+        self.grayScratch = {}
+        w, h = tSz
+        for i, cIdx in enumerate(cIndices):
+            x = w * (i % nCOnSide)
+            y = h * (i // nCOnSide)
+            # clip a tile at the edge of display
+            tw = min(w, self.sz[0]-x)
+            th = min(h, self.sz[1]-y)
+            if tw <= 0 or th <= 0: continue
+            self.tiles[cIdx] = (x, y, tw, th)
+            self.seqs[cIdx] = -1
+            self.scratch[cIdx] = np.zeros((th, tw, 3), dtype=np.uint8)
+
+    #-------------------------------------------------------------------
+
+    def update(self, cIdx, frame, seq, label=""):
+        """ Redraw the tile of a cam when the frame is new.
+
+        Args:
+            cIdx (int): Index of cam.
+            frame (None/numpy.ndarray): Frame image (BGR or grayscale).
+            seq (int): Sequence number of the frame.
+            label (str): Text to draw on the tile.
+
+        Returns:
+            (bool): Whether the tile was redrawn.
+        """
+        #if DEBUG: print("TileCompositor.update()")
+
+        if frame is None or not cIdx in self.tiles: return False
+        if seq == self.seqs[cIdx]: return False
+        x, y, w, h = self.tiles[cIdx]
+        s = self.scratch[cIdx]
+        if frame.ndim == 2: # single-channel frame
+            if frame.shape != s.shape[:2]:
+                g = self.grayScratch.get(cIdx, None)
+                if g is None:
+                    g = np.zeros((h, w), dtype=np.uint8)
+                    self.grayScratch[cIdx] = g
+                cv2.resize(frame, (w, h), dst=g)
+                frame = g
+            cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR, dst=s)
+        elif frame.shape[:2] == s.shape[:2]: s[:] = frame
+        else: cv2.resize(frame, (w, h), dst=s)
+        if label != "":
+            cv2.putText(s, label, (5, 20), cv2.FONT_HERSHEY_PLAIN, 1.0,
+                        (0,127,255), 1)
+        ### convert BGR to RGB directly into the tile of RGB buffer
+        v = self.rgb[y:y+h, x:x+w]
+        r = cv2.cvtColor(s, cv2.COLOR_BGR2RGB, dst=v)
+        if not np.shares_memory(r, self.rgb): v[:] = r # when OpenCV
+          # returned a new array instead of writing into the view
+        self.seqs[cIdx] = seq
+        return True
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,377 @@
+# coding: UTF-8
+"""
+Process backend of pyCamRec; running each Cam in its own process,
+  so that capturing and encoding of cams don't compete for the GIL
+  with each other and with the GUI.
+Preview frames travel to the main process through a ring buffer
+  in shared memory; control messages ('rec_init', 'rec_stop', 'quit')
+  are sent through a pipe. Metrics of the Cam (every second) and
+  its log records are sent back through the same pipe, so that only
+  the main process writes the log file.
+
+Dependency:
+    NumPy (1.14)
+    OpenCV (3.4)
+    Python (3.8; for multiprocessing.shared_memory)
+
+Changelog
+------------------------------------------------------------------------
+v.0.1: (2026.10.17)
+  - Initial development.
+"""
+
+import multiprocessing as mp
+from threading import Thread, Event
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from cam import Cam
+from camLog import PipeLogger, getLogger, setLogger
+
+DEBUG = False
+__version__ = "0.1"
+
+#=======================================================================
+
+class ShmFrameRing:
+    """ Ring buffer of frames in shared memory.
+    A single producer (a Cam process) writes frames and
+      a reader (the main process) copies the latest one out.
+    Each slot has a sequence number which is set to -1 while the slot
+      is being written, so that a reader can detect a torn frame.
+
+    Args:
+        shape (tuple): Shape of a frame (height, width, channels).
+        nSlots (int): Number of frame slots.
+        name (None/str): Name of existing shared memory to attach to.
+          When it's None, new shared memory is created.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self, shape, nSlots=3, name=None):
+        if DEBUG: print("ShmFrameRing.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.shape = tuple(shape) # shape of a frame
+        self.nSlots = nSlots # number of slots
+        self.isOwner = (name is None) # whether this object created memory
+        fBytes = int(np.prod(self.shape)) # bytes of a frame
+        hBytes = 8 + 8*nSlots*2 # bytes of header
+        if self.isOwner:
+            self.shm = SharedMemory(create=True, size=hBytes+fBytes*nSlots)
+        else:
+            self.shm = SharedMemory(name=name)
+        buf = self.shm.buf
+        # sequence number of the next frame to write
+        self.wSeq = np.ndarray((1,), dtype=np.int64, buffer=buf, offset=0)
+        # sequence number of frame in each slot (-1 while writing)
+        self.slotSeq = np.ndarray((nSlots,), dtype=np.int64, buffer=buf,
+                                  offset=8)
+        # timestamp of frame in each slot
+        self.ts = np.ndarray((nSlots,), dtype=np.float64, buffer=buf,
+                             offset=8+8*nSlots)
+        # frame slots
+        self.buf = np.ndarray((nSlots,)+self.shape, dtype=np.uint8,
+                              buffer=buf, offset=hBytes)
+        ##### end of setting up attributes -----
+        if self.isOwner:
+            self.wSeq[0] = 0
+            self.slotSeq[:] = -1
+
+    #-------------------------------------------------------------------
+
+    def getInfo(self):
+        """ Return information to attach to this ring from other process.
+
+        Args: None
+
+        Returns:
+            (dict): Name of shared memory, frame shape and number of slots.
+        """
+        if DEBUG: print("ShmFrameRing.getInfo()")
+
+        return dict(name=self.shm.name, shape=self.shape, nSlots=self.nSlots)
+
+    #-------------------------------------------------------------------
+
+    def put(self, frame, ts=-1):
+        """ Write a frame into the next slot (producer side).
+
+        Args:
+            frame (numpy.ndarray): Frame image.
+            ts (float): Timestamp of the frame.
+
+        Returns:
+            (bool): Whether the frame was stored.
+        """
+        #if DEBUG: print("ShmFrameRing.put()")
+
+        if frame.shape != self.shape: return False
+        seq = int(self.wSeq[0])
+        i = seq % self.nSlots
+        self.slotSeq[i] = -1 # mark as being written
+        self.buf[i] = frame
+        self.ts[i] = ts
+        self.slotSeq[i] = seq
+        self.wSeq[0] = seq + 1
+        return True
+
+    #-------------------------------------------------------------------
+
+    def take(self, lastSeq=-1):
+        """ Copy the latest frame out (reader side).
+        Same interface as FrameMailbox.take().
+
+        Args:
+            lastSeq (int): Sequence number of the frame taken last time;
+              nothing is copied when there's no newer frame.
+
+        Returns:
+            frame (None/numpy.ndarray): The latest frame.
+            seq (int): Number of frames written so far.
+        """
+        #if DEBUG: print("ShmFrameRing.take()")
+
+        seq = int(self.wSeq[0]) - 1
+        if seq < 0: return None, 0
+        if seq+1 == lastSeq: return None, lastSeq
+        i = seq % self.nSlots
+        frame = self.buf[i].copy()
+        if self.slotSeq[i] != seq: # slot was overwritten while copying
+            return None, seq+1
+        return frame, seq+1
+
+    #-------------------------------------------------------------------
+
+    def clear(self):
+        """ Same interface as FrameMailbox.clear(); nothing to do.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("ShmFrameRing.clear()")
+
+    #-------------------------------------------------------------------
+
+    def close(self):
+        """ Release shared memory; unlink it when this object created it.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("ShmFrameRing.close()")
+
+        # numpy arrays should be released before closing shared memory
+        self.wSeq = self.slotSeq = self.ts = self.buf = None
+        self.shm.close()
+        if self.isOwner: self.shm.unlink()
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+class PipeQueue:
+    """ Wrapper of a multiprocessing pipe connection with a part of
+    queue.Queue interface (put, get, empty), used by Cam.run and the GUI.
+    When the other end is gone, 'quit' is returned.
+
+    Args:
+        conn (multiprocessing.connection.Connection): One end of a pipe.
+    """
+
+    def __init__(self, conn):
+        if DEBUG: print("PipeQueue.__init__()")
+
+        self.conn = conn # connection
+
+    #-------------------------------------------------------------------
+
+    def put(self, msg, block=True, timeout=None):
+        try: self.conn.send(msg)
+        except (EOFError, OSError): pass
+
+    #-------------------------------------------------------------------
+
+    def get(self, block=True, timeout=None):
+        try: return self.conn.recv()
+        except (EOFError, OSError): return "quit"
+
+    #-------------------------------------------------------------------
+
+    def empty(self):
+        try: return not self.conn.poll()
+        except (EOFError, OSError): return False
+
+    #-------------------------------------------------------------------
+
+    def close(self):
+        self.conn.close()
+
+#=======================================================================
+
+def runCamProc(cIdx, src, settings, ringInfo, conn, recFolder, logFile):
+    """ Entry function of a Cam process.
+
+    Args:
+        cIdx (int): Index of cam.
+        src (int/str): Source of frames (see camSource.openSource).
+        settings (dict): Recording settings of Cam.
+        ringInfo (dict): Information to attach to ShmFrameRing.
+        conn (multiprocessing.connection.Connection): Pipe to main process.
+        recFolder (str/OutputRoots): Folder to save recorded
+          videos/images, or output roots to choose a folder from.
+        logFile (str): Log file.
+
+    Returns:
+        None
+    """
+    if DEBUG: print("camProc.runCamProc()")
+
+    ring = ShmFrameRing(ringInfo["shape"], ringInfo["nSlots"],
+                        name=ringInfo["name"])
+    logger = PipeLogger(conn) # log records go to the main process
+    setLogger(logFile, logger)
+    cam = Cam(None, cIdx, logFile, src=src)
+    cam.setSettings(settings)
+    stopEvt = Event()
+    def sendMetrics():
+        while not stopEvt.wait(1.0):
+            try: logger.send(("metrics", cam.getMetrics()))
+            except RuntimeError: break
+    mTh = Thread(target=sendMetrics, daemon=True)
+    mTh.start()
+    try:
+        cam.run(ring, PipeQueue(conn), recFolder)
+    finally:
+        stopEvt.set()
+        mTh.join()
+        cam.close()
+        ring.close()
+        conn.close()
+
+#=======================================================================
+
+class CamProcess:
+    """ Main-process side of a Cam running in its own process.
+    It's used in place of a Thread (start, join),
+      FrameMailbox (take, clear) and queue to thread (q2t) of the Cam.
+    VideoCapture of the given Cam should be closed before start(),
+      because the process opens the cam by itself.
+
+    Args:
+        cam (Cam): Cam to run in a process.
+        recFolder (str/OutputRoots): Folder to save recorded
+          videos/images, or output roots to choose a folder from.
+        nSlots (int): Number of slots of shared memory ring.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self, cam, recFolder, nSlots=3):
+        if DEBUG: print("CamProcess.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.cIdx = cam.cIdx # index of cam
+        # ring buffer for preview frames
+        self.ring = ShmFrameRing(cam.getFrameShape(), nSlots)
+        ctx = mp.get_context("spawn") # fork is not safe with GUI & OpenCV
+        pConn, cConn = ctx.Pipe()
+        self.q2t = PipeQueue(pConn) # for sending messages to the process
+        args = (cam.cIdx, cam.src, cam.getSettings(), self.ring.getInfo(), cConn,
+                recFolder, cam.logFile,)
+        self.proc = ctx.Process(target=runCamProc, args=args, daemon=True)
+        self.metrics = None # the latest metrics snapshot from the process
+        self.logFile = cam.logFile # log file
+        # thread receiving metrics and log records from the process
+        self.rTh = Thread(target=self.recvMsgs, daemon=True)
+        ##### end of setting up attributes -----
+
+    #-------------------------------------------------------------------
+
+    def start(self):
+        if DEBUG: print("CamProcess.start()")
+        self.proc.start()
+        self.rTh.start()
+
+    #-------------------------------------------------------------------
+
+    def recvMsgs(self):
+        """ Function for thread receiving messages from the process
+        until it ends; metrics snapshots and log records.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("CamProcess.recvMsgs()")
+
+        conn = self.q2t.conn
+        while True:
+            try:
+                if not conn.poll(0.2):
+                    if self.proc.is_alive(): continue
+                    else: break
+                msg = conn.recv()
+            except (EOFError, OSError):
+                break
+            if msg[0] == "metrics": self.metrics = msg[1]
+            elif msg[0] == "log": getLogger(self.logFile).put(msg[1])
+
+    #-------------------------------------------------------------------
+
+    def join(self, timeout=10):
+        """ Wait for the process to end; terminate it when it's not
+        finished in 'timeout' seconds. Then release resources.
+
+        Args:
+            timeout (float): Seconds to wait.
+
+        Returns:
+            None
+        """
+        if DEBUG: print("CamProcess.join()")
+
+        self.proc.join(timeout)
+        if self.proc.is_alive():
+            self.proc.terminate()
+            self.proc.join()
+        self.rTh.join()
+        self.q2t.close()
+        self.ring.close()
+
+    #-------------------------------------------------------------------
+
+    def take(self, lastSeq=-1):
+        return self.ring.take(lastSeq)
+
+    #-------------------------------------------------------------------
+
+    def getMetrics(self):
+        """ Return the latest metrics snapshot sent from the process.
+
+        Args: None
+
+        Returns:
+            (None/dict): Snapshot (see StageMetrics.snapshot).
+        """
+        if DEBUG: print("CamProcess.getMetrics()")
+
+        return self.metrics
+
+    #-------------------------------------------------------------------
+
+    def clear(self):
+        self.ring.clear()
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,481 @@
+# coding: UTF-8
+"""
+Frame sources of pyCamRec other than attached cams; synthetic
+  test pattern and replay of a video file or an image folder.
+They have the part of cv2.VideoCapture interface used by Cam
+  (isOpened, read, grab, retrieve, get, set, release, getBackendName)
+  and deliver frames at a set rate, so that the whole pipeline can run
+  without physical cams.
+
+A source is specified with an int (cam index) or a string;
+  'synth:640x480@30' (test pattern; '...@30:noise' for random noise),
+  path of a video file, or path of a folder of images.
+
+Dependency:
+    NumPy (1.14)
+    OpenCV (3.4)
+
+Changelog
+------------------------------------------------------------------------
+v.0.1: (2026.10.17)
+  - Initial development.
+  - Emulation of MJPEG cams (CAP_PROP_FOURCC & CAP_PROP_CONVERT_RGB).
+  - Frame size of SynthSource can be set (CAP_PROP_FRAME_WIDTH/HEIGHT).
+"""
+
+from os import path, listdir
+from time import time
+
+import cv2
+import numpy as np
+
+from camPipeline import FramePacer
+
+DEBUG = False
+__version__ = "0.1"
+
+#=======================================================================
+
+class VirtualSource:
+    """ Base class of virtual sources, pacing grab() at 'fps'.
+    Subclasses implement grabFrame() and retrieveFrame().
+    Like an MJPEG cam, when FourCC is set to MJPG and CONVERT_RGB to 0,
+      retrieve() returns JPEG data (1 x N array) instead of an image.
+      Encoding stands for the cam's own encoder, so its time is
+      counted in reading.
+
+    Args:
+        fps (float): Frames per second; -1 for as fast as possible.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    backendName = "VIRTUAL"
+
+    def __init__(self, fps=30):
+        if DEBUG: print("VirtualSource.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.fps = fps # frames per second
+        self.pacer = FramePacer(fps) # for delivering frames at 'fps'
+        self.isOpen = True # whether the source is opened
+        self.fSz = (0, 0) # frame size (width, height)
+        self.nFrames = 0 # number of frames grabbed
+        self.fourcc = 0 # FourCC set by CAP_PROP_FOURCC
+        self.convertRGB = True # CAP_PROP_CONVERT_RGB
+        ##### end of setting up attributes -----
+
+    #-------------------------------------------------------------------
+
+    def isOpened(self):
+        return self.isOpen
+
+    #-------------------------------------------------------------------
+
+    def grab(self):
+        """ Wait for the next frame time, then grab a frame.
+
+        Args: None
+
+        Returns:
+            (bool): Whether a frame was grabbed.
+        """
+        #if DEBUG: print("VirtualSource.grab()")
+
+        if not self.isOpen: return False
+        self.pacer.wait()
+        if not self.grabFrame(): return False
+        self.nFrames += 1
+        return True
+
+    #-------------------------------------------------------------------
+
+    def retrieve(self, image=None, flag=0):
+        """ Return the grabbed frame.
+
+        Args:
+            image (None/numpy.ndarray): Array to store the frame.
+            flag (int): Not used; for compatibility with VideoCapture.
+
+        Returns:
+            ret (bool): Whether the frame was retrieved.
+            frame (None/numpy.ndarray): Frame image.
+        """
+        #if DEBUG: print("VirtualSource.retrieve()")
+
+        if not self.isOpen: return False, None
+        frame = self.retrieveFrame()
+        if frame is None: return False, None
+        if not self.convertRGB and \
+          self.fourcc == cv2.VideoWriter_fourcc(*"MJPG"):
+            ret, enc = cv2.imencode(".jpg", frame)
+            return ret, enc.reshape(1, -1)
+        if image is not None and image.shape == frame.shape:
+            image[:] = frame
+            frame = image
+        return True, frame
+
+    #-------------------------------------------------------------------
+
+    def read(self, image=None):
+        if not self.grab(): return False, None
+        return self.retrieve(image)
+
+    #-------------------------------------------------------------------
+
+    def get(self, propId):
+        """ Return a property; only frame size, rate, position, FourCC
+        and CONVERT_RGB.
+
+        Args:
+            propId (int): Property ID such as cv2.CAP_PROP_FPS.
+
+        Returns:
+            (float): Value of the property; 0 for unsupported property.
+        """
+        if DEBUG: print("VirtualSource.get()")
+
+        if propId == cv2.CAP_PROP_FRAME_WIDTH: return float(self.fSz[0])
+        elif propId == cv2.CAP_PROP_FRAME_HEIGHT: return float(self.fSz[1])
+        elif propId == cv2.CAP_PROP_FPS: return float(max(self.fps, 0))
+        elif propId == cv2.CAP_PROP_POS_FRAMES: return float(self.nFrames)
+        elif propId == cv2.CAP_PROP_FOURCC: return float(self.fourcc)
+        elif propId == cv2.CAP_PROP_CONVERT_RGB: return float(self.convertRGB)
+        return 0.0
+
+    #-------------------------------------------------------------------
+
+    def set(self, propId, value):
+        """ Set a property; only frame rate, FourCC and CONVERT_RGB
+        can be changed.
+
+        Args:
+            propId (int): Property ID such as cv2.CAP_PROP_FPS.
+            value (float): Value of the property.
+
+        Returns:
+            (bool): Whether the property was set.
+        """
+        if DEBUG: print("VirtualSource.set()")
+
+        if propId == cv2.CAP_PROP_FPS:
+            self.fps = value
+            self.pacer.setFPSLimit(value)
+            return True
+        elif propId == cv2.CAP_PROP_FOURCC:
+            self.fourcc = int(value)
+            return True
+        elif propId == cv2.CAP_PROP_CONVERT_RGB:
+            self.convertRGB = bool(value)
+            return True
+        return False
+
+    #-------------------------------------------------------------------
+
+    def getBackendName(self):
+        return self.backendName
+
+    #-------------------------------------------------------------------
+
+    def release(self):
+        if DEBUG: print("VirtualSource.release()")
+        self.isOpen = False
+
+    #-------------------------------------------------------------------
+
+    def grabFrame(self):
+        raise NotImplementedError
+
+    #-------------------------------------------------------------------
+
+    def retrieveFrame(self):
+        raise NotImplementedError
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+class SynthSource(VirtualSource):
+    """ Source of generated test pattern frames.
+    The pattern scrolls horizontally and the frame number is drawn
+      on each frame, so that consecutive frames differ
+      (for motion detection and for realistic compression).
+
+    Args:
+        fSz (tuple): Frame size (width, height).
+        fps (float): Frames per second; -1 for as fast as possible.
+        pattern (str): 'bars' (color bars) or 'noise' (random noise;
+          the worst case for compression).
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    backendName = "SYNTH"
+    patterns = ["bars", "noise"]
+
+    def __init__(self, fSz=(640, 480), fps=30, pattern="bars"):
+        if DEBUG: print("SynthSource.__init__()")
+
+        VirtualSource.__init__(self, fps)
+        if not pattern in self.patterns:
+            raise ValueError("Unknown pattern: %s"%(pattern))
+        ##### beginning of setting up attributes -----
+        self.fSz = tuple(fSz)
+        self.pattern = pattern # type of pattern
+        self.base = self.makePattern() # pattern image
+        self.shift = max(1, self.fSz[0]//120) # pixels to scroll per frame
+        ##### end of setting up attributes -----
+
+    #-------------------------------------------------------------------
+
+    def makePattern(self):
+        """ Make pattern image.
+
+        Args: None
+
+        Returns:
+            (numpy.ndarray): Pattern image.
+        """
+        if DEBUG: print("SynthSource.makePattern()")
+
+        w, h = self.fSz
+        if self.pattern == "bars":
+            colors = [(255,255,255), (0,255,255), (255,255,0), (0,255,0),
+                      (255,0,255), (0,0,255), (255,0,0), (0,0,0)]
+            img = np.zeros((h, w, 3), dtype=np.uint8)
+            bw = int(np.ceil(w/len(colors)))
+            for i, c in enumerate(colors): img[:, i*bw:(i+1)*bw] = c
+            # gradient in the bottom quarter
+            img[h*3//4:] = np.linspace(0, 255, w).astype(np.uint8)[None,:,None]
+        else:
+            rng = np.random.RandomState(0)
+            img = rng.randint(0, 256, (h, w, 3)).astype(np.uint8)
+        return img
+
+    #-------------------------------------------------------------------
+
+    def set(self, propId, value):
+        """ Set a property; frame size can be changed as well.
+
+        Args:
+            propId (int): Property ID such as cv2.CAP_PROP_FRAME_WIDTH.
+            value (float): Value of the property.
+
+        Returns:
+            (bool): Whether the property was set.
+        """
+        if DEBUG: print("SynthSource.set()")
+
+        if propId in [cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT]:
+            if value < 1: return False
+            if propId == cv2.CAP_PROP_FRAME_WIDTH:
+                self.fSz = (int(value), self.fSz[1])
+            else:
+                self.fSz = (self.fSz[0], int(value))
+            self.base = self.makePattern()
+            self.shift = max(1, self.fSz[0]//120)
+            return True
+        return VirtualSource.set(self, propId, value)
+
+    #-------------------------------------------------------------------
+
+    def grabFrame(self):
+        return True
+
+    #-------------------------------------------------------------------
+
+    def retrieveFrame(self):
+        """ Render the current frame.
+
+        Args: None
+
+        Returns:
+            frame (numpy.ndarray): Frame image.
+        """
+        #if DEBUG: print("SynthSource.retrieveFrame()")
+
+        w = self.fSz[0]
+        s = (self.nFrames*self.shift) % w
+        frame = np.empty_like(self.base)
+        frame[:, :w-s] = self.base[:, s:]
+        frame[:, w-s:] = self.base[:, :s]
+        frame[:40, :200] = 0
+        cv2.putText(frame, "%i"%(self.nFrames), (5, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255,255,255), 2)
+        return frame
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+class FileSource(VirtualSource):
+    """ Source replaying a video file or images in a folder.
+
+    Args:
+        fp (str): Path of a video file or a folder of images.
+        fps (float): Frames per second; -1 for the frame rate of
+          the video file (30 for an image folder).
+        loop (bool): Whether to restart from the first frame at the end.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    backendName = "FILE"
+    imgExts = [".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff"]
+
+    def __init__(self, fp, fps=-1, loop=True):
+        if DEBUG: print("FileSource.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.fp = fp # path of video file or image folder
+        self.loop = loop # whether to loop
+        self.cap = None # VideoCapture of video file
+        self.imgFiles = [] # image files in the folder
+        self.fIdx = -1 # index of current image file
+        self.frame = None # frame read by grabFrame
+        ##### end of setting up attributes -----
+        if path.isdir(fp):
+            self.imgFiles = sorted([path.join(fp, fn) for fn in listdir(fp) \
+                                if path.splitext(fn)[1].lower() in self.imgExts])
+            if self.imgFiles == []:
+                raise ValueError("No image in %s"%(fp))
+            if fps <= 0: fps = 30
+            frame = cv2.imread(self.imgFiles[0])
+        else:
+            self.cap = cv2.VideoCapture(fp)
+            if not self.cap.isOpened():
+                raise ValueError("Failed to open %s"%(fp))
+            if fps <= 0: fps = self.cap.get(cv2.CAP_PROP_FPS)
+            if fps <= 0 or fps > 1000: fps = 30
+            ret, frame = self.cap.read()
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        VirtualSource.__init__(self, fps)
+        self.fSz = (frame.shape[1], frame.shape[0])
+
+    #-------------------------------------------------------------------
+
+    def grabFrame(self):
+        """ Read the next frame; restart at the end when 'loop' is True.
+
+        Args: None
+
+        Returns:
+            (bool): Whether a frame was read.
+        """
+        #if DEBUG: print("FileSource.grabFrame()")
+
+        for i in range(2): # 2nd trial is after restarting
+            if self.cap is not None:
+                ret, self.frame = self.cap.read()
+            else:
+                self.fIdx += 1
+                ret = self.fIdx < len(self.imgFiles)
+                if ret: self.frame = cv2.imread(self.imgFiles[self.fIdx])
+            if ret and self.frame is not None: return True
+            if not self.loop: return False
+            ### restart
+            if self.cap is not None: self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            else: self.fIdx = -1
+        return False
+
+    #-------------------------------------------------------------------
+
+    def retrieveFrame(self):
+        return self.frame
+
+    #-------------------------------------------------------------------
+
+    def release(self):
+        if DEBUG: print("FileSource.release()")
+        VirtualSource.release(self)
+        if self.cap is not None: self.cap.release()
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+def openSource(src, backend=""):
+    """ Open a frame source.
+
+    Args:
+        src (int/str): Cam index, 'synth:WxH@FPS[:pattern]',
+          path of a video file or path of an image folder.
+        backend (str): Name of VideoCapture backend for a cam index.
+
+    Returns:
+        (cv2.VideoCapture/VirtualSource): Opened source.
+
+    Examples:
+        >>> openSource("synth:1280x720@30").read()[1].shape
+        (720, 1280, 3)
+        >>> openSource("trial1.mp4").get(cv2.CAP_PROP_FPS)
+        29.97
+    """
+    if DEBUG: print("camSource.openSource()")
+
+    if isinstance(src, str) and src.isdigit(): src = int(src)
+    if isinstance(src, int):
+        apiPref = getattr(cv2, "CAP_%s"%(backend), None)
+        if apiPref is None: return cv2.VideoCapture(src)
+        else: return cv2.VideoCapture(src, apiPref)
+    elif src.startswith("synth"):
+        items = src.split(":")
+        fSz = (640, 480)
+        fps = 30
+        pattern = "bars"
+        if len(items) > 1 and items[1] != "":
+            sz = items[1].split("@")
+            w, h = sz[0].split("x")
+            fSz = (int(w), int(h))
+            if len(sz) > 1: fps = float(sz[1])
+        if len(items) > 2: pattern = items[2]
+        return SynthSource(fSz, fps, pattern)
+    else:
+        return FileSource(src)
+
+#-----------------------------------------------------------------------
+
+def probeSources(sources):
+    """ Open sources and read the first frame of each.
+    Results have the same form as ones of fFuncs.probeCams().
+
+    Args:
+        sources (list): Source specifications (see openSource).
+
+    Returns:
+        cams (list): Dict of each source; 'idx' (index in 'sources'),
+          'src', 'cap', 'frame', 'fSz', 'backend' and 'time'.
+        report (dict): 'time', 'cache' ('none'), 'new' (empty) and
+          'camTime'.
+    """
+    if DEBUG: print("camSource.probeSources()")
+
+    t = time()
+    cams = []
+    for i, src in enumerate(sources):
+        t1 = time()
+        cap = openSource(src)
+        ret, frame = cap.read()
+        if ret != True:
+            cap.release()
+            raise ValueError("Failed to read a frame from %s"%(str(src)))
+        cams.append(dict(idx=i,
+                         src=src,
+                         cap=cap,
+                         frame=frame,
+                         fSz=(frame.shape[1], frame.shape[0]),
+                         backend=cap.getBackendName(),
+                         time=time()-t1))
+    report = dict(time=time()-t,
+                  cache="none",
+                  new=[],
+                  camTime=dict([(c["idx"], c["time"]) for c in cams]))
+    return cams, report
+
+#=======================================================================
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,394 @@
+# coding: UTF-8
+"""
+Output placement of pyCamRec over several root folders (disks).
+Free space and write latency of each root are monitored in a thread,
+  a recording of a cam is placed on the root with the least load
+  for its measured latency, and a recording moves to another root
+  (failover) before the disk of its root fills.
+
+Write latency is measured by writing a small probe file with fsync,
+  so it reflects the load of all cams writing to the disk as well.
+
+Dependency:
+    Python (3.7)
+
+Changelog
+------------------------------------------------------------------------
+v.0.1: (2026.10.17)
+  - Initial development.
+"""
+
+from os import path, mkdir, remove, fsync, getpid
+from shutil import disk_usage
+from threading import Thread, Lock, Event
+from time import monotonic
+
+from camLog import getLogger
+
+DEBUG = False
+__version__ = "0.1"
+
+MIN_FREE_MB = 2048 # free space (MB) to keep on a root
+PROBE_FILE = ".pCR_probe_%i" # file name for measuring write latency;
+  # with process ID, as Cam processes probe the same roots
+MIN_LAT_MS = 5.0 # latency floor for placement, so that roots on disks
+  # of similar speed are taken in turn rather than by measurement noise
+
+#=======================================================================
+
+class OutputRoots:
+    """ Root folders for recordings with monitoring of their disks.
+    Free space is checked every 'freeIntv' seconds and write latency
+      is measured every 'probeIntv' seconds.
+    A root is usable while its probe succeeds and its free space is
+      more than 'minFreeMB' (plus space needed by a new file).
+    It's pickled as its arguments, so that a Cam process gets its own
+      instance monitoring the same roots (see getOutputRoots).
+
+    Args:
+        roots (list): Root folders; created when they don't exist.
+        logFile (str): Log file; empty string for no log.
+        minFreeMB (float): Free space (MB) to keep on each root.
+        freeIntv (float): Interval (seconds) of checking free space.
+        probeIntv (float): Interval (seconds) of measuring write latency.
+        probeKB (int): Size (KB) of probe file.
+        statIntv (float): Interval (seconds) of logging stats of roots.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+
+    Examples:
+        >>> roots = OutputRoots(["/mnt/d0/rec", "/mnt/d1/rec"], "log.jsonl")
+        >>> roots.pick(0), roots.pick(1)
+        ('/mnt/d0/rec', '/mnt/d1/rec')
+        >>> roots.isUsable('/mnt/d0/rec', needMB=1024)
+        True
+    """
+
+    def __init__(self, roots, logFile="", minFreeMB=MIN_FREE_MB, freeIntv=1.0,
+                 probeIntv=5.0, probeKB=1024, statIntv=60.0):
+        if DEBUG: print("OutputRoots.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.roots = [path.abspath(r) for r in roots] # root folders
+        self.logFile = "" # log file; set after initial check
+        self.minFreeMB = minFreeMB # free space (MB) to keep on each root
+        self.freeIntv = freeIntv # interval of checking free space
+        self.probeIntv = probeIntv # interval of measuring write latency
+        self.probeKB = probeKB # size (KB) of probe file
+        self.statIntv = statIntv # interval of logging stats of roots
+        self.probeData = bytes(probeKB*1024) # data of probe file
+        self.stats = {} # stats of each root; 'freeMB', 'totalMB',
+          # 'latMS' (write latency of probe file, smoothed), 'MBps'
+          # (throughput of probe file, smoothed), 'ok' (whether probe
+          # succeeded), 'low' (whether free space is low)
+        self.assigned = {} # root of current recording of each cam
+        self.lock = Lock() # lock for 'stats' and 'assigned'
+        self.stopEvt = Event() # event to stop monitoring
+        self.mTh = None # monitoring thread
+        ##### end of setting up attributes -----
+
+        for r in self.roots:
+            if not path.isdir(r): mkdir(r)
+            self.stats[r] = dict(freeMB=-1.0, totalMB=-1.0, latMS=-1.0,
+                                 MBps=-1.0, ok=True, low=False)
+            self.checkFree(r)
+            self.probe(r)
+        # initial state isn't logged here, as this may be unpickled in
+        #   a Cam process before its logger is set; see getStats
+        self.logFile = logFile
+        self.mTh = Thread(target=self.monitor, daemon=True)
+        self.mTh.start()
+
+    #-------------------------------------------------------------------
+
+    def __reduce__(self):
+        return (getOutputRoots, (self.roots, self.logFile, self.minFreeMB,
+                                 self.freeIntv, self.probeIntv, self.probeKB,
+                                 self.statIntv))
+
+    #-------------------------------------------------------------------
+
+    def log(self, event, **fields):
+        if self.logFile != "": getLogger(self.logFile).log(event, **fields)
+
+    #-------------------------------------------------------------------
+
+    def checkFree(self, root):
+        """ Update free space of a root.
+
+        Args:
+            root (str): Root folder.
+
+        Returns:
+            None
+        """
+        #if DEBUG: print("OutputRoots.checkFree()")
+
+        try:
+            du = disk_usage(root)
+        except OSError as e:
+            self.setOK(root, False, str(e))
+            return
+        with self.lock:
+            st = self.stats[root]
+            st["freeMB"] = du.free/1e6
+            st["totalMB"] = du.total/1e6
+            low = st["freeMB"] <= self.minFreeMB
+            changed = low != st["low"]
+            st["low"] = low
+        if changed and low:
+            print("[WARNING] Free space of %s is low (%.0f MB)."%(root,
+                                                              du.free/1e6))
+            self.log("storage_low", root=root, freeMB=round(du.free/1e6, 1),
+                     minFreeMB=self.minFreeMB)
+        elif changed:
+            self.log("storage_free", root=root, freeMB=round(du.free/1e6, 1))
+
+    #-------------------------------------------------------------------
+
+    def probe(self, root):
+        """ Measure write latency of a root with a probe file.
+
+        Args:
+            root (str): Root folder.
+
+        Returns:
+            None
+        """
+        #if DEBUG: print("OutputRoots.probe()")
+
+        fp = path.join(root, PROBE_FILE%(getpid()))
+        t = monotonic()
+        try:
+            with open(fp, "wb") as f:
+                f.write(self.probeData)
+                f.flush()
+                fsync(f.fileno())
+            t = monotonic() - t
+            remove(fp)
+        except OSError as e:
+            self.setOK(root, False, str(e))
+            return
+        with self.lock:
+            st = self.stats[root]
+            latMS = t*1000
+            MBps = self.probeKB/1e3/max(t, 1e-6)
+            if st["latMS"] < 0: # first measurement
+                st["latMS"] = latMS
+                st["MBps"] = MBps
+            else: # smoothed
+                st["latMS"] += (latMS - st["latMS"]) * 0.3
+                st["MBps"] += (MBps - st["MBps"]) * 0.3
+        self.setOK(root, True)
+
+    #-------------------------------------------------------------------
+
+    def setOK(self, root, ok, err=""):
+        """ Set whether a root is writable and log its change.
+
+        Args:
+            root (str): Root folder.
+            ok (bool): Whether it's writable.
+            err (str): Error message.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            changed = self.stats[root]["ok"] != ok
+            self.stats[root]["ok"] = ok
+        if changed and not ok:
+            print("[ERROR] Output root %s: %s"%(root, err))
+            self.log("storage_error", root=root, error=err)
+        elif changed:
+            self.log("storage_ok", root=root)
+
+    #-------------------------------------------------------------------
+
+    def monitor(self):
+        """ Function for thread checking free space and write latency
+        of roots periodically.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("OutputRoots.monitor()")
+
+        probeTime = monotonic()
+        statTime = monotonic()
+        while not self.stopEvt.wait(self.freeIntv):
+            for r in self.roots: self.checkFree(r)
+            if monotonic()-probeTime >= self.probeIntv:
+                probeTime = monotonic()
+                for r in self.roots: self.probe(r)
+            if monotonic()-statTime >= self.statIntv:
+                statTime = monotonic()
+                self.log("storage_stat", roots=self.getStats())
+
+    #-------------------------------------------------------------------
+
+    def isUsable(self, root, needMB=0):
+        """ Whether a new file can be written on a root.
+
+        Args:
+            root (str): Root folder.
+            needMB (float): Space (MB) the new file needs.
+
+        Returns:
+            (bool): Whether it's usable; True for a folder which
+              isn't one of roots.
+        """
+        #if DEBUG: print("OutputRoots.isUsable()")
+
+        with self.lock:
+            st = self.stats.get(root)
+            if st is None: return True
+            return st["ok"] and st["freeMB"]-needMB > self.minFreeMB
+
+    #-------------------------------------------------------------------
+
+    def needFailover(self, root, needMB=0):
+        """ Whether a recording on a root should move to another root;
+        the root is no longer usable while another root is.
+
+        Args:
+            root (str): Root folder of the recording.
+            needMB (float): Space (MB) the next file needs.
+
+        Returns:
+            (bool)
+        """
+        #if DEBUG: print("OutputRoots.needFailover()")
+
+        if self.isUsable(root, needMB): return False
+        return any([self.isUsable(r, needMB) for r in self.roots if r != root])
+
+    #-------------------------------------------------------------------
+
+    def pick(self, cIdx=None, needMB=0, exclude=None):
+        """ Choose a root for a new recording (or its next file).
+        Among usable roots, the one with the least load for its write
+          latency ((number of cams on it + 1) * latency, with
+          MIN_LAT_MS as the least latency) is chosen;
+          ties go around roots by index of cam.
+        When no root is usable, the one with the most free space is
+          chosen.
+
+        Args:
+            cIdx (None/int): Index of cam to assign to the chosen root;
+              None for not assigning.
+            needMB (float): Space (MB) the new file needs.
+            exclude (None/list): Roots not to choose, such as the current
+              root of failover.
+
+        Returns:
+            (str): Root folder.
+        """
+        if DEBUG: print("OutputRoots.pick()")
+
+        if exclude == None: exclude = []
+
+        roots = [r for r in self.roots if not r in exclude]
+        if roots == []: roots = self.roots
+        usable = [r for r in roots if self.isUsable(r, needMB)]
+        with self.lock:
+            if usable == []:
+                root = max(roots, key=lambda r: self.stats[r]["freeMB"])
+                print("[WARNING] No output root has enough free space.")
+            else:
+                n = len(self.roots)
+                off = 0 if cIdx is None else cIdx
+                def score(r):
+                    load = len([c for c, a in self.assigned.items() \
+                                  if a == r and c != cIdx])
+                    lat = max(self.stats[r]["latMS"], MIN_LAT_MS)
+                    return ((load+1) * lat, (self.roots.index(r)-off)%n)
+                root = min(usable, key=score)
+            if cIdx != None: self.assigned[cIdx] = root
+        return root
+
+    #-------------------------------------------------------------------
+
+    def release(self, cIdx):
+        with self.lock: self.assigned.pop(cIdx, None)
+
+    #-------------------------------------------------------------------
+
+    def getStats(self):
+        """ Return stats of roots.
+
+        Args: None
+
+        Returns:
+            stats (dict): Stats of each root (see 'stats' attribute)
+              with 'cams' (indices of cams recording on it).
+        """
+        if DEBUG: print("OutputRoots.getStats()")
+
+        with self.lock:
+            stats = {}
+            for r, st in self.stats.items():
+                stats[r] = dict(freeMB=round(st["freeMB"], 1),
+                                latMS=round(st["latMS"], 3),
+                                MBps=round(st["MBps"], 2),
+                                ok=st["ok"],
+                                low=st["low"],
+                                cams=sorted([c for c, a in \
+                                       self.assigned.items() if a == r]))
+        return stats
+
+    #-------------------------------------------------------------------
+
+    def close(self):
+        if DEBUG: print("OutputRoots.close()")
+        self.stopEvt.set()
+        self.mTh.join()
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+_outputRoots = {} # OutputRoots of each set of roots in this process
+_outputRootsLock = Lock()
+
+def getOutputRoots(roots, logFile="", minFreeMB=MIN_FREE_MB, freeIntv=1.0,
+                   probeIntv=5.0, probeKB=1024, statIntv=60.0):
+    """ Return OutputRoots of roots, shared in this process.
+    It's created on the first call (see OutputRoots for arguments).
+
+    Returns:
+        (OutputRoots)
+    """
+    #if DEBUG: print("camStorage.getOutputRoots()")
+
+    key = tuple([path.abspath(r) for r in roots])
+    with _outputRootsLock:
+        if not key in _outputRoots:
+            _outputRoots[key] = OutputRoots(roots, logFile, minFreeMB,
+                                            freeIntv, probeIntv, probeKB,
+                                            statIntv)
+        return _outputRoots[key]
+
+#-----------------------------------------------------------------------
+
+def closeOutputRoots(roots):
+    """ Stop monitoring of OutputRoots of roots in this process.
+
+    Args:
+        roots (list): Root folders.
+
+    Returns:
+        None
+    """
+    if DEBUG: print("camStorage.closeOutputRoots()")
+
+    key = tuple([path.abspath(r) for r in roots])
+    with _outputRootsLock: outRoots = _outputRoots.pop(key, None)
+    if outRoots != None: outRoots.close()
+
+#=======================================================================
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,442 @@
+# coding: UTF-8
+"""
+Background transcoding of finished recordings of pyCamRec.
+Raw recordings (camWriter.RawWriter) are compressed to video files
+  in a process pool with a limited number of workers running at
+  a lower CPU priority, so that it doesn't disturb capture.
+Progress and results are logged; a source file is deleted only after
+  its output is verified (frame count and decoding of the last frame).
+
+Usage:
+    python camTranscode.py recordings --workers 2 --nice 10 --codec avc1
+
+Dependency:
+    NumPy (1.14)
+    OpenCV (3.4)
+
+Changelog
+------------------------------------------------------------------------
+v.0.1: (2026.10.17)
+  - Initial development.
+"""
+
+import argparse, multiprocessing
+from os import path, remove
+from glob import glob, escape
+from concurrent.futures import ProcessPoolExecutor
+from threading import Thread, Lock, Event
+from time import time
+
+import cv2
+import numpy as np
+
+from camWriter import RawReader, RAW_HDR_DTYPE, RAW_MAGIC
+from camLog import getLogger, closeLogger
+
+DEBUG = False
+__version__ = "0.1"
+
+#=======================================================================
+
+_progQ = None # queue to send progress to the main process (in a worker)
+
+def _initWorker(nice, progQ):
+    """ Initialize a worker process of the pool.
+
+    Args:
+        nice (int): Increment of niceness (CPU priority) of the worker.
+        progQ (multiprocessing.Queue): Queue for progress.
+
+    Returns:
+        None
+    """
+    global _progQ
+    _progQ = progQ
+    if nice > 0:
+        try:
+            from os import nice as _nice
+            _nice(nice)
+        except (ImportError, OSError):
+            pass # not available on this platform
+
+#-----------------------------------------------------------------------
+
+def isRawComplete(basePath):
+    """ Whether all chunk files of a raw recording are closed normally.
+    A recording which is still being written has an incomplete chunk
+      (the current one or the one mapped ahead).
+
+    Args:
+        basePath (str): Output file path without extension.
+
+    Returns:
+        (bool): Whether the recording is complete.
+    """
+    if DEBUG: print("camTranscode.isRawComplete()")
+
+    files = RawReader.sessionFiles(basePath)
+    if files == []: return False
+    for fp in files:
+        try: hdr = np.fromfile(fp, dtype=RAW_HDR_DTYPE, count=1)
+        except OSError: return False
+        if len(hdr) == 0 or hdr["magic"][0] != RAW_MAGIC or \
+          hdr["complete"][0] != 1:
+            return False
+    return True
+
+#-----------------------------------------------------------------------
+
+def verifyVideo(fp, nFrames, fSz):
+    """ Verify a video file by its frame count and by decoding
+    its last frame.
+
+    Args:
+        fp (str): Video file path.
+        nFrames (int): Expected number of frames.
+        fSz (tuple): Expected frame size (width, height).
+
+    Returns:
+        (str): Empty string when verified, otherwise the reason.
+    """
+    if DEBUG: print("camTranscode.verifyVideo()")
+
+    if not path.isfile(fp): return "no output file"
+    cap = cv2.VideoCapture(fp)
+    try:
+        if not cap.isOpened(): return "can't open output"
+        n = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if n != nFrames: return "frame count %i != %i"%(n, nFrames)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, nFrames-1)
+        ret, frame = cap.read()
+        if not ret: return "can't decode last frame"
+        if (frame.shape[1], frame.shape[0]) != tuple(fSz):
+            return "frame size %s != %s"%(str(frame.shape[1::-1]), str(fSz))
+    finally:
+        cap.release()
+    return ""
+
+#-----------------------------------------------------------------------
+
+def transcodeRaw(jobId, basePath, codec="avc1", ext=".mp4"):
+    """ Transcode a raw recording to a video file with its timestamp
+    sidecar (CSV), then verify the output. It runs in a worker process.
+
+    Args:
+        jobId (int): ID of the job, used in progress.
+        basePath (str): Output file path (without extension) of
+          the raw recording.
+        codec (str): FourCC of codec.
+        ext (str): Extension of video file.
+
+    Returns:
+        result (dict): 'dst' (video file), 'tsFile', 'nFrames',
+          'srcFiles', 'srcBytes', 'dstBytes', 'sec' (elapsed time)
+          and 'error' (empty string when the output is verified).
+    """
+    if DEBUG: print("camTranscode.transcodeRaw()")
+
+    sTime = time()
+    files = RawReader.sessionFiles(basePath)
+    readers = [RawReader(fp) for fp in files]
+    total = sum([len(r) for r in readers])
+    dst = basePath + ext
+    tsFP = basePath + "_ts.csv"
+    result = dict(dst=dst,
+                  tsFile=tsFP,
+                  nFrames=total,
+                  srcFiles=files,
+                  srcBytes=sum([path.getsize(fp) for fp in files]),
+                  dstBytes=-1,
+                  sec=-1,
+                  error="")
+    if total == 0:
+        result["error"] = "no frames"
+        return result
+    h, w, nCh = readers[0].shape
+    fps = readers[0].header["fps"]
+    if fps <= 0: # frame rate from timestamps
+        ts = np.concatenate([r.index["monotonic"] for r in readers])
+        if total > 1 and ts[-1] > ts[0]: fps = (total-1) / (ts[-1]-ts[0])
+        else: fps = 30
+    out = cv2.VideoWriter(dst, cv2.VideoWriter_fourcc(*codec), fps, (w, h),
+                          nCh != 1)
+    if not out.isOpened():
+        result["error"] = "can't open VideoWriter (%s)"%(codec)
+        return result
+    tsFile = open(tsFP, "w")
+    tsFile.write("frame,monotonic,wallclock\n")
+    i = 0
+    pct = 0 # progress in percent sent last time
+    for r in readers:
+        for j in range(len(r)):
+            frame = r.frames[j]
+            if nCh == 1: frame = frame[:, :, 0]
+            out.write(frame)
+            tsFile.write("%i,%.6f,%.6f\n"%(i, r.index["monotonic"][j],
+                                           r.index["wallclock"][j]))
+            i += 1
+            if _progQ != None and i*100//total >= pct+10:
+                pct = i*100//total
+                _progQ.put((jobId, i, total))
+    tsFile.close()
+    out.release()
+    del readers # unmap source files
+    result["error"] = verifyVideo(dst, total, (w, h))
+    if path.isfile(dst): result["dstBytes"] = path.getsize(dst)
+    result["sec"] = round(time()-sTime, 3)
+    return result
+
+#=======================================================================
+
+class Transcoder:
+    """ Job queue transcoding finished recordings in a process pool.
+    Jobs are submitted with submit(), or found by watching a folder
+      for complete raw recordings (watch()).
+    Progress and results are logged from this (main) process.
+
+    Args:
+        logFile (str): Log file.
+        nWorkers (int): Max. number of jobs running at the same time.
+        nice (int): Niceness increment of worker processes; 0 for none.
+        codec (str): FourCC of codec of output videos.
+        ext (str): Extension of output videos.
+        deleteSrc (bool): Whether to delete source files after
+          the output is verified.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self, logFile, nWorkers=1, nice=10, codec="avc1",
+                 ext=".mp4", deleteSrc=True):
+        if DEBUG: print("Transcoder.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.logFile = logFile # log file
+        self.codec = codec # FourCC of codec
+        self.ext = ext # extension of output videos
+        self.deleteSrc = deleteSrc # whether to delete verified sources
+        self.progQ = multiprocessing.Queue() # progress from workers
+        self.pool = ProcessPoolExecutor(max_workers=nWorkers,
+                                        initializer=_initWorker,
+                                        initargs=(nice, self.progQ))
+          # worker processes
+        self.jobs = {} # source (base path) of each job ID
+        self.futures = {} # future of each job ID
+        self.lock = Lock() # for 'jobs' and 'futures'
+        self.nextId = 0 # ID of the next job
+        self.stopEvt = Event() # for stopping the watching thread
+        self.wTh = None # thread watching a folder
+        self.pTh = Thread(target=self.recvProgress, daemon=True) # thread
+          # logging progress from workers
+        ##### end of setting up attributes -----
+        self.pTh.start()
+
+    #-------------------------------------------------------------------
+
+    def submit(self, basePath):
+        """ Submit a raw recording to transcode.
+
+        Args:
+            basePath (str): Output file path (without extension) of
+              the raw recording.
+
+        Returns:
+            jobId (int): ID of the job; -1 when it's already submitted.
+        """
+        if DEBUG: print("Transcoder.submit()")
+
+        with self.lock:
+            if basePath in self.jobs.values(): return -1
+            jobId = self.nextId
+            self.nextId += 1
+            self.jobs[jobId] = basePath
+            future = self.pool.submit(transcodeRaw, jobId, basePath,
+                                      self.codec, self.ext)
+            self.futures[jobId] = future
+        getLogger(self.logFile).log("transcode_queued", job=jobId,
+                                    file=basePath, codec=self.codec)
+        future.add_done_callback(lambda f, jobId=jobId: self.onDone(jobId, f))
+        return jobId
+
+    #-------------------------------------------------------------------
+
+    def scan(self, folder):
+        """ Submit complete raw recordings in a folder which are
+        not transcoded yet.
+
+        Args:
+            folder (str): Folder of recordings.
+
+        Returns:
+            (int): Number of submitted jobs.
+        """
+        if DEBUG: print("Transcoder.scan()")
+
+        n = 0
+        for fp in sorted(glob(path.join(escape(folder), "*_000.raw"))):
+            basePath = fp[:-len("_000.raw")]
+            if path.isfile(basePath + self.ext): continue
+            if isRawComplete(basePath) and self.submit(basePath) != -1:
+                n += 1
+        return n
+
+    #-------------------------------------------------------------------
+
+    def watch(self, folder, intv=5.0):
+        """ Start a thread scanning a folder (or folders) periodically.
+
+        Args:
+            folder (str/list): Folder of recordings, or list of them.
+            intv (float): Interval (seconds) of scanning.
+
+        Returns:
+            None
+        """
+        if DEBUG: print("Transcoder.watch()")
+
+        if isinstance(folder, str): folders = [folder]
+        else: folders = list(folder)
+        def _watch():
+            while not self.stopEvt.wait(intv):
+                for f in folders: self.scan(f)
+        self.wTh = Thread(target=_watch, daemon=True)
+        self.wTh.start()
+
+    #-------------------------------------------------------------------
+
+    def recvProgress(self):
+        """ Function for thread logging progress from workers.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("Transcoder.recvProgress()")
+
+        while True:
+            msg = self.progQ.get()
+            if msg == None: break
+            jobId, i, total = msg
+            getLogger(self.logFile).log("transcode_progress",
+                                        job=jobId,
+                                        file=self.jobs.get(jobId, ""),
+                                        frames=i,
+                                        total=total,
+                                        percent=round(i*100.0/total, 1))
+
+    #-------------------------------------------------------------------
+
+    def onDone(self, jobId, future):
+        """ Log result of a job and delete its source files when
+        the output is verified.
+
+        Args:
+            jobId (int): ID of the job.
+            future (concurrent.futures.Future): Future of the job.
+
+        Returns:
+            None
+        """
+        if DEBUG: print("Transcoder.onDone()")
+
+        logger = getLogger(self.logFile)
+        try:
+            r = future.result()
+        except Exception as e:
+            logger.log("transcode_error", job=jobId, file=self.jobs[jobId],
+                       error=str(e))
+            return
+        if r["error"] != "":
+            # keep source; remove unusable output
+            for fp in [r["dst"], r["tsFile"]]:
+                if path.isfile(fp): remove(fp)
+            logger.log("transcode_error", job=jobId, file=self.jobs[jobId],
+                       error=r["error"])
+            return
+        deleted = False
+        if self.deleteSrc:
+            for fp in r["srcFiles"]: remove(fp)
+            deleted = True
+        logger.log("transcode_done",
+                   job=jobId,
+                   file=r["dst"],
+                   frames=r["nFrames"],
+                   sec=r["sec"],
+                   srcBytes=r["srcBytes"],
+                   dstBytes=r["dstBytes"],
+                   srcDeleted=deleted)
+
+    #-------------------------------------------------------------------
+
+    def pending(self):
+        """ Return number of jobs not finished yet.
+
+        Args: None
+
+        Returns:
+            (int): Number of jobs.
+        """
+        with self.lock:
+            return len([f for f in self.futures.values() if not f.done()])
+
+    #-------------------------------------------------------------------
+
+    def close(self, wait=True):
+        """ Stop watching and shut down the pool.
+
+        Args:
+            wait (bool): Whether to wait for queued jobs; when it's False,
+              jobs not started yet are cancelled (their sources remain).
+
+        Returns:
+            None
+        """
+        if DEBUG: print("Transcoder.close()")
+
+        self.stopEvt.set()
+        if self.wTh != None: self.wTh.join()
+        n = self.pending()
+        if wait and n > 0:
+            print("Waiting for %i transcoding job(s) ..."%(n))
+        if not wait:
+            with self.lock:
+                for f in self.futures.values(): f.cancel()
+        self.pool.shutdown(wait=True)
+        self.progQ.put(None)
+        self.pTh.join()
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+def parseArgs():
+    """ Parse command line options.
+
+    Args: None
+
+    Returns:
+        (argparse.Namespace): Parsed options.
+    """
+    parser = argparse.ArgumentParser(description="pyCamRec transcoder")
+    parser.add_argument("folder", help="folder of recordings")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="max. number of jobs at the same time")
+    parser.add_argument("--nice", type=int, default=10,
+                        help="niceness increment of worker processes")
+    parser.add_argument("--codec", default="avc1", help="FourCC of codec")
+    parser.add_argument("--keep", action="store_true",
+                        help="keep source files")
+    parser.add_argument("--logFile", default="pCR_log.jsonl",
+                        help="log file")
+    return parser.parse_args()
+
+#=======================================================================
+
+if __name__ == '__main__':
+    args = parseArgs()
+    tc = Transcoder(args.logFile, args.workers, args.nice, args.codec,
+                    deleteSrc=not args.keep)
+    print("%i job(s) submitted."%(tc.scan(args.folder)))
+    tc.close()
+    closeLogger(args.logFile)
@@ -0,0 +1,1239 @@
+# coding: UTF-8
+"""
+Writers of recorded frames for the writer stage of each cam in pyCamRec.
+
+Dependency:
+    NumPy (1.14)
+    OpenCV (3.4)
+
+Changelog
+------------------------------------------------------------------------
+v.0.1: (2026.10.17)
+  - Initial development; SegWriter for segmented video recording.
+  - RawWriter/RawReader for raw frames in memory-mapped chunk files.
+  - AviMjpgWriter for writing JPEG data of MJPEG cams without re-encoding.
+  - ImgPackWriter/ImgPackReader for packing images into chunked archives.
+  - SegWriter fails over to another output root (OutputRoots) at
+    a segment boundary when its disk is running out of space.
+  - SegWriter.setFormat for changing frame rate and size at a new segment.
+  - SegWriter raises OSError when VideoWriter can't be opened.
+"""
+
+import argparse, json, struct
+from array import array
+from glob import glob, escape
+from os import path, remove, replace, truncate, mkdir
+from threading import Thread
+
+import cv2
+import numpy as np
+
+from fFuncs import get_time_stamp
+from camLog import getLogger
+
+DEBUG = False
+__version__ = "0.1"
+
+#=======================================================================
+
+class AviMjpgWriter:
+    """ Minimal AVI (RIFF) muxer of a single MJPEG video stream.
+    JPEG data of each frame (as delivered by an MJPEG cam) is written
+      as a chunk without decoding or re-encoding.
+    Headers are written with placeholders first and completed with
+      the index (idx1) at release().
+    Same interface as cv2.VideoWriter for SegWriter.
+    An AVI 1.0 file can't exceed 2 GB; 'maxBytes' is the size
+      (smaller than that) at which SegWriter rotates to the next file.
+
+    Args:
+        fp (str): File path.
+        fourcc (int): Not used; MJPG is always used.
+        fps (float): Frame rate.
+        fSz (tuple): Frame size (width, height).
+        isColor (bool): Not used.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    maxBytes = 1900*1000*1000 # size to rotate to the next file
+
+    def __init__(self, fp, fourcc, fps, fSz, isColor=True):
+        if DEBUG: print("AviMjpgWriter.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.fp = fp # file path
+        self.fps = fps # frame rate
+        self.fSz = tuple(fSz) # frame size (width, height)
+        self.f = open(fp, "wb") # file object
+        self.offsets = array("I") # offset of each chunk from 'movi'
+        self.sizes = array("I") # size of each chunk
+        self.maxChunk = 0 # size of the largest chunk
+        self.nBytes = 0 # current file size
+        ##### end of setting up attributes -----
+        self.f.write(self.makeHeader(0))
+        self.moviPos = self.f.tell() - 4 # position of 'movi'
+        self.nBytes = self.f.tell()
+
+    #-------------------------------------------------------------------
+
+    def isOpened(self):
+        return self.f != None
+
+    #-------------------------------------------------------------------
+
+    def makeHeader(self, moviSize):
+        """ Make RIFF header up to the beginning of 'movi' data.
+
+        Args:
+            moviSize (int): Bytes of 'movi' list data.
+
+        Returns:
+            (bytes): Header.
+        """
+        if DEBUG: print("AviMjpgWriter.makeHeader()")
+
+        w, h = self.fSz
+        n = len(self.sizes)
+        rate = int(round(self.fps*1000))
+        usPerFrame = int(round(1e6/self.fps)) if self.fps > 0 else 0
+        avih = struct.pack("<14I", usPerFrame,
+                           int(self.maxChunk*self.fps), # max. bytes/sec
+                           0, # padding granularity
+                           0x10, # AVIF_HASINDEX
+                           n, # total frames
+                           0, # initial frames
+                           1, # streams
+                           self.maxChunk, # suggested buffer size
+                           w, h, 0, 0, 0, 0)
+        strh = b"vids" + b"MJPG" + struct.pack("<IHHIIIIIIIIhhhh",
+                           0, 0, 0, 0,
+                           1000, rate, # scale, rate
+                           0, n, # start, length
+                           self.maxChunk, 0xFFFFFFFF, 0,
+                           0, 0, w, h)
+        strf = struct.pack("<IiiHH4sIiiII", 40, w, h, 1, 24, b"MJPG",
+                           w*h*3, 0, 0, 0, 0)
+        strl = b"strl" + self._chunk(b"strh", strh) + \
+               self._chunk(b"strf", strf)
+        hdrl = b"hdrl" + self._chunk(b"avih", avih) + \
+               self._chunk(b"LIST", strl)
+        idxSize = 8 + 16*n
+        riffSize = 4 + 8 + len(hdrl) + 8 + 4 + moviSize + idxSize
+        return b"RIFF" + struct.pack("<I", riffSize) + b"AVI " + \
+               self._chunk(b"LIST", hdrl) + \
+               b"LIST" + struct.pack("<I", 4 + moviSize) + b"movi"
+
+    #-------------------------------------------------------------------
+
+    @staticmethod
+    def _chunk(fcc, data):
+        return fcc + struct.pack("<I", len(data)) + data
+
+    #-------------------------------------------------------------------
+
+    def write(self, data):
+        """ Write JPEG data of a frame.
+
+        Args:
+            data (numpy.ndarray): JPEG data (uint8).
+
+        Returns:
+            None
+        """
+        #if DEBUG: print("AviMjpgWriter.write()")
+
+        n = data.nbytes
+        self.offsets.append(self.nBytes - self.moviPos)
+        self.sizes.append(n)
+        self.maxChunk = max(self.maxChunk, n)
+        self.f.write(b"00dc" + struct.pack("<I", n))
+        self.f.write(data)
+        if n % 2 == 1: self.f.write(b"\0"); n += 1 # chunks are word-aligned
+        self.nBytes += 8 + n
+
+    #-------------------------------------------------------------------
+
+    def release(self):
+        """ Write the index, complete headers and close the file.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("AviMjpgWriter.release()")
+
+        if self.f == None: return
+        moviSize = self.nBytes - self.moviPos - 4
+        idx = array("I")
+        fcc = struct.unpack("<I", b"00dc")[0]
+        for i in range(len(self.sizes)):
+            idx.extend((fcc, 0x10, self.offsets[i], self.sizes[i]))
+              # 0x10: AVIIF_KEYFRAME
+        self.f.write(b"idx1" + struct.pack("<I", 16*len(self.sizes)))
+        if struct.pack("=I", 1) != struct.pack("<I", 1): idx.byteswap()
+        self.f.write(idx.tobytes())
+        self.f.seek(0)
+        self.f.write(self.makeHeader(moviSize))
+        self.f.close()
+        self.f = None
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+class SegWriter:
+    """ Video writer which rotates output into segment files
+    by duration and/or byte size.
+    The VideoWriter of the next segment is opened ahead of time in
+      a thread and the finished segment is released in a thread,
+      so that no frame waits for opening/finalizing a file at a boundary.
+    Each segment has its timestamp sidecar (CSV) and a manifest (JSON)
+      of the session lists segments with timestamps of their first and
+      last frames. The manifest is rewritten at every rotation,
+      so that it's usable even if recording ends abnormally.
+    Size of a segment is checked with the file on disk, so it can
+      exceed 'segMB' by what the muxer keeps buffered.
+    When both 'segSec' and 'segMB' are 0, it writes a single file
+      named 'basePath' + 'ext'.
+    With 'passthrough', frames are JPEG data written by AviMjpgWriter
+      and a segment is rotated before the AVI size limit as well;
+      without 'segSec' and 'segMB', the first file is named as above
+      and the following ones get indices as segments.
+    With 'storage', a segment is rotated as well when the root of
+      current segment is no longer usable, and the next segments go to
+      another root (failover); their folder is in the manifest.
+    Frame rate and frame size can be changed (setFormat) with a new
+      segment as well; segments in a format different from the session
+      have their 'fps' and 'frameSize' in the manifest.
+
+    Args:
+        basePath (str): Output file path without extension.
+        fourcc (int): FourCC of codec.
+        fps (float): Frame rate of video.
+        fSz (tuple): Frame size (width, height).
+        isColor (bool): Whether frames are color images.
+        segSec (float): Maximum duration (seconds) of a segment; 0 for none.
+        segMB (float): Maximum size (MB) of a segment; 0 for none.
+        logFile (str): Log file; rotations are logged when it's not empty.
+        cIdx (int): Index of cam, to be used in log.
+        ext (str): Extension of video files.
+        passthrough (bool): Whether frames are JPEG data to write
+          into AVI without re-encoding.
+        storage (None/OutputRoots): Output roots for failover;
+          'basePath' should be in one of its roots.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self, basePath, fourcc, fps, fSz, isColor=True,
+                 segSec=0, segMB=0, logFile="", cIdx=-1, ext=".mp4",
+                 passthrough=False, storage=None):
+        if DEBUG: print("SegWriter.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.basePath = basePath # output file path without extension
+        self.name = path.basename(basePath) # file name without extension
+        self.folder = path.dirname(basePath) # folder of current segment
+        self.nextFolder = self.folder # folder of segment opened ahead
+        self.nextFmt = (fps, tuple(fSz)) # frame rate & size of segment
+          # opened ahead
+        self.fmtChanged = False # whether format was changed (setFormat)
+          # after current segment started
+        self.storage = storage # output roots for failover
+        self.fourcc = fourcc # FourCC of codec
+        self.fps = fps # frame rate
+        self.fSz = tuple(fSz) # frame size (width, height)
+        self.isColor = isColor # whether frames are color images
+        self.segSec = segSec # max. duration of a segment; 0 for none
+        self.segBytes = int(segMB*1e6) # max. bytes of a segment; 0 for none
+        self.logFile = logFile # log file
+        self.cIdx = cIdx # index of cam in log
+        self.passthrough = passthrough # whether frames are JPEG data
+        self.capBytes = 0 # max. bytes of a file of the container format;
+          # 0 for none
+        if passthrough:
+            ext = ".avi"
+            self.capBytes = AviMjpgWriter.maxBytes
+        self.ext = ext # extension of video files
+        self.isSegmented = segSec > 0 or segMB > 0 # whether to rotate
+        self.sizeChkIntv = 10 # check file size every this number of frames
+        self.segments = [] # manifest entry of each segment
+        self.segIdx = -1 # index of current segment
+        self.out = None # VideoWriter of current segment
+        self.tsFile = None # timestamp sidecar of current segment
+        self.nextOut = None # VideoWriter opened ahead for next segment
+        self.nextTh = None # thread opening 'nextOut'
+        self.relTh = [] # threads releasing finished segments
+        self.manifestFP = basePath + "_manifest.json" # manifest file
+        self.manifest = dict(start=get_time_stamp(),
+                             fps=fps,
+                             frameSize=list(self.fSz),
+                             isColor=isColor,
+                             segSec=segSec,
+                             segMB=segMB,
+                             segments=self.segments) # manifest of session
+        ##### end of setting up attributes -----
+
+        self.nextOut = self.openWriter(0)
+        self.rotate()
+
+    #-------------------------------------------------------------------
+
+    def segPath(self, i, folder=None):
+        """ Return file path of a segment.
+        Without rotation by duration or size, segments after
+          the first one come only from failover.
+
+        Args:
+            i (int): Index of segment.
+            folder (None/str): Folder of segment; None for current one.
+
+        Returns:
+            (str): File path.
+        """
+        if folder is None: folder = self.folder
+        fp = path.join(folder, self.name)
+        if self.isSegmented or i > 0: return "%s_%03i%s"%(fp, i, self.ext)
+        else: return fp + self.ext
+
+    #-------------------------------------------------------------------
+
+    def openWriter(self, i, folder=None):
+        """ Open VideoWriter of a segment.
+
+        Args:
+            i (int): Index of segment.
+            folder (None/str): Folder of segment; None for current one.
+
+        Returns:
+            out (cv2.VideoWriter): VideoWriter.
+
+        Raises:
+            OSError: When VideoWriter couldn't be opened (such as
+              when the codec isn't available).
+        """
+        if DEBUG: print("SegWriter.openWriter()")
+
+        if self.passthrough: writer = AviMjpgWriter
+        else: writer = cv2.VideoWriter
+        fp = self.segPath(i, folder)
+        out = writer(fp, self.fourcc, self.fps, self.fSz, self.isColor)
+        if not out.isOpened():
+            out.release()
+            if path.isfile(fp): remove(fp)
+            raise OSError("Can't open VideoWriter of %s (FourCC %i, %s,"\
+                          " %s fps)"%(fp, self.fourcc, str(self.fSz),
+                                      str(self.fps)))
+        return out
+
+    #-------------------------------------------------------------------
+
+    def prepareNext(self):
+        """ Open VideoWriter of the next segment in a thread.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("SegWriter.prepareNext()")
+
+        def _open(i, folder):
+            # on failure, rotate() opens it again and raises the error
+            try: self.nextOut = self.openWriter(i, folder)
+            except OSError: self.nextOut = None
+        self.nextFolder = self.folder
+        self.nextFmt = (self.fps, self.fSz)
+        self.nextTh = Thread(target=_open, args=(self.segIdx+1, self.folder,))
+        self.nextTh.start()
+
+    #-------------------------------------------------------------------
+
+    def rotate(self):
+        """ Finish current segment and start the next one.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("SegWriter.rotate()")
+
+        if self.out != None:
+            self.finishSeg(self.out, self.tsFile, self.segments[-1])
+        if self.nextTh != None:
+            self.nextTh.join() # usually the next writer is already open
+            self.nextTh = None
+        if self.out != None and self.needFailover(): self.failover()
+        if self.nextOut != None and (self.nextFolder != self.folder or \
+          self.nextFmt != (self.fps, self.fSz)):
+            ### remove writer opened ahead on the previous root
+            ###   or in the previous format
+            self.nextOut.release()
+            fp = self.segPath(self.segIdx+1, self.nextFolder)
+            if path.isfile(fp): remove(fp)
+            self.nextOut = None
+        if self.nextOut is None: # not opened ahead; failover or new format
+            try: self.nextOut = self.openWriter(self.segIdx+1)
+            except OSError:
+                ### no current segment; frames are no longer written
+                self.out = None
+                self.tsFile = None
+                self.writeManifest()
+                raise
+        self.fmtChanged = False
+        self.out = self.nextOut
+        self.nextOut = None
+        self.segIdx += 1
+        fp = self.segPath(self.segIdx)
+        tsFP = path.splitext(fp)[0] + "_ts.csv"
+        self.tsFile = open(tsFP, "w")
+        self.tsFile.write("frame,monotonic,wallclock\n")
+        self.segments.append(dict(file=path.basename(fp),
+                                  tsFile=path.basename(tsFP),
+                                  nFrames=0,
+                                  first=None,
+                                  last=None,
+                                  bytes=-1))
+        if self.folder != path.dirname(self.basePath):
+            self.segments[-1]["folder"] = self.folder
+        if (self.fps, list(self.fSz)) != (self.manifest["fps"],
+                                          self.manifest["frameSize"]):
+            self.segments[-1].update(fps=self.fps, frameSize=list(self.fSz))
+        if self.isSegmented:
+            self.prepareNext()
+            if self.segIdx > 0 and self.logFile != "":
+                getLogger(self.logFile).log("segment_start",
+                                            cam=self.cIdx,
+                                            segment=self.segIdx,
+                                            file=fp)
+        self.writeManifest()
+
+    #-------------------------------------------------------------------
+
+    def finishSeg(self, out, tsFile, seg):
+        """ Close sidecar of a segment and release its VideoWriter
+        in a thread.
+
+        Args:
+            out (cv2.VideoWriter): VideoWriter of the segment.
+            tsFile (file object): Timestamp sidecar of the segment.
+            seg (dict): Manifest entry of the segment.
+
+        Returns:
+            None
+        """
+        if DEBUG: print("SegWriter.finishSeg()")
+
+        tsFile.close()
+        fp = path.join(seg.get("folder", path.dirname(self.basePath)),
+                       seg["file"])
+        def _release():
+            out.release()
+            if path.isfile(fp): seg["bytes"] = path.getsize(fp)
+        th = Thread(target=_release)
+        th.start()
+        self.relTh.append(th)
+
+    #-------------------------------------------------------------------
+
+    def setFormat(self, fps, fSz):
+        """ Change frame rate and frame size of video.
+        The change takes effect with a new segment, which starts at
+          the next frame (or replaces current segment if it's empty).
+
+        Args:
+            fps (float): Frame rate.
+            fSz (tuple): Frame size (width, height).
+
+        Returns:
+            None
+        """
+        if DEBUG: print("SegWriter.setFormat()")
+
+        fSz = tuple(fSz)
+        if (fps, fSz) == (self.fps, self.fSz): return
+        self.fps = fps
+        self.fSz = fSz
+        seg = self.segments[-1]
+        if seg["nFrames"] == 0: # reopen current segment in new format
+            self.out.release()
+            try: self.out = self.openWriter(self.segIdx)
+            except OSError:
+                ### no current segment; frames are no longer written
+                self.out = None
+                self.tsFile.close()
+                remove(path.splitext(self.segPath(self.segIdx))[0]+"_ts.csv")
+                self.tsFile = None
+                self.segments.pop()
+                self.writeManifest()
+                raise
+            if (fps, list(fSz)) != (self.manifest["fps"],
+                                    self.manifest["frameSize"]):
+                seg.update(fps=fps, frameSize=list(fSz))
+            else:
+                seg.pop("fps", None)
+                seg.pop("frameSize", None)
+        else:
+            self.fmtChanged = True
+
+    #-------------------------------------------------------------------
+
+    def needFailover(self):
+        """ Whether the root of current segment is no longer usable
+        while another root is (see OutputRoots.needFailover).
+
+        Args: None
+
+        Returns:
+            (bool)
+        """
+        #if DEBUG: print("SegWriter.needFailover()")
+
+        if self.storage is None: return False
+        if self.segBytes > 0: needMB = self.segBytes/1e6
+        else: needMB = self.capBytes/1e6
+        return self.storage.needFailover(self.folder, needMB)
+
+    #-------------------------------------------------------------------
+
+    def failover(self):
+        """ Move following segments to another output root.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("SegWriter.failover()")
+
+        prev = self.folder
+        self.folder = self.storage.pick(self.cIdx, exclude=[prev])
+        print("[c%.2i] Recording moves from %s to %s"%(self.cIdx, prev,
+                                                        self.folder))
+        if self.logFile != "":
+            getLogger(self.logFile).log("storage_failover",
+                                        cam=self.cIdx,
+                                        segment=self.segIdx+1,
+                                        fromRoot=prev,
+                                        toRoot=self.folder)
+
+    #-------------------------------------------------------------------
+
+    def isFull(self, ts):
+        """ Whether current segment reached its duration or size limit,
+        its root is no longer usable while another root is, or format
+        of video was changed.
+
+        Args:
+            ts (tuple): Monotonic and wall-clock timestamps of next frame.
+
+        Returns:
+            (bool): Whether to rotate before writing the next frame.
+        """
+        #if DEBUG: print("SegWriter.isFull()")
+
+        seg = self.segments[-1]
+        if seg["nFrames"] == 0: return False
+        if self.fmtChanged: return True
+        if seg["nFrames"]%self.sizeChkIntv == 0 and self.needFailover():
+            return True
+        if self.passthrough and self.out.nBytes >= self.capBytes:
+            return True # AVI size limit; AviMjpgWriter knows its size
+        if not self.isSegmented: return False
+        if self.segSec > 0 and ts[0]-seg["first"][0] >= self.segSec:
+            return True
+        if self.passthrough:
+            return self.segBytes > 0 and self.out.nBytes >= self.segBytes
+        if self.segBytes > 0 and seg["nFrames"]%self.sizeChkIntv == 0:
+            fp = self.segPath(self.segIdx)
+            if path.isfile(fp) and path.getsize(fp) >= self.segBytes:
+                return True
+        return False
+
+    #-------------------------------------------------------------------
+
+    def write(self, frame, ts):
+        """ Write a frame and its timestamps.
+
+        Args:
+            frame (numpy.ndarray): Frame image (JPEG data with
+              'passthrough').
+            ts (tuple): Monotonic and wall-clock timestamps of the frame.
+
+        Returns:
+            None
+        """
+        #if DEBUG: print("SegWriter.write()")
+
+        if self.isFull(ts): self.rotate()
+        seg = self.segments[-1]
+        if seg["first"] == None: seg["first"] = list(ts)
+        seg["last"] = list(ts)
+        self.tsFile.write("%i,%.6f,%.6f\n"%(seg["nFrames"], ts[0], ts[1]))
+        seg["nFrames"] += 1
+        self.out.write(frame)
+
+    #-------------------------------------------------------------------
+
+    def writeManifest(self):
+        """ Write manifest of the session (JSON).
+        It's written to a temporary file first, then replaced,
+          so that a reader never sees a partially written manifest.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("SegWriter.writeManifest()")
+
+        tmpFP = self.manifestFP + ".tmp"
+        with open(tmpFP, "w") as f: json.dump(self.manifest, f, indent=2)
+        replace(tmpFP, self.manifestFP)
+
+    #-------------------------------------------------------------------
+
+    def release(self):
+        """ Finish the last segment, remove the writer opened ahead
+        and write the final manifest.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("SegWriter.release()")
+
+        if self.out != None: # None when the last rotation failed
+            self.finishSeg(self.out, self.tsFile, self.segments[-1])
+        self.out = None
+        self.tsFile = None
+        if self.nextTh != None:
+            self.nextTh.join()
+            self.nextTh = None
+        if self.nextOut != None:
+            ### remove unused file of next segment
+            self.nextOut.release()
+            self.nextOut = None
+            fp = self.segPath(self.segIdx+1, self.nextFolder)
+            if path.isfile(fp): remove(fp)
+        for th in self.relTh: th.join()
+        self.relTh = []
+        self.manifest["end"] = get_time_stamp()
+        self.writeManifest()
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+RAW_MAGIC = b"PCRRAW01" # magic bytes of a raw chunk file
+RAW_HDR_SIZE = 4096 # bytes reserved for header of a raw chunk file
+RAW_HDR_DTYPE = np.dtype([("magic", "S8"),
+                          ("version", "<u4"),
+                          ("chunk", "<u4"), # index of chunk in session
+                          ("width", "<u4"),
+                          ("height", "<u4"),
+                          ("channels", "<u4"),
+                          ("complete", "<u4"), # 1 when closed normally
+                          ("dtype", "S8"), # numpy dtype string of pixels
+                          ("frameBytes", "<u8"),
+                          ("capacity", "<u8"), # max. number of frames
+                          ("nFrames", "<u8"), # number of written frames
+                          ("indexOffset", "<u8"),
+                          ("dataOffset", "<u8"),
+                          ("fps", "<f8")]) # header of a raw chunk file
+RAW_IDX_DTYPE = np.dtype([("offset", "<u8"),
+                          ("monotonic", "<f8"),
+                          ("wallclock", "<f8")]) # entry of frame index
+
+def _pageAlign(n, page=4096):
+    return (n + page - 1) // page * page
+
+#=======================================================================
+
+class RawWriter:
+    """ Writer of raw (uncompressed) frames into preallocated,
+    memory-mapped chunk files, for sessions where encoding can't keep up.
+    A chunk file has a fixed header (RAW_HDR_DTYPE), an index of frames
+      (RAW_IDX_DTYPE; byte offset and timestamps of each frame) and
+      a data area of 'capacity' frames, each of which is page-aligned.
+    Writing a frame is a copy into the mapped file; slot() returns the
+      array of the next frame in the file, so that the writer stage can
+      take a frame out of its ring directly into the file.
+    The next chunk is allocated and mapped ahead of time in a thread.
+      At release, unused space of the last chunk is truncated.
+    'nFrames' in the header is updated after the frame and its index
+      entry, so a reader never sees a frame which is not yet written.
+
+    Args:
+        basePath (str): Output file path without extension.
+        shape (tuple): Shape of a frame (height, width, channels);
+          (height, width) for single-channel frames.
+        dtype (numpy.dtype): Data type of pixels.
+        fps (float): Frame rate, stored in header for readers.
+        chunkMB (float): Size (MB) of a chunk file.
+        logFile (str): Log file; new chunks are logged when it's not empty.
+        cIdx (int): Index of cam, to be used in log.
+        ext (str): Extension of chunk files.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self, basePath, shape, dtype=np.uint8, fps=-1, chunkMB=1024,
+                 logFile="", cIdx=-1, ext=".raw"):
+        if DEBUG: print("RawWriter.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.basePath = basePath # output file path without extension
+        self.frameShape = tuple(shape) # shape of frames given to write()
+          # and returned by slot()
+        if len(shape) == 2: shape = (shape[0], shape[1], 1)
+        self.shape = tuple(shape) # shape of a frame in file
+        self.dtype = np.dtype(dtype) # data type of pixels
+        self.fps = fps # frame rate
+        self.logFile = logFile # log file
+        self.cIdx = cIdx # index of cam in log
+        self.ext = ext # extension of chunk files
+        self.frameBytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self.frameStride = _pageAlign(self.frameBytes) # bytes per frame slot
+        self.capacity = max(1, int(chunkMB*1e6) // self.frameStride) # number
+          # of frames in a chunk
+        self.indexOffset = RAW_HDR_SIZE # offset of index in a chunk file
+        self.dataOffset = _pageAlign(RAW_HDR_SIZE + \
+                                     self.capacity*RAW_IDX_DTYPE.itemsize)
+          # offset of data area in a chunk file
+        self.chunkIdx = -1 # index of current chunk
+        self.chunk = None # mapped arrays of current chunk (dict)
+        self.nextChunk = None # chunk mapped ahead for the next one
+        self.nextTh = None # thread preparing 'nextChunk'
+        self.slotArr = None # array of the slot returned by slot()
+        self.chunks = [] # file paths of written chunks
+        self.nWritten = 0 # number of written frames in total
+        ##### end of setting up attributes -----
+
+        self.nextChunk = self.openChunk(0)
+        self.rotate()
+
+    #-------------------------------------------------------------------
+
+    def chunkPath(self, i):
+        return "%s_%03i%s"%(self.basePath, i, self.ext)
+
+    #-------------------------------------------------------------------
+
+    def openChunk(self, i):
+        """ Create a chunk file with its full size and map it.
+
+        Args:
+            i (int): Index of chunk.
+
+        Returns:
+            chunk (dict): 'fp', 'mm' (numpy.memmap of the whole file),
+              'hdr' (header record), 'index' (frame index) and
+              'frames' (array of frame slots).
+        """
+        if DEBUG: print("RawWriter.openChunk()")
+
+        fp = self.chunkPath(i)
+        size = self.dataOffset + self.capacity*self.frameStride
+        with open(fp, "wb") as f:
+            try: # allocate blocks, so that writing won't wait for it
+                from os import posix_fallocate
+                posix_fallocate(f.fileno(), 0, size)
+            except (ImportError, OSError):
+                f.truncate(size)
+        mm = np.memmap(fp, dtype=np.uint8, mode="r+", shape=(size,))
+        hdr = mm[:RAW_HDR_DTYPE.itemsize].view(RAW_HDR_DTYPE)
+        hdr["magic"] = RAW_MAGIC
+        hdr["version"] = 1
+        hdr["chunk"] = i
+        hdr["height"], hdr["width"], hdr["channels"] = self.shape
+        hdr["complete"] = 0
+        hdr["dtype"] = self.dtype.str.encode()
+        hdr["frameBytes"] = self.frameBytes
+        hdr["capacity"] = self.capacity
+        hdr["nFrames"] = 0
+        hdr["indexOffset"] = self.indexOffset
+        hdr["dataOffset"] = self.dataOffset
+        hdr["fps"] = self.fps
+        idxEnd = self.indexOffset + self.capacity*RAW_IDX_DTYPE.itemsize
+        index = mm[self.indexOffset:idxEnd].view(RAW_IDX_DTYPE)
+        data = mm[self.dataOffset:].reshape(self.capacity, self.frameStride)
+        frames = data[:, :self.frameBytes].view(self.dtype)
+        frames.shape = (self.capacity,) + self.shape # raises if not a view
+        return dict(fp=fp, mm=mm, hdr=hdr, index=index, frames=frames)
+
+    #-------------------------------------------------------------------
+
+    def prepareNext(self):
+        """ Create and map the next chunk in a thread.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("RawWriter.prepareNext()")
+
+        def _open(i):
+            self.nextChunk = self.openChunk(i)
+        self.nextTh = Thread(target=_open, args=(self.chunkIdx+1,))
+        self.nextTh.start()
+
+    #-------------------------------------------------------------------
+
+    def rotate(self):
+        """ Finish current chunk and start the next one.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("RawWriter.rotate()")
+
+        if self.chunk != None: self.finishChunk(self.chunk)
+        if self.nextTh != None:
+            self.nextTh.join() # usually the next chunk is already mapped
+            self.nextTh = None
+        self.chunk = self.nextChunk
+        self.nextChunk = None
+        self.chunkIdx += 1
+        self.chunks.append(self.chunk["fp"])
+        self.prepareNext()
+        if self.chunkIdx > 0 and self.logFile != "":
+            getLogger(self.logFile).log("segment_start",
+                                        cam=self.cIdx,
+                                        segment=self.chunkIdx,
+                                        file=self.chunk["fp"])
+
+    #-------------------------------------------------------------------
+
+    def finishChunk(self, chunk, trim=False):
+        """ Mark a chunk as complete and flush it to disk.
+
+        Args:
+            chunk (dict): Chunk (see openChunk).
+            trim (bool): Whether to cut off unused frame slots.
+
+        Returns:
+            None
+        """
+        if DEBUG: print("RawWriter.finishChunk()")
+
+        chunk["hdr"]["complete"] = 1
+        n = int(chunk["hdr"]["nFrames"][0])
+        fp = chunk["fp"]
+        chunk["mm"].flush()
+        chunk.clear() # drop references to the mapping
+        if trim and n < self.capacity:
+            try:
+                truncate(fp, self.dataOffset + n*self.frameStride)
+            except OSError:
+                pass # file is still mapped (on Windows); readers use nFrames
+
+    #-------------------------------------------------------------------
+
+    def slot(self):
+        """ Return the array of the next frame slot in the mapped file,
+        to copy a frame into (such as FrameRing.get(out=...)).
+
+        Args: None
+
+        Returns:
+            (numpy.ndarray): Array of the next frame slot.
+        """
+        #if DEBUG: print("RawWriter.slot()")
+
+        if int(self.chunk["hdr"]["nFrames"][0]) >= self.capacity:
+            self.rotate()
+        n = int(self.chunk["hdr"]["nFrames"][0])
+        # a view in 'frameShape'; slot of a frame is contiguous
+        self.slotArr = self.chunk["frames"][n].reshape(self.frameShape)
+        return self.slotArr
+
+    #-------------------------------------------------------------------
+
+    def write(self, frame, ts):
+        """ Write a frame and its timestamps.
+        If 'frame' is the array returned by slot(), it's already
+          in the file and isn't copied again.
+
+        Args:
+            frame (numpy.ndarray): Frame image.
+            ts (tuple): Monotonic and wall-clock timestamps of the frame.
+
+        Returns:
+            None
+        """
+        #if DEBUG: print("RawWriter.write()")
+
+        if frame is not self.slotArr:
+            np.copyto(self.slot(), frame.reshape(self.frameShape))
+        self.slotArr = None
+        hdr = self.chunk["hdr"]
+        n = int(hdr["nFrames"][0])
+        self.chunk["index"][n] = (self.dataOffset + n*self.frameStride,
+                                  ts[0], ts[1])
+        hdr["nFrames"] = n + 1
+        self.nWritten += 1
+
+    #-------------------------------------------------------------------
+
+    def release(self):
+        """ Finish the last chunk and remove the chunk mapped ahead.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("RawWriter.release()")
+
+        self.slotArr = None
+        self.finishChunk(self.chunk, trim=True)
+        self.chunk = None
+        if self.nextTh != None:
+            self.nextTh.join()
+            self.nextTh = None
+        if self.nextChunk != None:
+            ### remove unused file of next chunk
+            fp = self.nextChunk["fp"]
+            self.nextChunk.clear()
+            self.nextChunk = None
+            if path.isfile(fp): remove(fp)
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+class RawReader:
+    """ Reader of a raw chunk file written by RawWriter.
+    Frames are a numpy.memmap of the file; nothing is copied
+      until the frames are actually used.
+
+    Args:
+        fp (str): Chunk file path.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+
+    Examples:
+        >>> r = RawReader("output_00_..._000.raw")
+        >>> len(r), r.frames.shape
+        (120, (120, 480, 640, 3))
+        >>> r.index["monotonic"][:2]
+        array([5102.3621, 5102.3955])
+        >>> for fp in RawReader.sessionFiles("output_00_..."): ...
+    """
+
+    def __init__(self, fp):
+        if DEBUG: print("RawReader.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.fp = fp # chunk file path
+        hdr = np.fromfile(fp, dtype=RAW_HDR_DTYPE, count=1)
+        if len(hdr) == 0 or hdr["magic"][0] != RAW_MAGIC:
+            raise ValueError("%s is not a raw chunk file."%(fp))
+        hdr = hdr[0]
+        self.header = dict([(k, hdr[k].item()) for k in RAW_HDR_DTYPE.names])
+          # header values
+        self.header["dtype"] = self.header["dtype"].decode()
+        self.header["magic"] = self.header["magic"].decode()
+        h = self.header
+        self.shape = (h["height"], h["width"], h["channels"]) # frame shape
+        self.nFrames = h["nFrames"] # number of frames
+        self.index = np.memmap(fp, dtype=RAW_IDX_DTYPE, mode="r",
+                               offset=h["indexOffset"],
+                               shape=(self.nFrames,)) # frame index
+        self.frames = None # frames (memmap)
+        ##### end of setting up attributes -----
+
+        if self.nFrames > 0:
+            stride = _pageAlign(h["frameBytes"])
+            data = np.memmap(fp, dtype=np.uint8, mode="r",
+                             offset=h["dataOffset"],
+                             shape=(self.nFrames, stride))
+            frames = data[:, :h["frameBytes"]].view(np.dtype(h["dtype"]))
+            self.frames = frames.reshape((self.nFrames,) + self.shape)
+
+    #-------------------------------------------------------------------
+
+    def __len__(self):
+        return self.nFrames
+
+    #-------------------------------------------------------------------
+
+    def __getitem__(self, i):
+        return self.frames[i]
+
+    #-------------------------------------------------------------------
+
+    @staticmethod
+    def sessionFiles(basePath, ext=".raw"):
+        """ Return chunk files of a recording in order.
+
+        Args:
+            basePath (str): Output file path without extension
+              (RawWriter.basePath).
+            ext (str): Extension of chunk files.
+
+        Returns:
+            (list): Chunk file paths.
+        """
+        if DEBUG: print("RawReader.sessionFiles()")
+
+        return sorted(glob(escape(basePath) + "_[0-9][0-9][0-9]" + ext))
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+PACK_MAGIC = b"PCRPACK1" # magic bytes of a chunk file of image pack
+IDX_MAGIC = b"PCRIDX01" # magic bytes of index file of image pack
+PACK_HDR_SIZE = 16 # bytes of header (magic & image extension) of files
+PACK_IDX_DTYPE = np.dtype([("frame", "<u8"), # frame number
+                           ("chunk", "<u4"), # index of chunk file
+                           ("size", "<u4"), # bytes of encoded image
+                           ("offset", "<u8"), # offset in chunk file
+                           ("monotonic", "<f8"),
+                           ("wallclock", "<f8")]) # entry of index
+
+#=======================================================================
+
+class ImgPackWriter:
+    """ Writer of encoded images appended to one archive per cam,
+    instead of a file per image.
+    Images go into chunk files ('<basePath>_000.pack', ...), each of
+      which is rotated at 'chunkMB', and an entry per image (frame
+      number, chunk, offset, size and timestamps) goes into the index
+      file ('<basePath>.idx'), so that an image can be read by its
+      frame number or time without scanning the chunks.
+    Both kinds of files start with a header of 16 bytes; magic bytes
+      and the image extension.
+
+    Args:
+        basePath (str): Output file path without extension.
+        ext (str): Extension of images such as 'jpg'.
+        chunkMB (float): Size (MB) to rotate chunk files.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self, basePath, ext="jpg", chunkMB=1024):
+        if DEBUG: print("ImgPackWriter.__init__()")
+
+        ##### beginning of setting up attributes -----
+        self.basePath = basePath # output file path without extension
+        self.ext = ext # extension of images
+        self.chunkBytes = int(chunkMB*1e6) # size to rotate chunk files
+        self.chunks = [] # file paths of chunks
+        self.f = None # file object of current chunk
+        self.pos = 0 # write position in current chunk
+        self.idxFP = basePath + ".idx" # index file
+        self.idxFile = open(self.idxFP, "wb") # file object of index
+        self.nextFrame = 1 # frame number of the next image
+        ##### end of setting up attributes -----
+        self.idxFile.write(self.makeHeader(IDX_MAGIC))
+        self.rotate()
+
+    #-------------------------------------------------------------------
+
+    def makeHeader(self, magic):
+        return struct.pack("<8s8s", magic, self.ext.encode())
+
+    #-------------------------------------------------------------------
+
+    def chunkPath(self, i):
+        return "%s_%03i.pack"%(self.basePath, i)
+
+    #-------------------------------------------------------------------
+
+    def rotate(self):
+        """ Close current chunk and start the next one.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("ImgPackWriter.rotate()")
+
+        if self.f != None: self.f.close()
+        fp = self.chunkPath(len(self.chunks))
+        self.f = open(fp, "wb")
+        self.f.write(self.makeHeader(PACK_MAGIC))
+        self.pos = PACK_HDR_SIZE
+        self.chunks.append(fp)
+
+    #-------------------------------------------------------------------
+
+    def append(self, data, ts):
+        """ Append an encoded image.
+
+        Args:
+            data (numpy.ndarray): Encoded image (uint8).
+            ts (tuple): Monotonic and wall-clock timestamps of the frame.
+
+        Returns:
+            frame (int): Frame number of the image.
+        """
+        #if DEBUG: print("ImgPackWriter.append()")
+
+        n = data.nbytes
+        if self.pos > PACK_HDR_SIZE and self.pos + n > self.chunkBytes:
+            self.rotate()
+        self.f.write(data)
+        entry = np.array([(self.nextFrame, len(self.chunks)-1, n, self.pos,
+                           ts[0], ts[1])], dtype=PACK_IDX_DTYPE)
+        self.idxFile.write(entry.tobytes())
+        self.pos += n
+        self.nextFrame += 1
+        return self.nextFrame - 1
+
+    #-------------------------------------------------------------------
+
+    def release(self):
+        if DEBUG: print("ImgPackWriter.release()")
+        self.f.close()
+        self.idxFile.close()
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+class ImgPackReader:
+    """ Reader of an image pack written by ImgPackWriter.
+    Chunk files are memory-mapped, so an image is read without
+      reading other images.
+
+    Args:
+        basePath (str): Output file path without extension
+          (ImgPackWriter.basePath), or path of its index file.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+
+    Examples:
+        >>> pack = ImgPackReader("output_00_2026_10_17_10_00_00")
+        >>> len(pack), pack.index["frame"][:3]
+        (7200, array([1, 2, 3], dtype=uint64))
+        >>> img = pack.decode(pack.findTime(1760690000.0))
+        >>> pack.extract("output_00_2026_10_17_10_00_00")
+    """
+
+    def __init__(self, basePath):
+        if DEBUG: print("ImgPackReader.__init__()")
+
+        if basePath.endswith(".idx"): basePath = basePath[:-4]
+        with open(basePath + ".idx", "rb") as f: hdr = f.read(PACK_HDR_SIZE)
+        magic, ext = struct.unpack("<8s8s", hdr)
+        if magic != IDX_MAGIC:
+            raise ValueError("%s.idx is not an image pack index."%(basePath))
+        ##### beginning of setting up attributes -----
+        self.basePath = basePath # output file path without extension
+        self.ext = ext.rstrip(b"\0").decode() # extension of images
+        self.index = np.fromfile(basePath + ".idx", dtype=PACK_IDX_DTYPE,
+                                 offset=PACK_HDR_SIZE) # entries of images
+        self.chunks = {} # memory-mapped chunk files
+        ##### end of setting up attributes -----
+
+    #-------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.index)
+
+    #-------------------------------------------------------------------
+
+    def __getitem__(self, i):
+        """ Return encoded image of i-th entry.
+
+        Args:
+            i (int): Position in the index.
+
+        Returns:
+            (numpy.ndarray): Encoded image; a view of the mapped chunk.
+        """
+        e = self.index[i]
+        c = int(e["chunk"])
+        if not c in self.chunks:
+            self.chunks[c] = np.memmap("%s_%03i.pack"%(self.basePath, c),
+                                       dtype=np.uint8, mode="r")
+        o = int(e["offset"])
+        return self.chunks[c][o:o+int(e["size"])]
+
+    #-------------------------------------------------------------------
+
+    def decode(self, i, flags=cv2.IMREAD_UNCHANGED):
+        return cv2.imdecode(np.asarray(self[i]), flags)
+
+    #-------------------------------------------------------------------
+
+    def findFrame(self, frame):
+        """ Return position in the index of a frame number.
+
+        Args:
+            frame (int): Frame number.
+
+        Returns:
+            (int): Position; -1 when the frame isn't in the pack.
+        """
+        i = int(np.searchsorted(self.index["frame"], frame))
+        if i < len(self.index) and self.index["frame"][i] == frame: return i
+        return -1
+
+    #-------------------------------------------------------------------
+
+    def findTime(self, t, clock="wallclock"):
+        """ Return position of the last image taken at or before a time.
+
+        Args:
+            t (float): Time.
+            clock (str): 'wallclock' or 'monotonic'.
+
+        Returns:
+            (int): Position; -1 when all images are after 't'.
+        """
+        return int(np.searchsorted(self.index[clock], t, side="right")) - 1
+
+    #-------------------------------------------------------------------
+
+    def extract(self, folder, start=0, end=None):
+        """ Write images as loose files, in the same form as
+        the 'files' image sink (f000001.jpg, ... and timestamps.csv).
+
+        Args:
+            folder (str): Output folder.
+            start (int): First position in the index.
+            end (None/int): Position after the last one; None for all.
+
+        Returns:
+            (int): Number of written files.
+        """
+        if DEBUG: print("ImgPackReader.extract()")
+
+        if end is None: end = len(self.index)
+        if not path.isdir(folder): mkdir(folder)
+        with open(path.join(folder, "timestamps.csv"), "w") as tsFile:
+            tsFile.write("frame,monotonic,wallclock\n")
+            for i in range(start, end):
+                e = self.index[i]
+                fp = path.join(folder, "f%06i.%s"%(e["frame"], self.ext))
+                with open(fp, "wb") as f: f.write(self[i])
+                tsFile.write("%i,%.6f,%.6f\n"%(e["frame"], e["monotonic"],
+                                                e["wallclock"]))
+        return end - start
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+                description="extract images of an image pack to files")
+    parser.add_argument("pack", help="index file (.idx) of image pack")
+    parser.add_argument("folder", nargs="?", default=None,
+                        help="output folder; pack path without extension"
+                             " by default")
+    args = parser.parse_args()
+    pack = ImgPackReader(args.pack)
+    folder = args.folder
+    if folder is None: folder = pack.basePath
+    print("%i images extracted to %s"%(pack.extract(folder), folder))
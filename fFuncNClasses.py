@@ -5,74 +5,29 @@ Frequenty used functions and classes
 Dependency:
     wxPython (4.0)
     NumPy (1.14)
-    OpenCV (3.4)
 
 Changelog
 ------------------------------------------------------------------------
 v.0.1.1: (2019.11.04)
   - reorganized.
+  - Functions which don't need wxPython (GNU_notice, get_time_stamp,
+    getCamIdx, probeCam, probeCams) moved to fFuncs.py.
 """
 
 import sys, errno
 from os import path, strerror
-from datetime import datetime
 
 import wx
 import wx.lib.scrolledpanel as sPanel
 import numpy as np
-import cv2
+
+from fFuncs import get_time_stamp
 
 DEBUG = False
 __version__ = "0.1.1" # 2019.11.04
 
 #-----------------------------------------------------------------------
 
-def GNU_notice(idx=0):
-    """ Function for printing GNU copyright statements
-    
-    Args:
-        idx (int): Index to determine which statement to print out.
-    
-    Returns:
-        None
-    
-    Examples:
-        >>> GNU_notice(0)
-        Copyright (c) ...
-        ...
-        run this program with option '-c' for details.
-    """
-    if DEBUG: print("fFuncNClasses.GNU_notice()")
-
-    if idx == 0:
-        year = datetime.now().year
-        msg = "Copyright (c) %i Jinook Oh, W. Tecumseh Fitch.\n"%(year)
-        msg += "This program comes with ABSOLUTELY NO WARRANTY;"
-        msg += " for details run this program with the option `-w'."
-        msg += "This is free software, and you are welcome to redistribute"
-        msg += " it under certain conditions;"
-        msg += " run this program with the option `-c' for details."
-    elif idx == 1:
-        msg = "THERE IS NO WARRANTY FOR THE PROGRAM, TO THE EXTENT PERMITTED"
-        msg += " BY APPLICABLE LAW. EXCEPT WHEN OTHERWISE STATED IN WRITING"
-        msg += " THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE"
-        msg += " PROGRAM 'AS IS' WITHOUT WARRANTY OF ANY KIND, EITHER"
-        msg += " EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE"
-        msg += " IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A"
-        msg += " PARTICULAR PURPOSE."
-        msg += " THE ENTIRE RISK AS TO THE QUALITY AND PERFORMANCE OF THE"
-        msg += " PROGRAM IS WITH YOU. SHOULD THE PROGRAM PROVE DEFECTIVE, YOU"
-        msg += " ASSUME THE COST OF ALL NECESSARY SERVICING, REPAIR OR"
-        msg += " CORRECTION."
-    elif idx == 2:
-        msg = "You can redistribute this program and/or modify it under" 
-        msg += " the terms of the GNU General Public License as published"
-        msg += " by the Free Software Foundation, either version 3 of the"
-        msg += " License, or (at your option) any later version."
-    print(msg)
-    
-#-----------------------------------------------------------------------
-
 def chkFPath(fp, flagRaise=True):
     """ Check whether given path is folder, file or neither.
     Used when 'fp' type is unknown. 
@@ -103,33 +58,6 @@ def chkFPath(fp, flagRaise=True):
     
 #-----------------------------------------------------------------------
 
-def get_time_stamp(flag_ms=False):
-    """ Function to return string which contains timestamp.
-    
-    Args:
-        flag_ms (bool, optional): Whether to return microsecond or not
-    
-    Returns:
-        ts (str): Timestamp string
-    
-    Examples:
-        >>> print(get_time_stamp())
-        2019_09_10_16_21_56
-    """
-    if DEBUG: print("fFuncNClasses.get_time_stamp()")
-
-    ts = datetime.now()
-    ts = ('%.4i_%.2i_%.2i_%.2i_%.2i_%.2i')%(ts.year, 
-                                            ts.month, 
-                                            ts.day, 
-                                            ts.hour, 
-                                            ts.minute, 
-                                            ts.second)
-    if flag_ms == True: ts += '_%.6i'%(ts.microsecond)
-    return ts
-    
-#-----------------------------------------------------------------------
-
 def writeFile(file_path, txt='', mode='a'):
     """ Function to write a text or numpy file.
     
@@ -458,31 +386,6 @@ def receiveDataFromQueue(q, logFile=''):
     
 #-----------------------------------------------------------------------
 
-def getCamIdx(maxNCam=3):
-    """ Returns indices of attached webcams
-    
-    Args:
-        maxNCam (int): Maximum number of cams attached 
-    
-    Returns:
-        idx (list): Indices of webcams
-    
-    Examples:
-        >>> getCamIdx()
-        [0]
-    """
-    if DEBUG: print("fFuncNClasses.getCamIdx()")
-
-    idx = []
-    for i in range(maxNCam):
-        cap = cv2.VideoCapture(i)
-        ret, f = cap.read()
-        del(cap)
-        if ret == True: idx.append(i)
-    return idx
-    
-#-----------------------------------------------------------------------
-
 def add2gbs(gbs, 
             widget, 
             pos, 
@@ -0,0 +1,277 @@
+# coding: UTF-8
+"""
+Frequenty used functions which don't depend on wxPython,
+  so that the recording engine can run without GUI (headless mode)
+  on a machine without wxPython.
+
+Dependency:
+    OpenCV (3.4)
+
+Changelog
+------------------------------------------------------------------------
+v.0.1: (2026.10.17)
+  - Moved from fFuncNClasses.py.
+"""
+
+import json
+from os import path
+from datetime import datetime
+from time import time, sleep
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import cv2
+
+DEBUG = False
+__version__ = "0.1"
+
+#-----------------------------------------------------------------------
+
+def GNU_notice(idx=0):
+    """ Function for printing GNU copyright statements
+    
+    Args:
+        idx (int): Index to determine which statement to print out.
+    
+    Returns:
+        None
+    
+    Examples:
+        >>> GNU_notice(0)
+        Copyright (c) ...
+        ...
+        run this program with option '-c' for details.
+    """
+    if DEBUG: print("fFuncs.GNU_notice()")
+
+    if idx == 0:
+        year = datetime.now().year
+        msg = "Copyright (c) %i Jinook Oh, W. Tecumseh Fitch.\n"%(year)
+        msg += "This program comes with ABSOLUTELY NO WARRANTY;"
+        msg += " for details run this program with the option `-w'."
+        msg += "This is free software, and you are welcome to redistribute"
+        msg += " it under certain conditions;"
+        msg += " run this program with the option `-c' for details."
+    elif idx == 1:
+        msg = "THERE IS NO WARRANTY FOR THE PROGRAM, TO THE EXTENT PERMITTED"
+        msg += " BY APPLICABLE LAW. EXCEPT WHEN OTHERWISE STATED IN WRITING"
+        msg += " THE COPYRIGHT HOLDERS AND/OR OTHER PARTIES PROVIDE THE"
+        msg += " PROGRAM 'AS IS' WITHOUT WARRANTY OF ANY KIND, EITHER"
+        msg += " EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE"
+        msg += " IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A"
+        msg += " PARTICULAR PURPOSE."
+        msg += " THE ENTIRE RISK AS TO THE QUALITY AND PERFORMANCE OF THE"
+        msg += " PROGRAM IS WITH YOU. SHOULD THE PROGRAM PROVE DEFECTIVE, YOU"
+        msg += " ASSUME THE COST OF ALL NECESSARY SERVICING, REPAIR OR"
+        msg += " CORRECTION."
+    elif idx == 2:
+        msg = "You can redistribute this program and/or modify it under" 
+        msg += " the terms of the GNU General Public License as published"
+        msg += " by the Free Software Foundation, either version 3 of the"
+        msg += " License, or (at your option) any later version."
+    print(msg)
+    
+#-----------------------------------------------------------------------
+
+def get_time_stamp(flag_ms=False):
+    """ Function to return string which contains timestamp.
+    
+    Args:
+        flag_ms (bool, optional): Whether to return microsecond or not
+    
+    Returns:
+        ts (str): Timestamp string
+    
+    Examples:
+        >>> print(get_time_stamp())
+        2019_09_10_16_21_56
+    """
+    if DEBUG: print("fFuncs.get_time_stamp()")
+
+    ts = datetime.now()
+    ts = ('%.4i_%.2i_%.2i_%.2i_%.2i_%.2i')%(ts.year, 
+                                            ts.month, 
+                                            ts.day, 
+                                            ts.hour, 
+                                            ts.minute, 
+                                            ts.second)
+    if flag_ms == True: ts += '_%.6i'%(ts.microsecond)
+    return ts
+    
+#-----------------------------------------------------------------------
+
+def getCamIdx(maxNCam=3):
+    """ Returns indices of attached webcams
+    
+    Args:
+        maxNCam (int): Maximum number of cams attached 
+    
+    Returns:
+        idx (list): Indices of webcams
+    
+    Examples:
+        >>> getCamIdx()
+        [0]
+    """
+    if DEBUG: print("fFuncs.getCamIdx()")
+
+    cams, report = probeCams(maxNCam)
+    for c in cams: c["cap"].release()
+    return [c["idx"] for c in cams]
+    
+#-----------------------------------------------------------------------
+
+def probeCam(idx, backend="", settleTime=0.3, nReads=10):
+    """ Open a webcam and read a frame from it.
+    
+    Args:
+        idx (int): Index of cam.
+        backend (str): Name of VideoCapture backend (such as 'V4L2',
+          'AVFOUNDATION', 'DSHOW'). Empty string for automatic selection.
+        settleTime (float): Delay (seconds) for cam's initial
+          auto-adjustment before reading a frame.
+        nReads (int): Number of attempts to read a frame.
+    
+    Returns:
+        cam (None/dict): None when no frame could be read. Otherwise,
+          'idx', 'cap' (opened cv2.VideoCapture), 'frame' (the first frame),
+          'fSz' (frame size), 'backend' and 'time' (seconds for probing).
+    
+    Examples:
+        >>> probeCam(0)["fSz"]
+        (1280, 720)
+    """
+    if DEBUG: print("fFuncs.probeCam()")
+
+    t = time()
+    apiPref = getattr(cv2, "CAP_%s"%(backend), None)
+    if apiPref is None: cap = cv2.VideoCapture(idx)
+    else: cap = cv2.VideoCapture(idx, apiPref)
+    if not cap.isOpened():
+        cap.release()
+        return None
+    sleep(settleTime)
+    for i in range(nReads):
+        ret, frame = cap.read()
+        if ret == True: break
+        sleep(0.01)
+    if ret != True:
+        cap.release()
+        return None
+    try: backend = cap.getBackendName()
+    except: pass
+    cam = dict(idx=idx,
+               cap=cap,
+               frame=frame,
+               fSz=(frame.shape[1], frame.shape[0]),
+               backend=backend,
+               time=time()-t)
+    return cam
+    
+#-----------------------------------------------------------------------
+
+def probeCams(maxNCam=4, cacheFile="", newCamTimeout=0.5):
+    """ Find attached webcams by opening them concurrently.
+    When 'cacheFile' has results of a previous probing, the cached cams
+      are opened with the cached backend, without waiting for the
+      cam's auto-adjustment, and the first frame is checked against the
+      cached frame size. At the same time, other indices up to 'maxNCam'
+      are probed in the same way for a cam plugged in since then; these
+      are waited for only 'newCamTimeout' seconds. When a cached cam is
+      gone or its frame size changed, it's probed again as without the
+      cache and all other indices are waited for.
+    
+    Args:
+        maxNCam (int): Maximum number of cams attached.
+        cacheFile (str, optional): JSON file to cache probe results
+          (index, frame size and backend).
+        newCamTimeout (float, optional): Seconds to wait for probing
+          indices which are not in the cache, with a valid cache.
+    
+    Returns:
+        cams (list): Results (dict) of probeCam() of found cams,
+          sorted by index. Opened VideoCapture, 'cap', can be reused.
+        report (dict): 'time' (total seconds), 'cache' ('warm'; all
+          cached cams were found, 'miss'; any of them wasn't, or 'cold';
+          no cache), 'new' (indices of found cams which weren't cached)
+          and 'camTime' (seconds for each cam index).
+    
+    Examples:
+        >>> cams, report = probeCams(4, "pCR_camCache.json")
+        >>> [c["idx"] for c in cams], report["cache"]
+        ([0, 1], 'warm')
+    """
+    if DEBUG: print("fFuncs.probeCams()")
+
+    def release(future):
+        # release a cam found after the timeout
+        if future.result() is not None: future.result()["cap"].release()
+
+    t = time()
+    cache = None
+    if cacheFile != "" and path.isfile(cacheFile):
+        try:
+            with open(cacheFile, "r") as f: cache = json.load(f)["cams"]
+            cached = dict([(c["idx"], (c["backend"], tuple(c["fSz"]))) \
+                             for c in cache if c["idx"] < maxNCam])
+        except: cached = {}
+    else:
+        cached = {}
+    ex = ThreadPoolExecutor(max_workers=max(1, maxNCam))
+    futures = {}
+    for i in range(maxNCam):
+        if i in cached: # known cam; no settling time, a few reads
+            futures[i] = ex.submit(probeCam, i, cached[i][0], 0, 3)
+        elif cached != {}: # looking for a new cam in the same way
+            futures[i] = ex.submit(probeCam, i, "", 0, 3)
+        else:
+            futures[i] = ex.submit(probeCam, i)
+    cams = []
+    cacheState = "cold"
+    if cached != {}:
+        cacheState = "warm"
+        reprobe = {}
+        for i in sorted(cached.keys()):
+            c = futures[i].result()
+            if c != None and c["fSz"] == cached[i][1]:
+                cams.append(c)
+                continue
+            cacheState = "miss" # cam is gone or changed; probe it again
+            if c != None: c["cap"].release()
+            reprobe[i] = ex.submit(probeCam, i)
+        for i in reprobe.keys():
+            c = reprobe[i].result()
+            if c != None: cams.append(c)
+    newIdx = [i for i in range(maxNCam) if not i in cached]
+    if cacheState == "warm": # wait for other indices only for a while
+        timeout = max(0, newCamTimeout-(time()-t))
+    else:
+        timeout = None
+    for i in newIdx:
+        sTime = time()
+        try: c = futures[i].result(timeout=timeout)
+        except TimeoutError:
+            futures[i].add_done_callback(release)
+            c = None
+        if timeout != None: timeout = max(0, timeout-(time()-sTime))
+        if c != None: cams.append(c)
+    ex.shutdown(wait=False)
+    cams = sorted(cams, key=lambda c: c["idx"])
+    if cacheFile != "":
+        cache = [dict(idx=c["idx"], fSz=list(c["fSz"]), backend=c["backend"])\
+                   for c in cams]
+        try:
+            with open(cacheFile, "w") as f: json.dump(dict(cams=cache), f)
+        except Exception as e:
+            print("%s, [ERROR], %s"%(get_time_stamp(), str(e)))
+    report = dict(time=time()-t,
+                  cache=cacheState,
+                  new=[c["idx"] for c in cams if not c["idx"] in cached],
+                  camTime=dict([(c["idx"], c["time"]) for c in cams]))
+    return cams, report
+    
+#-----------------------------------------------------------------------
+
+#=======================================================================
+
+if __name__ == '__main__':
+    pass
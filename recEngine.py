@@ -0,0 +1,584 @@
+# coding: UTF-8
+"""
+Recording engine of pyCamRec, independent from GUI.
+It finds attached cams, starts/stops each Cam (in a thread or
+  a process) and starts/stops recording of all running Cams.
+Used by CamRecFrame (GUI) and by headless mode (run without display).
+
+Dependency:
+    NumPy (1.14)
+    OpenCV (3.4)
+
+Changelog
+------------------------------------------------------------------------
+v.0.1: (2026.10.17)
+  - Initial development; moved from CamRecFrame of pyCamRec.py.
+  - Added synchronized capture of multiple cams (startSync).
+  - Virtual sources can be used instead of attached cams.
+  - Per-stage metrics are exported periodically (MetricsExporter).
+  - Log is written as JSON lines by LogWriter (camLog).
+  - Finished raw recordings can be transcoded in background (Transcoder).
+  - USB bandwidth of cams is planned before they start (planBandwidth).
+  - Recordings can be placed across several output roots (OutputRoots).
+"""
+
+import json, queue
+from os import path, mkdir
+from threading import Thread
+from time import time, sleep
+
+from fFuncs import get_time_stamp, probeCams
+from camPipeline import FrameMailbox
+from cam import Cam, CamSyncGroup
+from camProc import CamProcess
+from camSource import probeSources
+from camMetrics import MetricsExporter
+from camLog import getLogger, closeLogger
+from camTranscode import Transcoder
+from camBandwidth import planBandwidth
+from camStorage import getOutputRoots, closeOutputRoots, MIN_FREE_MB
+
+DEBUG = False
+__version__ = "0.1"
+
+#=======================================================================
+
+class RecorderEngine:
+    """ GUI-independent API for cams and recording.
+
+    Args:
+        logFile (str): Log file (JSON lines).
+        recFolder (str/list): Folder to save recorded videos/images,
+          or folders (output roots such as on different disks) to place
+          recordings of cams across, with monitoring of free space and
+          write latency (see camStorage.OutputRoots).
+        camCacheFile (str): JSON file to cache cam probe results.
+        maxNCam (int): Maximum number of cams attached.
+        sources (None/list): Sources of frames (see camSource.openSource)
+          to use instead of attached cams; indices of cams are
+          indices in this list.
+        metricsFile (str): File path (without extension) to export
+          metrics periodically, such as 'pCR_metrics'; empty string
+          (default) for no export.
+        metricsIntv (float): Interval (seconds) of exporting metrics.
+        transcode (bool): Whether to transcode finished raw recordings
+          in 'recFolder' in background.
+        transcodeWorkers (int): Max. number of transcoding jobs at
+          the same time.
+        transcodeNice (int): Niceness increment of transcoding processes.
+        transcodeCodec (str): FourCC of codec of transcoded videos.
+        minFreeMB (float): Free space (MB) to keep on each output root
+          when 'recFolder' is a list.
+
+    Attributes:
+        Each attribute is commented in 'setting up attributes' section.
+    """
+
+    def __init__(self,
+                 logFile="pCR_log.jsonl",
+                 recFolder="recordings",
+                 camCacheFile="pCR_camCache.json",
+                 maxNCam=4,
+                 sources=None,
+                 metricsFile="",
+                 metricsIntv=5.0,
+                 transcode=False,
+                 transcodeWorkers=1,
+                 transcodeNice=10,
+                 transcodeCodec="avc1",
+                 minFreeMB=MIN_FREE_MB):
+        if DEBUG: print("RecorderEngine.__init__()")
+
+        sTime = time() # for reporting startup time
+        ##### beginning of setting up attributes -----
+        self.logFile = logFile # log file
+        if isinstance(recFolder, str):
+            self.recFolder = recFolder # folder to save recordings
+            self.recFolders = [recFolder] # folders of recordings
+        else: # output roots shared by cams in this process
+            self.recFolder = getOutputRoots(recFolder, logFile, minFreeMB)
+            self.recFolders = self.recFolder.roots
+        self.camCacheFile = camCacheFile # cache of cam probe results
+        if sources is None: # probe attached cams
+            probed, probeReport = probeCams(maxNCam=maxNCam,
+                                            cacheFile=camCacheFile)
+        else: # open virtual sources
+            probed, probeReport = probeSources(sources)
+        self.cIndices = [c["idx"] for c in probed] # indices of cams
+        self.cams = {} # Cam class instances
+        self.th = {} # thread (or CamProcess) of each cam; -1 when not running
+        self.mb = {} # mailbox of each cam to get the latest frame
+        self.q2t = {} # queue of each cam to send massage to a thread
+        for c in probed:
+            ci = c["idx"]
+            # reuse VideoCapture opened for probing
+            self.cams[ci] = Cam(self, ci, logFile, c["cap"], c["frame"],
+                                src=c.get("src", None))
+            self.th[ci] = -1
+            self.mb[ci] = FrameMailbox()
+            self.q2t[ci] = queue.Queue()
+        self.isRecording = False # whether it's currently recording or not
+        self.rSTime = -1 # recording start time
+        self.extMetrics = [] # other StageMetrics to export, such as GUI's
+        if metricsFile != "": # exporting metrics periodically
+            self.exporter = MetricsExporter(self.getMetrics, metricsFile,
+                                            metricsIntv)
+        else:
+            self.exporter = None
+        self.transcoder = None # transcoder of finished raw recordings
+        ##### end of setting up attributes -----
+
+        for folder in self.recFolders:
+            if not path.isdir(folder): # recording folder doesn't exist
+                mkdir(folder) # make one
+        if transcode:
+            self.transcoder = Transcoder(logFile, transcodeWorkers,
+                                         transcodeNice, transcodeCodec)
+            self.transcoder.watch(self.recFolders)
+        ### report startup time
+        log = "%s, Startup; probing cams %.3f s"%(get_time_stamp(),
+                                                 probeReport["time"])
+        log += " [cache: %s]"%(probeReport["cache"])
+        if probeReport["new"] != []:
+            log += " [new cams: %s]"%(str(probeReport["new"]))
+        for ci in sorted(probeReport["camTime"].keys()):
+            log += " [Cam-%.2i: %.3f s]"%(ci, probeReport["camTime"][ci])
+        log += " [total: %.3f s]"%(time()-sTime)
+        print(log)
+        camTime = dict([(str(ci), round(t, 3)) for ci, t in \
+                          probeReport["camTime"].items()])
+        getLogger(logFile).log("startup",
+                               cams=self.cIndices,
+                               probeSec=round(probeReport["time"], 3),
+                               probeCache=probeReport["cache"],
+                               probeNew=probeReport["new"],
+                               probeCamSec=camTime,
+                               totalSec=round(time()-sTime, 3))
+        if not isinstance(self.recFolder, str): # initial state of roots
+            getLogger(logFile).log("storage_stat",
+                                   roots=self.recFolder.getStats())
+
+    #-------------------------------------------------------------------
+
+    def setCamSettings(self, ci, **settings):
+        """ Set recording settings of a cam.
+        It should be called while the cam is not running.
+
+        Args:
+            ci (int): Index of cam.
+            settings: Values of attributes in Cam.settingKeys.
+
+        Returns:
+            None
+        """
+        if DEBUG: print("RecorderEngine.setCamSettings()")
+
+        if self.isCamRunning(ci):
+            raise RuntimeError("Cam-%.2i is running."%(ci))
+        self.cams[ci].setSettings(settings)
+
+    #-------------------------------------------------------------------
+
+    def isCamRunning(self, ci):
+        return self.th[ci] != -1
+
+    #-------------------------------------------------------------------
+
+    def runningCams(self):
+        """ Return indices of running cams.
+
+        Args: None
+
+        Returns:
+            (list): Indices of running cams.
+        """
+        return [ci for ci in self.cIndices if self.isCamRunning(ci)]
+
+    #-------------------------------------------------------------------
+
+    def runningQueues(self):
+        """ Return queues to running cams (or sync groups) without
+        duplicates, as cams in a sync group share a queue.
+
+        Args: None
+
+        Returns:
+            (list): Queues.
+        """
+        qs = []
+        for ci in self.runningCams():
+            if not any([q is self.q2t[ci] for q in qs]): qs.append(self.q2t[ci])
+        return qs
+
+    #-------------------------------------------------------------------
+
+    def startCam(self, ci):
+        """ Start a cam thread (or process, depending on Cam.backend).
+
+        Args:
+            ci (int): Index of cam.
+
+        Returns:
+            None
+        """
+        if DEBUG: print("RecorderEngine.startCam()")
+
+        if self.isCamRunning(ci): return
+        cam = self.cams[ci]
+        if cam.backend == "thread":
+            ### start Cam thread
+            args = (self.mb[ci], self.q2t[ci], self.recFolder,)
+            self.th[ci] = Thread(target=cam.run, args=args)
+        elif cam.backend == "process":
+            ### start Cam process; the process opens the cam by itself
+            cam.close()
+            proc = CamProcess(cam, self.recFolder)
+            self.th[ci] = proc
+            self.mb[ci] = proc # preview frames via shared memory
+            self.q2t[ci] = proc.q2t # messages via pipe
+        else:
+            raise ValueError("Unknown backend: %s"%(cam.backend))
+        self.th[ci].start()
+        getLogger(self.logFile).log("cam_start", cam=ci, backend=cam.backend,
+                                    src=cam.src)
+
+    #-------------------------------------------------------------------
+
+    def planBandwidth(self, cis, policy="warn", busMBps=None):
+        """ Check bus bandwidth of capture formats of cams
+        (see camBandwidth.planBandwidth); with 'downgrade' policy,
+        downgraded formats are applied to cams which are not running.
+        Cams of attached cams without 'usbBus' share the bus 'usb'.
+
+        Args:
+            cis (list): Indices of cams to be used together.
+            policy (str): 'warn' or 'downgrade'.
+            busMBps (None/dict): Usable MB/s of each bus name;
+              None for the default of all buses.
+
+        Returns:
+            plan (dict): Result of camBandwidth.planBandwidth.
+        """
+        if DEBUG: print("RecorderEngine.planBandwidth()")
+
+        def camFormats():
+            fmts = []
+            for ci in cis:
+                cam = self.cams[ci]
+                bus = cam.usbBus
+                if bus == "" and str(cam.src).isdigit(): bus = "usb"
+                fmts.append(dict(cIdx=ci, bus=bus, **cam.getFormat()))
+            return fmts
+
+        plan = planBandwidth(camFormats(), busMBps, policy)
+        applied = []
+        for c in plan["cams"]:
+            if not c["cIdx"] in plan["changed"]: continue
+            if self.isCamRunning(c["cIdx"]): continue
+            p = c["planned"]
+            self.setCamSettings(c["cIdx"], capWidth=p["width"],
+                                capHeight=p["height"], capFPS=p["fps"],
+                                capFourcc=p["fourcc"])
+            applied.append(c["cIdx"])
+        if applied != []: # check again with formats the drivers took
+            actual = planBandwidth(camFormats(), busMBps, "warn")
+            over = actual["over"]
+        else:
+            over = plan["over"]
+        for name, b in plan["buses"].items():
+            if b["requestedMBps"] <= b["limit"]: continue
+            print("[WARNING] Bus '%s': %.1f MB/s of cams %s > %.1f MB/s"%(
+                    name, b["requestedMBps"],
+                    str([c["cIdx"] for c in plan["cams"] if c["bus"] == name]),
+                    b["limit"]))
+        for c in plan["cams"]:
+            if c["cIdx"] in applied:
+                print("[c%.2i] Capture format downgraded to %s"%(c["cIdx"],
+                                                               str(c["planned"])))
+        if over != []:
+            print("[WARNING] Bus(es) %s may drop frames."%(str(over)))
+        getLogger(self.logFile).log("bw_plan",
+                                    policy=policy,
+                                    buses=plan["buses"],
+                                    cams=plan["cams"],
+                                    downgraded=applied,
+                                    over=over)
+        return plan
+
+    #-------------------------------------------------------------------
+
+    def startSync(self, cis, fpsLimit=-1):
+        """ Start synchronized capture of cams (CamSyncGroup).
+        Cams run in threads of this process regardless of Cam.backend.
+
+        Args:
+            cis (list): Indices of cams.
+            fpsLimit (int): Frame rate limit of the group; -1 for no limit.
+
+        Returns:
+            None
+        """
+        if DEBUG: print("RecorderEngine.startSync()")
+
+        for ci in cis:
+            if self.isCamRunning(ci):
+                raise RuntimeError("Cam-%.2i is running."%(ci))
+        group = CamSyncGroup([self.cams[ci] for ci in cis],
+                             [self.mb[ci] for ci in cis],
+                             self.recFolder,
+                             self.logFile,
+                             fpsLimit)
+        for ci in cis:
+            self.th[ci] = group
+            self.q2t[ci] = group.q2t
+        group.start()
+        getLogger(self.logFile).log("sync_start", cams=list(cis),
+                                    fpsLimit=fpsLimit)
+
+    #-------------------------------------------------------------------
+
+    def stopCam(self, ci):
+        """ Stop a cam thread (or process).
+
+        Args:
+            ci (int): Index of cam.
+
+        Returns:
+            None
+        """
+        if DEBUG: print("RecorderEngine.stopCam()")
+
+        if not self.isCamRunning(ci): return
+        self.q2t[ci].put("quit", True, None) # send message to quit thread
+        self.th[ci].join()
+        if isinstance(self.th[ci], CamSyncGroup):
+            ### stop all cams of the group
+            group = self.th[ci]
+            cis = [cam.cIdx for cam in group.cams]
+            for _ci in cis:
+                self.th[_ci] = -1
+                self.q2t[_ci] = queue.Queue()
+                self.mb[_ci].clear()
+            getLogger(self.logFile).log("sync_stop", cams=cis)
+            return
+        if isinstance(self.th[ci], CamProcess):
+            ### restore mailbox and queue for thread backend
+            self.mb[ci] = FrameMailbox()
+            self.q2t[ci] = queue.Queue()
+            self.cams[ci].open() # re-open cam in this process
+        self.th[ci] = -1
+        self.mb[ci].clear()
+        getLogger(self.logFile).log("cam_stop", cam=ci,
+                                    backend=self.cams[ci].backend)
+
+    #-------------------------------------------------------------------
+
+    def startRec(self):
+        """ Start recording of all running cams.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("RecorderEngine.startRec()")
+
+        if self.isRecording: return
+        self.rSTime = time()
+        getLogger(self.logFile).log("session_start", cams=self.runningCams())
+        for q in self.runningQueues(): q.put('rec_init', True, None)
+        self.isRecording = True
+
+    #-------------------------------------------------------------------
+
+    def stopRec(self):
+        """ Stop recording of all running cams.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("RecorderEngine.stopRec()")
+
+        if not self.isRecording: return
+        for q in self.runningQueues(): q.put('rec_stop', True, None)
+        getLogger(self.logFile).log("session_stop",
+                                    durationSec=round(time()-self.rSTime, 3))
+        self.rSTime = -1
+        self.isRecording = False
+
+    #-------------------------------------------------------------------
+
+    def getMetrics(self):
+        """ Return metrics snapshots of running cams (and sync groups)
+        and of 'extMetrics'.
+
+        Args: None
+
+        Returns:
+            snaps (list): Snapshots (see StageMetrics.snapshot).
+        """
+        if DEBUG: print("RecorderEngine.getMetrics()")
+
+        snaps = []
+        groups = []
+        for ci in self.runningCams():
+            th = self.th[ci]
+            if isinstance(th, CamProcess):
+                snap = th.getMetrics()
+                if snap != None: snaps.append(snap)
+            else:
+                snaps.append(self.cams[ci].getMetrics())
+                if isinstance(th, CamSyncGroup) and \
+                  not any([g is th for g in groups]):
+                    groups.append(th)
+        for g in groups: snaps.append(g.metrics.snapshot())
+        for m in self.extMetrics: snaps.append(m.snapshot())
+        return snaps
+
+    #-------------------------------------------------------------------
+
+    def takeFrame(self, ci):
+        """ Return the latest frame of a running cam.
+
+        Args:
+            ci (int): Index of cam.
+
+        Returns:
+            (None/numpy.ndarray): The latest frame.
+        """
+        return self.mb[ci].take()[0]
+
+    #-------------------------------------------------------------------
+
+    def takeNewFrame(self, ci, lastSeq):
+        """ Return the latest frame of a running cam only when it's newer
+        than the one taken last time.
+
+        Args:
+            ci (int): Index of cam.
+            lastSeq (int): Sequence number returned last time.
+
+        Returns:
+            frame (None/numpy.ndarray): The latest frame; None when
+              there's no newer frame.
+            seq (int): Sequence number of the latest frame.
+        """
+        return self.mb[ci].take(lastSeq)
+
+    #-------------------------------------------------------------------
+
+    def close(self):
+        """ Stop recording and all cams, then release cams.
+        Transcoding of recordings which are finished by then is
+          completed before it returns.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("RecorderEngine.close()")
+
+        self.stopRec()
+        if self.exporter != None:
+            self.exporter.stop() # final metrics before cams stop
+            self.exporter = None
+        for ci in self.cIndices:
+            self.stopCam(ci)
+            self.cams[ci].close()
+        if self.transcoder != None:
+            for folder in self.recFolders:
+                self.transcoder.scan(folder) # the last recordings
+            self.transcoder.close()
+            self.transcoder = None
+        if not isinstance(self.recFolder, str):
+            closeOutputRoots(self.recFolders)
+        closeLogger(self.logFile) # write all remaining log records
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+def loadConfig(fp):
+    """ Load configuration (JSON) for headless recording.
+
+    Args:
+        fp (str): File path of configuration file.
+
+    Returns:
+        config (dict): Configuration. Keys are the same as the ones of
+          command line options (such as 'cams', 'outputFormat', 'fpsLimit',
+          'ssIntv', 'duration'). 'camSettings' can have settings
+          for each cam index, such as {"1": {"outputFormat": "image"}}.
+
+    Examples:
+        >>> loadConfig("rig1.json")
+        {'cams': [0, 1], 'outputFormat': 'video', 'fpsLimit': 15}
+    """
+    if DEBUG: print("recEngine.loadConfig()")
+
+    with open(fp, "r") as f: config = json.load(f)
+    return config
+
+#-----------------------------------------------------------------------
+
+def runHeadless(config):
+    """ Record from cams without GUI until 'duration' passes
+    or Ctrl+C is pressed.
+
+    Args:
+        config (dict): Configuration; 'cams' (list of cam indices;
+          all found cams when it's empty), 'duration' (seconds; -1 for
+          recording until Ctrl+C), 'logFile', 'recFolder' (a folder or
+          list of folders), 'minFreeMB', 'camCacheFile',
+          'maxNCam', 'sources' (virtual sources instead of attached cams),
+          'sync' (synchronized capture of the cams), 'metricsFile',
+          'metricsIntv', 'transcode', 'transcodeWorkers', 'transcodeNice',
+          'transcodeCodec', 'bwPolicy' ('off', 'warn' or 'downgrade';
+          see RecorderEngine.planBandwidth), 'busMBps' (usable MB/s of
+          each bus name), 'camSettings' (settings for each cam index) and
+          any key in Cam.settingKeys (applied to all cams).
+
+    Returns:
+        None
+    """
+    if DEBUG: print("recEngine.runHeadless()")
+
+    eArgs = {}
+    for k in ["logFile", "recFolder", "camCacheFile", "maxNCam", "sources",
+              "metricsFile", "metricsIntv", "transcode", "transcodeWorkers",
+              "transcodeNice", "transcodeCodec", "minFreeMB"]:
+        if k in config: eArgs[k] = config[k]
+    engine = RecorderEngine(**eArgs)
+    cams = config.get("cams", [])
+    if cams == []: cams = engine.cIndices
+    for ci in cams:
+        if not ci in engine.cIndices:
+            print("Cam-%.2i is not found."%(ci))
+            engine.close()
+            return
+    settings = dict([(k, config[k]) for k in Cam.settingKeys if k in config])
+    camSettings = config.get("camSettings", {})
+    for ci in cams:
+        engine.setCamSettings(ci, **settings)
+        engine.setCamSettings(ci, **camSettings.get(str(ci), {}))
+    bwPolicy = config.get("bwPolicy", "warn")
+    if bwPolicy != "off":
+        engine.planBandwidth(cams, bwPolicy, config.get("busMBps", {}))
+    for ci in cams:
+        if not config.get("sync", False): engine.startCam(ci)
+    if config.get("sync", False):
+        engine.startSync(cams, config.get("fpsLimit", -1))
+    engine.startRec()
+    duration = config.get("duration", -1)
+    print("Recording; Cam(s) %s. Press Ctrl+C to stop."%(str(cams)))
+    try:
+        while duration < 0 or time()-engine.rSTime < duration:
+            sleep(0.2)
+    except KeyboardInterrupt:
+        pass
+    engine.close()
+
+#=======================================================================
+
+if __name__ == '__main__':
+    pass